@@ -2,19 +2,186 @@
 Obsahuje trasy pro vykreslení formulářů, provádění predikcí a zobrazení minulých predikcí.
 Aplikace využívá předem natrénovaný model Random Forest a OneHotEncoder pro zpracování vstupních dat."""
 
-import csv
-import joblib
+import io
+import os
+import sqlite3
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
 import pandas as pd
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, g, render_template, request, jsonify, make_response
 import numpy as np
 
+from inference import (
+    CATEGORICAL_COLS, INPUT_FIELDS, MAX_BATCH_ROWS, count_unknown, encode_batch, forest_predict, predict_batch,
+    validate_batch, validate_vehicle
+)
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsRegistry
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, make_key
+from prediction_log import PredictionLog
+from prediction_store import FILTER_FIELDS, DEFAULT_PAGE_SIZE, PredictionStore
+from process_stats import memory_usage
+
+STARTED_AT = time.perf_counter()
+
+# Relativní cesty (výchozí i z proměnných prostředí) se berou vůči složce app/, ne vůči pracovnímu adresáři
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def app_path(path):
+    """
+    Vrátí absolutní cestu k souboru; relativní cesta se vztahuje ke složce app/.
+    """
+    return os.path.join(APP_DIR, path)
+
 app = Flask(__name__, template_folder='../templates', static_folder='../static')  # Aktualizované cesty
 
-predictions = []  # Uchovávání predikcí v paměti
+predictions = deque(maxlen=int(os.environ.get('RECENT_PREDICTIONS', 100)))  # Posledních N predikcí v paměti
+
+PREDICTIONS_CSV = app_path('../static/predictions.csv')  # Původní historie, převede se do databáze při prvním startu
+PREDICTIONS_DB = app_path(os.environ.get('PREDICTIONS_DB', 'predictions.db'))
+
 
-# Načtení trénovaného modelu a encoderu
-model = joblib.load('random_forest.pkl')
-encoder = joblib.load('encoder.pkl')
+def open_prediction_log():
+    """
+    Otevře historii predikcí v SQLite a spustí zápis na pozadí po dávkách (režimy trvanlivosti viz prediction_log.py).
+    Vlákno zapisovače ani připojení k SQLite nepřežijí fork, proto ji každý worker serveru otevírá znovu
+    (post_fork v gunicorn.conf.py).
+    """
+    global prediction_store, prediction_log
+    prediction_store = PredictionStore(PREDICTIONS_DB, durability=os.environ.get('PREDICTION_LOG_DURABILITY', 'flush'))
+    prediction_log = PredictionLog(
+        prediction_store,
+        max_queue=int(os.environ.get('PREDICTION_LOG_QUEUE_SIZE', 10000)),
+        batch_size=int(os.environ.get('PREDICTION_LOG_BATCH_SIZE', 100)),
+        flush_interval=float(os.environ.get('PREDICTION_LOG_FLUSH_INTERVAL', 1.0))
+    )
+
+
+# Historie predikcí v SQLite s indexy na čase a kategoriích
+open_prediction_log()
+if prediction_store.is_empty():
+    prediction_store.import_csv(PREDICTIONS_CSV)
+
+# Typ modelu: 'forest' (Random Forest z model.py), 'boosting' (HistGradientBoosting z train_boosting.py)
+# nebo 'net' (neuronová síť exportovaná z modely/net_trainer.py, TorchScript nebo ONNX)
+MODEL_TYPE = os.environ.get('MODEL_TYPE', 'forest')
+DEFAULT_MODEL_PATHS = {'forest': 'random_forest.pkl', 'boosting': 'hist_boosting.pkl', 'net': 'net.pt'}
+if MODEL_TYPE not in DEFAULT_MODEL_PATHS:
+    raise ValueError(f"Neznámý MODEL_TYPE '{MODEL_TYPE}', povolené hodnoty: {', '.join(DEFAULT_MODEL_PATHS)}")
+
+# Cesta k modelu – 'random_forest.npz' načte kompaktní formát z flat_forest.py místo pickle
+MODEL_PATH = app_path(os.environ.get('MODEL_PATH', DEFAULT_MODEL_PATHS[MODEL_TYPE]))
+ENCODER_PATH = app_path(os.environ.get('ENCODER_PATH', 'encoder.pkl'))
+
+# MODEL_MMAP=1 mapuje pole modelu ze souboru (u .npz je pak sdílí všechny procesy přes page cache)
+MODEL_MMAP = os.environ.get('MODEL_MMAP', '0') == '1'
+
+# Režim obsluhy: 'model' počítá predikce modelem, 'lookup' je bere z předpočítané tabulky (lookup_table.py)
+SERVING_MODE = os.environ.get('SERVING_MODE', 'model')
+LOOKUP_TABLE_PATH = app_path(os.environ.get('LOOKUP_TABLE_PATH', 'lookup_table.npy'))
+
+# Registr verzí modelu (model_registry.py): verze publikované z model.py do models/ se načtou a zahřejí
+# na pozadí a vymění za běhu. Bez publikovaných verzí se použije MODEL_PATH a ENCODER_PATH.
+# MODEL_REGISTRY_POLL je interval kontroly nových verzí v sekundách (0 = nesledovat).
+MODEL_REGISTRY_DIR = app_path(os.environ.get('MODEL_REGISTRY_DIR', 'models'))
+registry = ModelRegistry(
+    MODEL_REGISTRY_DIR,
+    model_file=os.path.basename(MODEL_PATH),
+    encoder_file=os.path.basename(ENCODER_PATH),
+    fallback_model=MODEL_PATH,
+    fallback_encoder=ENCODER_PATH,
+    poll_interval=float(os.environ.get('MODEL_REGISTRY_POLL', 5)),
+    mmap_mode='r' if MODEL_MMAP else None,
+    lookup_table_path=LOOKUP_TABLE_PATH if SERVING_MODE == 'lookup' else None
+)
+registry.start()
+
+# Cache predikcí – velikost 0 cache vypne, TTL 0 znamená bez vypršení. Klíče obsahují verzi modelu,
+# takže po výměně verze se nepoužijí staré predikce a po návratu k předchozí verzi je cache stále teplá.
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 3600))
+prediction_cache = PredictionCache(
+    max_entries=PREDICTION_CACHE_SIZE,
+    ttl=PREDICTION_CACHE_TTL
+) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Metriky pro /metrics ve formátu Prometheus (metrics.py). METRICS_ENABLED=0 měření vypne – metriky jsou
+# pak prázdné objekty a v horké cestě zbývá jen volání prázdné metody. S METRICS_DIR zapisuje každý worker
+# snímek svých metrik do této složky (každých METRICS_SNAPSHOT_INTERVAL sekund) a /metrics vrací součet
+# přes všechny workery; gunicorn.conf.py ji nastaví sám. Bez METRICS_DIR vrací /metrics metriky jednoho procesu.
+metrics = MetricsRegistry(enabled=os.environ.get('METRICS_ENABLED', '1') == '1')
+METRICS_DIR = app_path(os.environ['METRICS_DIR']) if os.environ.get('METRICS_DIR') else None
+METRICS_SNAPSHOT_INTERVAL = float(os.environ.get('METRICS_SNAPSHOT_INTERVAL', 1.0))
+REQUESTS = metrics.counter('fuel_requests_total', 'Počet obsloužených požadavků', ['endpoint', 'method', 'status'])
+REQUEST_SECONDS = metrics.histogram('fuel_request_seconds', 'Doba obsluhy požadavku', ['endpoint'])
+STAGE_SECONDS = metrics.histogram(
+    'fuel_predict_stage_seconds', 'Doba fází predikce (parse, lookup, cache, encode, predict, store, response)',
+    ['endpoint', 'stage']
+)
+CACHE_LOOKUPS = metrics.counter('fuel_prediction_cache_total', 'Dotazy do cache predikcí', ['result'])
+LOOKUP_TABLE_LOOKUPS = metrics.counter('fuel_lookup_table_total', 'Dotazy do lookup tabulky', ['result'])
+VALIDATION_FAILURES = metrics.counter('fuel_validation_failures_total', 'Požadavky s neplatným vstupem', ['endpoint'])
+UNKNOWN_CATEGORIES = metrics.counter(
+    'fuel_unknown_categories_total', 'Hodnoty kategorií, které encoder nezná a zakóduje jako nuly', ['field']
+)
+PREDICTED_ROWS = metrics.counter('fuel_predicted_rows_total', 'Počet vozidel spočítaných modelem', ['endpoint'])
+MODEL_INFO = metrics.gauge('fuel_model_info', 'Aktuální verze modelu', ['version', 'model'])
+PROCESS_INFO = metrics.gauge('fuel_process_info', 'Běžící procesy (workery), jejichž metriky odpověď obsahuje', ['pid'])
+
+
+def update_info_metrics(bundle):
+    """
+    Nastaví metriky s verzí modelu a PID procesu.
+    """
+    MODEL_INFO.clear()
+    MODEL_INFO.set(1, bundle.version, os.path.basename(bundle.model_path))
+    PROCESS_INFO.clear()
+    PROCESS_INFO.set(1, str(os.getpid()))
+
+
+def start_metrics_snapshots():
+    """
+    Spustí zápis snímků metrik do METRICS_DIR. Vlákno nepřežije fork, proto ho spouští každý worker serveru
+    (post_fork v gunicorn.conf.py); samostatný proces bez METRICS_DIR snímky nezapisuje.
+    """
+    if METRICS_DIR:
+        metrics.start_snapshots(
+            METRICS_DIR, METRICS_SNAPSHOT_INTERVAL, before_write=lambda: update_info_metrics(registry.current)
+        )
+
+STARTUP_S = round(time.perf_counter() - STARTED_AT, 3)  # Studený start: import, načtení modelu a zahřátí
+
+BATCH_FIELDS = ['body_type', 'engine_type', 'fuel_type', 'horsepower', 'year']
+
+def current_model():
+    """
+    Vrátí verzi modelu pro aktuální požadavek. Požadavek si ji vezme při prvním použití a drží ji až do konce,
+    takže výměna verze uprostřed požadavku se ho netýká.
+    """
+    if 'model_bundle' not in g:
+        g.model_bundle = registry.current
+    return g.model_bundle
+
+@app.before_request
+def start_timer():
+    if metrics.enabled:
+        g.request_started = time.perf_counter()
+
+@app.after_request
+def add_model_version(response):
+    """
+    Každá odpověď nese verzi modelu v hlavičce X-Model-Version. Zapíše i počet a dobu požadavků do metrik
+    (cesta podle pravidla Flasku, neznámé cesty jako 'other', aby počet štítků nerostl).
+    """
+    response.headers['X-Model-Version'] = current_model().version
+    if metrics.enabled:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'other'
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        if 'request_started' in g:
+            REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint)
+    return response
 
 @app.route('/')
 def index():
@@ -26,64 +193,66 @@ def index():
 @app.route('/form')
 def form():
     """
-    Zobrazí stránku s formulářem a načte možnosti karoserie, typu motoru a paliva ze souboru CSV.
-    """
-    body_types = set()
-    engine_types = set()
-    fuel_types = set()
-    with open('../static/form-data.csv', 'r', encoding='utf-8') as csvfile:  # Aktualizovaná cesta
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            body_types.add(row['Karoserie'])
-            engine_types.add(row['Motor'])
-            fuel_types.add(row['Palivo'])
-    return render_template(
-        'form.html',
-        body_types=sorted(body_types),
-        engine_types=sorted(engine_types),
-        fuel_types=sorted(fuel_types)
-    )
+    Zobrazí stránku s formulářem. Možnosti karoserie, typu motoru a paliva pocházejí z kategorií encoderu
+    a vykreslená stránka se posílá s ETag a Last-Modified, takže prohlížeč ji může znovu použít (304).
+    """
+    form_options = current_model().form_options
+    html, etag = form_options.render(lambda **options: render_template('form.html', **options))
+    response = make_response(html)
+    response.set_etag(etag)
+    response.last_modified = form_options.last_modified
+    response.cache_control.no_cache = True  # Prohlížeč se musí vždy zeptat, ale může dostat 304
+    return response.make_conditional(request)
 
 @app.route('/predict', methods=['POST'])
 def predict():
     """
     Zpracuje požadavek na predikci po odeslání formuláře.
     Načte vstupní data, předzpracuje je a použije trénovaný model pro predikci spotřeby paliva.
-    Predikce je uložena do CSV souboru a zároveň vrácena jako JSON odpověď.
-    """
-    # Načtení vstupních dat z formuláře
-    input_data = {
-        'Karoserie': request.form['body_type'],
-        'Motor': request.form['engine_type'],
-        'Palivo': request.form['fuel_type'],
-        'Výkon': float(request.form['horsepower']),
-        'Stáří vozidla': 2025 - int(request.form['year'])  # Výpočet stáří vozidla
-    }
-
-    # Zakódování kategoriálních proměnných pomocí encoderu
-    categorical_features = pd.DataFrame([input_data], columns=['Karoserie', 'Palivo', 'Motor'])
-    encoded_features = encoder.transform(categorical_features)
-
-    # Spojení zakódovaných kategoriálních s numerickými proměnnými
-    numerical_features = pd.DataFrame(
-        [[input_data['Výkon'], input_data['Stáří vozidla']]],
-        columns=['Výkon', 'Stáří vozidla']
-    )
+    Predikce je předána k zápisu do historie na pozadí a zároveň vrácena jako JSON odpověď.
+    Doba jednotlivých fází se zapisuje do metriky fuel_predict_stage_seconds.
+    """
+    timer = metrics.stage_timer(STAGE_SECONDS, '/predict')
 
-    # Získání názvů zakódovaných sloupců
-    encoded_feature_names = list(encoder.get_feature_names_out(['Karoserie', 'Palivo', 'Motor']))
+    # Načtení a ověření vstupních dat z formuláře (chybějící pole, NaN/nekonečno, výkon a rok mimo rozsah)
+    try:
+        cache_key = make_key(*validate_vehicle(request.form))
+    except ValueError as e:
+        VALIDATION_FAILURES.inc('/predict')
+        return jsonify({'error': str(e)}), 400
+    input_data = dict(zip(['Karoserie', 'Palivo', 'Motor', 'Výkon', 'Stáří vozidla'], cache_key))
+    bundle = current_model()
+    predicted_consumption = None
+    timer.lap('parse')
 
-    # Sloučení zakódovaných a numerických dat do jednoho DataFrame
-    processed_features = pd.concat(
-        [pd.DataFrame(encoded_features, columns=encoded_feature_names), numerical_features],
-        axis=1
-    )
+    # V režimu 'lookup' se predikce čte přímo z tabulky, vstupy mimo tabulku počítá model
+    if bundle.lookup_table is not None:
+        predicted_consumption = bundle.lookup_table.predict(*cache_key)
+        if predicted_consumption is not None:
+            predicted_consumption = round(predicted_consumption, 1)
+        LOOKUP_TABLE_LOOKUPS.inc('miss' if predicted_consumption is None else 'hit')
+        timer.lap('lookup')
 
-    # Zajištění, že názvy sloupců jsou typu string (kvůli kompatibilitě s modelem)
-    processed_features.columns = processed_features.columns.astype(str)
+    # Opakované konfigurace se vrací z cache bez encoderu a bez průchodu lesem
+    if predicted_consumption is None and prediction_cache:
+        predicted_consumption = prediction_cache.get((bundle.version, cache_key))
+        CACHE_LOOKUPS.inc('miss' if predicted_consumption is None else 'hit')
+        timer.lap('cache')
 
-    # Predikce spotřeby paliva pomocí modelu
-    predicted_consumption = round(model.predict(processed_features)[0], 1)
+    if predicted_consumption is None:
+        # Neznámé kategorie encoder (handle_unknown='ignore') tiše zakóduje jako nuly – jen se započítají
+        if metrics.enabled:
+            for col, mapping, value in zip(CATEGORICAL_COLS, bundle.category_index, cache_key):
+                if value not in mapping:
+                    UNKNOWN_CATEGORIES.inc(INPUT_FIELDS[col])
+        # Zakódování do předalokovaného řádku a predikce spotřeby paliva pomocí modelu
+        row = bundle.fast_predictor.encode_one(*cache_key)
+        timer.lap('encode')
+        predicted_consumption = round(float(forest_predict(bundle.model, row)[0]), 1)
+        PREDICTED_ROWS.inc('/predict')
+        timer.lap('predict')
+        if prediction_cache:
+            prediction_cache.put((bundle.version, cache_key), predicted_consumption)
 
     # Příprava odpovědi
     prediction = {
@@ -96,29 +265,229 @@ def predict():
 
     predictions.append(prediction)
 
-    # Uložení predikce do CSV souboru
-    with open('../static/predictions.csv', 'a', newline='', encoding='utf-8') as csvfile:  # Aktualizovaná cesta
-        writer = csv.DictWriter(csvfile, fieldnames=prediction.keys())
-        if csvfile.tell() == 0:  # Pokud je soubor prázdný, zapíšeme hlavičku
-            writer.writeheader()
-        writer.writerow(prediction)
+    # Uložení predikce do historie – zapíše ji vlákno na pozadí v dávce
+    prediction_log.append(dict(prediction, created_at=time.time()))
+    timer.lap('store')
+
+    response = jsonify({'fuel_consumption': predicted_consumption, 'model_version': bundle.version})
+    timer.lap('response')
+    return response
+
+def read_batch_columns():
+    """
+    Načte dávku vozidel z požadavku – buď jako JSON pole objektů, nebo jako nahraný CSV soubor (pole 'file').
+    Vrací slovník sloupců podle BATCH_FIELDS. Při chybném vstupu vyhodí ValueError.
+    """
+    if 'file' in request.files:
+        # CSV soubor se stejnými názvy sloupců jako pole formuláře
+        upload = io.TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig')
+        df = pd.read_csv(upload, dtype=str)
+        missing = [field for field in BATCH_FIELDS if field not in df.columns]
+        if missing:
+            raise ValueError(f"Chybí sloupce: {', '.join(missing)}")
+        return {field: df[field].to_numpy() for field in BATCH_FIELDS}
+
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        raise ValueError('Očekáváno JSON pole vozidel nebo CSV soubor v poli "file".')
+    try:
+        return {field: [record[field] for record in records] for field in BATCH_FIELDS}
+    except (KeyError, TypeError) as e:
+        raise ValueError(f'Neplatný záznam v dávce: {e}')
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch_route():
+    """
+    Zpracuje dávkovou predikci pro mnoho vozidel najednou (JSON pole nebo CSV upload).
+    Všechna vozidla se zakódují jedním průchodem v NumPy a model se zavolá jednou pro každý blok řádků.
+    Dávkové predikce se neukládají do historie predikcí.
+    """
+    start = time.perf_counter()
+    timer = metrics.stage_timer(STAGE_SECONDS, '/predict/batch')
+    bundle = current_model()
+    try:
+        columns = read_batch_columns()
+        n_rows = len(columns['year'])
+        if n_rows == 0:
+            raise ValueError('Dávka je prázdná.')
+        if n_rows > MAX_BATCH_ROWS:
+            VALIDATION_FAILURES.inc('/predict/batch')
+            return jsonify({'error': f'Dávka může obsahovat nejvýše {MAX_BATCH_ROWS} řádků.'}), 413
+        columns = validate_batch(columns)
+        timer.lap('parse')
+        X = encode_batch(bundle.category_index, bundle.n_encoded, columns)
+    except ValueError as e:
+        VALIDATION_FAILURES.inc('/predict/batch')
+        return jsonify({'error': str(e)}), 400
+    if metrics.enabled:
+        for field, count in count_unknown(bundle.category_index, columns).items():
+            if count:
+                UNKNOWN_CATEGORIES.inc(field, amount=count)
+    timer.lap('encode')
+
+    predicted = np.round(predict_batch(bundle.model, bundle.feature_names, X), 1)
+    PREDICTED_ROWS.inc('/predict/batch', amount=n_rows)
+    timer.lap('predict')
+    elapsed = time.perf_counter() - start
+
+    return jsonify({
+        'fuel_consumption': predicted.tolist(),
+        'rows': n_rows,
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'rows_per_second': round(n_rows / elapsed, 1),
+        'model_version': bundle.version
+    })
+
+@app.route('/stats')
+def stats():
+    """
+    Vrátí statistiky cache predikcí (zásahy, výpadky, počet položek) jako JSON.
+    """
+    return jsonify({
+        'prediction_cache': prediction_cache.stats() if prediction_cache else None,
+        'prediction_log': prediction_log.stats()
+    })
+
+@app.route('/ready')
+def ready():
+    """
+    Readiness probe: 200, pokud je model načtený a zahřátý, zapisovač historie běží a databáze odpovídá,
+    jinak 503 se seznamem problémů. Vrací i PID workeru, dobu studeného startu a paměť procesu.
+    """
+    problems = []
+    if not prediction_log.is_alive():
+        problems.append('Zapisovač historie predikcí neběží.')
+    try:
+        prediction_store.is_empty()
+    except sqlite3.Error as e:
+        problems.append(f'Databáze historie není dostupná: {e}')
+    body = {
+        'status': 'not ready' if problems else 'ready',
+        'pid': os.getpid(),
+        'model': os.path.basename(current_model().model_path),
+        'model_version': current_model().version,
+        'startup_s': STARTUP_S,
+        'memory_mb': memory_usage()
+    }
+    if problems:
+        body['problems'] = problems
+        return jsonify(body), 503
+    return jsonify(body)
+
+@app.route('/metrics')
+def metrics_route():
+    """
+    Metriky ve formátu Prometheus (počty a doby požadavků, doby fází predikce, cache, chyby vstupu,
+    neznámé kategorie). U gunicornu sečtené přes všechny workery (METRICS_DIR). 404, pokud je měření vypnuté.
+    """
+    if not metrics.enabled:
+        return jsonify({'error': 'Metriky jsou vypnuté (METRICS_ENABLED=0).'}), 404
+    update_info_metrics(current_model())
+    return metrics.render(), 200, {'Content-Type': METRICS_CONTENT_TYPE}
+
+@app.route('/model')
+def model_info():
+    """
+    Vrátí aktuální verzi modelu, předchozí verze načtené v paměti, dostupné verze a zafixovanou verzi.
+    """
+    return jsonify(registry.describe())
+
+@app.route('/model/rollback', methods=['POST'])
+def model_rollback():
+    """
+    Okamžitý návrat k předchozí verzi modelu (už načtené v paměti). Ostatní workery ji převezmou
+    při další kontrole registru. Nové verze se pak neaktivují, dokud se nezavolá /model/activate s 'latest'.
+    """
+    try:
+        bundle = registry.rollback()
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 409
+    g.model_bundle = bundle
+    return jsonify(registry.describe())
+
+@app.route('/model/activate', methods=['POST'])
+def model_activate():
+    """
+    Nastaví verzi modelu, která má být aktivní (JSON {"version": "..."}, 'latest' = vždy nejnovější).
+    Verze se načte a zahřeje na pozadí, odpověď 202 se vrací hned.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        registry.activate(str(data.get('version', 'latest')))
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    return jsonify(registry.describe()), 202
+
+def parse_time(value, end_of_day=False):
+    """
+    Převede čas ve formátu ISO 8601 (např. 2025-04-10 nebo 2025-04-10T12:00) na unixový čas.
+    Samotné datum znamená začátek dne, s `end_of_day=True` začátek dne následujícího – horní mez `until`
+    je výlučná, takže until=2025-04-10 zahrne celý 10. duben. Prázdná hodnota vrátí None, neplatná vyhodí ValueError.
+    """
+    if not value:
+        return None
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+    start = datetime.combine(day, datetime.min.time())
+    return (start + timedelta(days=1) if end_of_day else start).timestamp()
 
-    return jsonify({'fuel_consumption': predicted_consumption})
+def query_predictions():
+    """
+    Načte jednu stránku historie podle parametrů požadavku (cursor, limit, filtry, since, until).
+    """
+    return prediction_store.page(
+        cursor=request.args.get('cursor', type=int),
+        limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+        filters={field: request.args.get(field) for field in FILTER_FIELDS},
+        since=parse_time(request.args.get('since')),
+        until=parse_time(request.args.get('until'), end_of_day=True)
+    )
 
 @app.route('/predictions')
 def show_predictions():
     """
-    Zobrazí stránku s historií všech předchozích predikcí, které byly provedeny a uloženy do CSV souboru.
+    Zobrazí stránku s historií předchozích predikcí uložených v databázi.
+    Stránky se načítají kurzorem (id posledního záznamu), takže doba načtení nezávisí na velikosti historie.
+    """
+    try:
+        rows, next_cursor = query_predictions()
+    except ValueError as e:
+        return render_template('predictions.html', predictions=[], error=str(e), filters={}, options={}), 400
+    for row in rows:
+        row['created_at'] = datetime.fromtimestamp(row['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+    filters = {
+        field: request.args[field] for field in FILTER_FIELDS + ['since', 'until', 'limit'] if request.args.get(field)
+    }
+    form_options = current_model().form_options
+    form_options.reload_if_changed()
+    options = {
+        'body_type': form_options.options['body_types'],
+        'fuel_type': form_options.options['fuel_types'],
+        'engine_type': form_options.options['engine_types']
+    }
+    return render_template(
+        'predictions.html',
+        predictions=rows,
+        next_cursor=next_cursor,
+        filters=filters,
+        options=options
+    )
+
+@app.route('/api/predictions')
+def api_predictions():
+    """
+    Vrátí stránku historie predikcí jako JSON se stejnými parametry jako /predictions.
     """
-    saved_predictions = []
-    with open('../static/predictions.csv', 'r', encoding='utf-8') as csvfile:  # Aktualizovaná cesta
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            saved_predictions.append(row)
-    return render_template('predictions.html', predictions=saved_predictions)
+    try:
+        rows, next_cursor = query_predictions()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'predictions': rows, 'next_cursor': next_cursor})
 
 if __name__ == '__main__':
     """
-    Spustí Flask aplikaci v debug režimu.
+    Spustí Flask aplikaci v debug režimu (vývojový server). Pro produkci viz serve.py.
     """
     app.run(debug=True)
@@ -0,0 +1,204 @@
+"""ASGI verze predikčního API (/predict) se slučováním souběžných požadavků do mikro-dávek.
+Model, encoder, registr verzí, cache a historii predikcí sdílí s Flask aplikací (app.py). Požadavky,
+které nenajdou výsledek v lookup tabulce ani v cache, se předají MicroBatcheru (micro_batcher.py):
+souběžné požadavky se během okna MICRO_BATCH_WAIT_MS milisekund (nebo do MICRO_BATCH_MAX_SIZE vozidel)
+sloučí do jedné matice a les se vyhodnotí jedním voláním v pracovním vlákně místo jednoho volání na řádek.
+
+Endpointy: POST /predict (formulář nebo JSON se stejnými poli jako ve Flask aplikaci), GET /ready, GET /stats.
+
+Spuštění (ze složky app/):
+    python serve.py --asgi                                          # gunicorn s ASGI workery
+    MICRO_BATCH_MAX_SIZE=128 MICRO_BATCH_WAIT_MS=5 python serve.py --asgi
+    uvicorn asgi_app:app --port 8000                                # nebo libovolný jiný ASGI server
+    python load_test_asgi.py                                        # srovnání propustnosti s Flask
+"""
+
+import json
+import os
+import time
+import urllib.parse
+
+import app as web
+from inference import validate_vehicle
+from micro_batcher import MicroBatcher
+from prediction_cache import make_key
+from process_stats import memory_usage
+
+# Okno sběru dávky v milisekundách a největší počet vozidel v jedné dávce (1 = bez dávkování)
+MICRO_BATCH_WAIT_MS = float(os.environ.get('MICRO_BATCH_WAIT_MS', 2))
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', 64))
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+def predict_vehicles(vehicles):
+    """
+    Vyhodnotí dávku vozidel aktuální verzí modelu. Běží v pracovním vlákně MicroBatcheru.
+    Vrací pro každé vozidlo dvojici (spotřeba, verze modelu).
+    """
+    bundle = web.registry.current
+    values = bundle.fast_predictor.predict_many(vehicles)
+    return [(round(float(value), 1), bundle.version) for value in values]
+
+
+batcher = MicroBatcher(predict_vehicles, max_batch_size=MICRO_BATCH_MAX_SIZE, max_wait_ms=MICRO_BATCH_WAIT_MS)
+
+
+def parse_body(headers, body):
+    """
+    Načte pole z těla požadavku – JSON objekt nebo formulář (application/x-www-form-urlencoded).
+    """
+    content_type = headers.get(b'content-type', b'').decode('latin-1')
+    if content_type.startswith('application/json'):
+        try:
+            fields = json.loads(body)
+        except ValueError:
+            raise ValueError('Neplatný JSON.')
+        if not isinstance(fields, dict):
+            raise ValueError('Očekáván JSON objekt vozidla.')
+        return fields
+    return {key: values[0] for key, values in urllib.parse.parse_qs(body.decode('utf-8')).items()}
+
+
+async def predict(vehicle):
+    """
+    Predikce jednoho ověřeného vozidla (klíč z make_key): lookup tabulka, cache a jinak mikro-dávka.
+    Vrací (spotřeba, verze modelu).
+    """
+    bundle = web.registry.current
+    if bundle.lookup_table is not None:
+        value = bundle.lookup_table.predict(*vehicle)
+        if value is not None:
+            return round(value, 1), bundle.version
+    if web.prediction_cache:
+        value = web.prediction_cache.get((bundle.version, vehicle))
+        if value is not None:
+            return value, bundle.version
+
+    value, version = await batcher.submit(vehicle)
+    if web.prediction_cache:
+        web.prediction_cache.put((version, vehicle), value)
+    return value, version
+
+
+async def read_body(receive):
+    """
+    Načte celé tělo požadavku (i po částech). Příliš velké tělo vyhodí ValueError.
+    """
+    chunks = []
+    size = 0
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            raise ConnectionError('Klient ukončil spojení.')
+        chunks.append(message.get('body', b''))
+        size += len(chunks[-1])
+        if size > MAX_BODY_BYTES:
+            raise ValueError('Tělo požadavku je příliš velké.')
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+async def send_json(send, status, body, version=None):
+    payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    headers = [(b'content-type', b'application/json'), (b'content-length', str(len(payload)).encode())]
+    if version is not None:
+        headers.append((b'x-model-version', version.encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+async def handle_predict(scope, receive, send):
+    """
+    POST /predict – stejná odpověď jako Flask /predict; predikce se zapíše do historie na pozadí.
+    """
+    try:
+        body = await read_body(receive)
+        fields = parse_body(dict(scope['headers']), body)
+        vehicle = make_key(*validate_vehicle(fields))  # Stejné ověření vstupu jako Flask /predict
+        value, version = await predict(vehicle)
+    except ValueError as e:
+        web.VALIDATION_FAILURES.inc('/predict')
+        return await send_json(send, 400, {'error': str(e)})
+    except ConnectionError:
+        return
+
+    prediction = {
+        'body_type': vehicle[0],
+        'engine_type': vehicle[2],
+        'fuel_type': vehicle[1],
+        'horsepower': vehicle[3],
+        'fuel_consumption': value
+    }
+    web.predictions.append(prediction)
+    web.prediction_log.append(dict(prediction, created_at=time.time()))
+    await send_json(send, 200, {'fuel_consumption': value, 'model_version': version}, version)
+
+
+async def handle_ready(scope, receive, send):
+    """
+    GET /ready – 200, pokud běží zapisovač historie a sběr mikro-dávek, jinak 503.
+    """
+    problems = []
+    if not web.prediction_log.is_alive():
+        problems.append('Zapisovač historie predikcí neběží.')
+    bundle = web.registry.current
+    body = {
+        'status': 'not ready' if problems else 'ready',
+        'pid': os.getpid(),
+        'model': os.path.basename(bundle.model_path),
+        'model_version': bundle.version,
+        'startup_s': web.STARTUP_S,
+        'memory_mb': memory_usage()
+    }
+    if problems:
+        body['problems'] = problems
+    await send_json(send, 503 if problems else 200, body, bundle.version)
+
+
+async def handle_stats(scope, receive, send):
+    """
+    GET /stats – statistiky mikro-dávek, cache a zápisu historie.
+    """
+    await send_json(send, 200, {
+        'micro_batch': batcher.stats(),
+        'prediction_cache': web.prediction_cache.stats() if web.prediction_cache else None,
+        'prediction_log': web.prediction_log.stats()
+    })
+
+
+ROUTES = {
+    ('POST', '/predict'): handle_predict,
+    ('GET', '/ready'): handle_ready,
+    ('GET', '/stats'): handle_stats
+}
+
+
+async def lifespan(receive, send):
+    """
+    Start a ukončení workeru: sběr mikro-dávek běží ve smyčce událostí serveru.
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            batcher.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await batcher.stop()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """
+    ASGI aplikace.
+    """
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        known = any(path == scope['path'] for _, path in ROUTES)
+        return await send_json(send, 405 if known else 404, {'error': 'Metoda není povolena.' if known else 'Nenalezeno.'})
+    await handler(scope, receive, send)
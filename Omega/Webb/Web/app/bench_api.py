@@ -0,0 +1,281 @@
+"""Benchmark predikčního API pod zátěží: propustnost, latence (p50/p95/p99) a chyby jako JSON.
+Spustí aplikaci lokálně na volném portu (nebo použije běžící server z `--url`) a přehraje realistickou směs
+požadavků: vozidla se vybírají náhodně (s opakováním, tedy ve stejném poměru jako v datech) z vyčištěných dat
+crawleru doopravdy_hotove_auta.csv a posílají na /predict, mezi ně se mísí /form a /predictions (stránky
+historie s filtrem karoserie i bez). Směs endpointů, počet souběžných klientů i proměnné prostředí serveru
+jsou nastavitelné, takže lze porovnat každý režim obsluhy a vrstvu cache a hlídat regrese proti uloženému
+výsledku (`--baseline`).
+
+Servery:
+    flask     – app.py ve vývojovém serveru Flask (python -m flask --app app run), vlákno na požadavek
+    gunicorn  – serve.py (pre-fork gunicorn, WEB_CONCURRENCY workerů)
+    asgi      – serve.py --asgi (asgi_app.py umí jen /predict, ostatní endpointy se ze směsi vynechají)
+
+Spuštění (ze složky app/):
+    python bench_api.py --output bench.json
+    python bench_api.py --server gunicorn --concurrency 16 --duration 30 --env PREDICTION_CACHE_SIZE=0
+    python bench_api.py --env SERVING_MODE=lookup --baseline bench.json      # srovnání s uloženým během
+    python bench_api.py --url http://localhost:5000 --mix predict=1          # už běžící server
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+
+import numpy as np
+
+from features import CURRENT_YEAR, SOURCE_CSV, read_source
+from serve import free_port, wait_ready
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVERS = ['flask', 'gunicorn', 'asgi']
+ASGI_ENDPOINTS = {'predict'}
+DEFAULT_MIX = 'predict=8,form=1,predictions=1'
+REGRESSION_TOLERANCE = 0.10  # Povolené zhoršení p95 a propustnosti proti baseline (10 %)
+
+
+def parse_mix(text):
+    """
+    Převede směs endpointů 'predict=8,form=1,predictions=1' na slovník vah.
+    """
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ('predict', 'form', 'predictions'):
+            raise ValueError(f'Neznámý endpoint ve směsi: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def load_vehicles(source=SOURCE_CSV):
+    """
+    Vozidla z vyčištěných dat crawleru jako pole formuláře /predict.
+    """
+    df = read_source(source)
+    return [
+        {
+            'body_type': body_type, 'engine_type': engine_type, 'fuel_type': fuel_type,
+            'horsepower': str(power), 'year': str(int(CURRENT_YEAR - age))
+        }
+        for body_type, fuel_type, engine_type, power, age in zip(
+            df['Karoserie'], df['Palivo'], df['Motor'], df['Výkon'], df['Stáří vozidla']
+        )
+    ]
+
+
+def build_schedule(vehicles, mix, n, seed=42):
+    """
+    Předem vygeneruje posloupnost n požadavků (endpoint, metoda, cesta, tělo), aby byl každý běh stejný.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    body_types = sorted({vehicle['body_type'] for vehicle in vehicles})
+    schedule = []
+    for name in rng.choices(names, weights, k=n):
+        if name == 'predict':
+            body = urllib.parse.urlencode(rng.choice(vehicles)).encode()
+            schedule.append((name, '/predict', body))
+        elif name == 'form':
+            schedule.append((name, '/form', None))
+        else:
+            query = {'limit': 50}
+            if rng.random() < 0.5:
+                query['body_type'] = rng.choice(body_types)
+            schedule.append((name, '/predictions?' + urllib.parse.urlencode(query), None))
+    return schedule
+
+
+def start_server(server, env_overrides, db_path):
+    """
+    Spustí aplikaci na volném portu a počká na /ready. Vrátí proces a základní URL.
+    """
+    port = free_port()
+    env = dict(os.environ, BIND=f'127.0.0.1:{port}', PREDICTIONS_DB=db_path, MODEL_REGISTRY_POLL='0', **env_overrides)
+    if server == 'flask':
+        args = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--no-reload', '--no-debugger']
+    else:
+        args = [sys.executable, os.path.join(APP_DIR, 'serve.py')] + (['--asgi'] if server == 'asgi' else [])
+    process = subprocess.Popen(args, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    wait_ready(f'{base_url}/ready', process)
+    return process, base_url
+
+
+def replay(base_url, schedule, concurrency, duration=None):
+    """
+    Přehraje požadavky z `concurrency` vláken. S `duration` se posloupnost opakuje, dokud neuplyne čas.
+    Vrátí latence po endpointech, chyby po endpointech ({stav nebo výjimka: počet}) a celkovou dobu.
+    """
+    latencies = {name: [] for name, _, _ in schedule}
+    errors = {name: Counter() for name in latencies}
+    lock = threading.Lock()
+    next_index = [0]
+    deadline = time.perf_counter() + duration if duration else None
+
+    def client():
+        while True:
+            with lock:
+                i = next_index[0]
+                next_index[0] += 1
+            if deadline is None and i >= len(schedule):
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            name, path, body = schedule[i % len(schedule)]
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + path, body, timeout=30) as response:
+                    response.read()
+                error = None
+            except urllib.error.HTTPError as e:
+                error = str(e.code)
+            except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+                error = type(getattr(e, 'reason', e)).__name__
+            elapsed = time.perf_counter() - start
+            with lock:
+                if error is None:
+                    latencies[name].append(elapsed)
+                else:
+                    errors[name][error] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def summarize(latencies, errors, total_s):
+    """
+    Statistiky jednoho endpointu (nebo všech dohromady): počet, chyby, propustnost a percentily latence v ms.
+    """
+    ms = np.array(latencies) * 1000
+    n_errors = sum(errors.values())
+    result = {
+        'requests': len(latencies) + n_errors,
+        'errors': n_errors,
+        'error_rate': round(n_errors / max(len(latencies) + n_errors, 1), 4),
+        'errors_by_kind': dict(errors),
+        'throughput_rps': round(len(latencies) / total_s, 1)
+    }
+    if len(ms):
+        result.update({
+            'latency_mean_ms': round(float(ms.mean()), 2),
+            'latency_p50_ms': round(float(np.percentile(ms, 50)), 2),
+            'latency_p95_ms': round(float(np.percentile(ms, 95)), 2),
+            'latency_p99_ms': round(float(np.percentile(ms, 99)), 2),
+            'latency_max_ms': round(float(ms.max()), 2)
+        })
+    return result
+
+
+def compare(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Porovná report s uloženým během. Vrátí seznam regresí (horší p95 nebo propustnost o víc než `tolerance`,
+    nebo víc chyb).
+    """
+    regressions = []
+    for name, current in report['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if previous is None:
+            continue
+        if 'latency_p95_ms' in current and 'latency_p95_ms' in previous \
+                and current['latency_p95_ms'] > previous['latency_p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['latency_p95_ms']} → {current['latency_p95_ms']} ms")
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: propustnost {previous['throughput_rps']} → {current['throughput_rps']} req/s")
+        if current['error_rate'] > previous['error_rate']:
+            regressions.append(f"{name}: chybovost {previous['error_rate']} → {current['error_rate']}")
+    return regressions
+
+
+def print_report(report):
+    print(f"\n{'endpoint':<12} {'požadavky':>9} {'chyby':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, stats in list(report['endpoints'].items()) + [('celkem', report['total'])]:
+        print(f"{name:<12} {stats['requests']:9d} {stats['errors']:6d} {stats['throughput_rps']:8.1f} "
+              f"{stats.get('latency_p50_ms', float('nan')):8.2f} {stats.get('latency_p95_ms', float('nan')):8.2f} "
+              f"{stats.get('latency_p99_ms', float('nan')):8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zátěžový benchmark /predict, /form a /predictions s JSON reportem.')
+    parser.add_argument('--server', choices=SERVERS, default='flask', help='Jak spustit aplikaci')
+    parser.add_argument('--url', help='Použít už běžící server místo spuštění vlastního')
+    parser.add_argument('--concurrency', type=int, default=8, help='Počet souběžných klientů')
+    parser.add_argument('--requests', type=int, default=2000, help='Počet požadavků (bez --duration)')
+    parser.add_argument('--duration', type=float, help='Délka měření v sekundách místo pevného počtu požadavků')
+    parser.add_argument('--warmup', type=int, default=100, help='Počet zahřívacích požadavků před měřením')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Váhy endpointů (výchozí {DEFAULT_MIX})')
+    parser.add_argument('--env', action='append', default=[], metavar='KLÍČ=HODNOTA',
+                        help='Proměnná prostředí spouštěného serveru (např. SERVING_MODE=lookup), lze opakovat')
+    parser.add_argument('--source', default=SOURCE_CSV, help='CSV s vozidly (výchozí data crawleru)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Uložit report jako JSON')
+    parser.add_argument('--baseline', help='JSON report předchozího běhu; při regresi skončí s kódem 1')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.server == 'asgi' and not args.url:
+        mix = {name: weight for name, weight in mix.items() if name in ASGI_ENDPOINTS}
+    env_overrides = dict(item.split('=', 1) for item in args.env)
+    vehicles = load_vehicles(args.source)
+    schedule = build_schedule(vehicles, mix, args.requests, args.seed)
+    print(f"📦 {len(vehicles)} vozidel z {os.path.basename(args.source)}, směs {mix}, {args.concurrency} klientů")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        base_url = args.url
+        if base_url is None:
+            process, base_url = start_server(args.server, env_overrides, os.path.join(tmp, 'predictions.db'))
+        try:
+            replay(base_url, schedule[:args.warmup], args.concurrency)
+            latencies, errors, total_s = replay(base_url, schedule, args.concurrency, args.duration)
+        finally:
+            if process is not None:
+                process.send_signal(signal.SIGTERM)
+                process.wait(timeout=60)
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'server': 'external' if args.url else args.server,
+        'env': env_overrides,
+        'concurrency': args.concurrency,
+        'mix': mix,
+        'duration_s': round(total_s, 3),
+        'endpoints': {name: summarize(latencies[name], errors[name], total_s) for name in latencies},
+        'total': summarize(
+            [value for values in latencies.values() for value in values],
+            sum(errors.values(), Counter()), total_s
+        )
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Report uložen do {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f))
+        if regressions:
+            print("\n❌ Regrese proti " + args.baseline + ":\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print(f"\n✅ Bez regrese proti {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark kompaktního formátu lesa (flat_forest.py) proti predict ze sklearn.
+Pro několik velikostí dávky ověří, že se výstupy shodují, a vypíše časy, zrychlení a počet různých buněk
+(řádků s jinými výsledky podmínek lesa), které FlatForest skutečně vyhodnotí. Vstupy jsou vozidla vybraná
+náhodně z dat crawleru (skutečná dávka, hodně opakování) a zcela náhodné vstupy (nejhorší případ – skoro
+každý řádek je jiná buňka, takže u velkých dávek se průchod stromy v NumPy jen vyrovná sklearn).
+
+Spuštění (ze složky app/):
+    python bench_flat_forest.py --batch-sizes 1 100 10000 100000
+    python bench_flat_forest.py --inputs random
+"""
+
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+
+from bench_api import load_vehicles
+from compress_model import random_inputs
+from flat_forest import compile_forest
+from inference import INPUT_FIELDS, build_category_index, encode_batch
+
+
+def vehicle_inputs(encoder, vehicles, n_rows, seed=42):
+    """
+    Zakóduje `n_rows` vozidel vybraných náhodně ze seznamu `vehicles` (pole formuláře /predict).
+    """
+    rng = np.random.default_rng(seed)
+    sample = [vehicles[i] for i in rng.integers(0, len(vehicles), n_rows)]
+    fields = list(INPUT_FIELDS.values()) + ['horsepower', 'year']
+    columns = {field: [vehicle[field] for vehicle in sample] for field in fields}
+    category_index, n_encoded = build_category_index(encoder)
+    return encode_batch(category_index, n_encoded, columns)
+
+
+def best_time(func, repeats):
+    """
+    Vrátí nejlepší čas z `repeats` opakování v milisekundách.
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Porovnání sklearn predict a FlatForest.predict.')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100, 10000, 100000])
+    parser.add_argument('--inputs', nargs='+', choices=['crawler', 'random'], default=['crawler', 'random'])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--model', default='random_forest.pkl')
+    parser.add_argument('--encoder', default='encoder.pkl')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(args.model)
+    encoder = joblib.load(args.encoder)
+    flat = compile_forest(model)
+    vehicles = load_vehicles() if 'crawler' in args.inputs else None
+
+    for inputs in args.inputs:
+        for n_rows in args.batch_sizes:
+            X = vehicle_inputs(encoder, vehicles, n_rows) if inputs == 'crawler' else random_inputs(encoder, n_rows)
+            expected = model.predict(X)
+            actual = flat.predict(X)
+            assert np.allclose(expected, actual, rtol=0, atol=1e-9), np.abs(expected - actual).max()
+            cells = np.unique(np.packbits(flat.conditions(X), axis=0), axis=1).shape[1]
+
+            repeats = max(1, min(args.repeats, 100_000 // n_rows))  # Velké dávky stačí změřit méněkrát
+            sklearn_ms = best_time(lambda: model.predict(X), repeats)
+            flat_ms = best_time(lambda: flat.predict(X), repeats)
+            print(f'{inputs:<7} {n_rows:>7} řádků ({cells:>6} buněk) | sklearn: {sklearn_ms:9.3f} ms | '
+                  f'flat: {flat_ms:9.3f} ms | zrychlení: {sklearn_ms / flat_ms:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Mikro-benchmark predikce jednoho vozidla.
+Porovnává latenci (p50/p99) původní cesty přes pandas DataFrame a encoder.transform
+s rychlou cestou FastPredictor, která vyplňuje předalokovaný NumPy řádek.
+
+Spuštění (ze složky app/):
+    python bench_predict.py --iterations 2000
+"""
+
+import argparse
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from inference import CATEGORICAL_COLS, CURRENT_YEAR, FastPredictor
+
+# Ukázkové vstupy, mezi kterými benchmark střídá
+SAMPLE_INPUTS = [
+    ('SUV', 'Diesel', 'I4', 110.0, 2018),
+    ('Combi', 'Benzín', 'I3', 70.0, 2021),
+    ('Sedan', 'Diesel', 'I6', 190.0, 2012),
+    ('Hatchback', 'Benzín', 'I4', 85.0, 2016),
+]
+
+
+def pandas_predict(model, encoder, body_type, fuel_type, engine_type, power, year):
+    """
+    Původní cesta z app.py: DataFrame pro kategorie, encoder.transform, pd.concat a model.predict.
+    """
+    input_data = {
+        'Karoserie': body_type,
+        'Motor': engine_type,
+        'Palivo': fuel_type,
+        'Výkon': power,
+        'Stáří vozidla': CURRENT_YEAR - year
+    }
+    categorical_features = pd.DataFrame([input_data], columns=CATEGORICAL_COLS)
+    encoded_features = encoder.transform(categorical_features)
+    numerical_features = pd.DataFrame(
+        [[input_data['Výkon'], input_data['Stáří vozidla']]],
+        columns=['Výkon', 'Stáří vozidla']
+    )
+    encoded_feature_names = list(encoder.get_feature_names_out(CATEGORICAL_COLS))
+    processed_features = pd.concat(
+        [pd.DataFrame(encoded_features, columns=encoded_feature_names), numerical_features],
+        axis=1
+    )
+    processed_features.columns = processed_features.columns.astype(str)
+    return model.predict(processed_features)[0]
+
+
+def measure(func, iterations):
+    """
+    Spustí funkci `iterations`-krát nad ukázkovými vstupy a vrátí latence v milisekundách.
+    """
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        args = SAMPLE_INPUTS[i % len(SAMPLE_INPUTS)]
+        start = time.perf_counter()
+        func(*args)
+        latencies[i] = (time.perf_counter() - start) * 1000
+    return latencies
+
+
+def report(name, latencies):
+    """
+    Vypíše p50/p99 a průměrnou latenci.
+    """
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f'{name:<10} p50: {p50:.3f} ms | p99: {p99:.3f} ms | průměr: {latencies.mean():.3f} ms')
+    return p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Porovnání latence pandas a NumPy cesty predikce.')
+    parser.add_argument('--iterations', type=int, default=1000, help='Počet měřených predikcí pro každou cestu')
+    parser.add_argument('--model', default='random_forest.pkl')
+    parser.add_argument('--encoder', default='encoder.pkl')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(args.model)
+    encoder = joblib.load(args.encoder)
+    fast = FastPredictor(model, encoder)
+
+    def fast_predict(body_type, fuel_type, engine_type, power, year):
+        return fast.predict_one(body_type, fuel_type, engine_type, power, CURRENT_YEAR - year)
+
+    def slow_predict(*inputs):
+        return pandas_predict(model, encoder, *inputs)
+
+    # Kontrola, že obě cesty vracejí stejné hodnoty
+    for inputs in SAMPLE_INPUTS:
+        assert np.isclose(slow_predict(*inputs), fast_predict(*inputs)), inputs
+
+    # Zahřátí obou cest před měřením
+    measure(slow_predict, 20)
+    measure(fast_predict, 20)
+
+    slow_p50, slow_p99 = report('pandas', measure(slow_predict, args.iterations))
+    fast_p50, fast_p99 = report('numpy', measure(fast_predict, args.iterations))
+    print(f'Zrychlení p50: {slow_p50 / fast_p50:.1f}x | p99: {slow_p99 / fast_p99:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""Model HistGradientBoostingRegressor s nativními kategoriemi (Karoserie, Palivo, Motor).
+Kategorie se modelu předávají jako kódy (jeden sloupec na kategorii), ne jako one-hot sloupce.
+Obal CategoricalBoosting přijímá stejnou one-hot matici jako Random Forest, takže ho app.py
+(FastPredictor, dávková predikce, lookup tabulka) obsluhuje beze změny: z každého one-hot bloku
+vezme index jedničky a neznámou kategorii (samé nuly) předá jako chybějící hodnotu.
+
+Po natrénování se stromy převedou do plochých NumPy polí (podobně jako flat_forest.py) a predikce
+prochází všechny stromy najednou po úrovních. Odpadá tak režie predict ze sklearn (validace vstupu,
+ColumnTransformer, smyčka přes stromy v Pythonu), která u jednoho řádku převažuje. Uložený soubor
+obsahuje jen plochá pole, ne objekt sklearn.
+
+Převod čte interní atributy sklearn (_preprocessor, _predictors, raw_left_cat_bitsets, _baseline_prediction),
+proto je ověřený jen pro verzi TESTED_SKLEARN a po každém převodu se shoda s predict sklearn kontroluje
+(verify) – s jinou verzí nebo při neshodě se model neuloží.
+
+Trénování a srovnání s Random Forest: train_boosting.py
+"""
+
+import numpy as np
+import sklearn
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+from features import CATEGORICAL_COLS
+
+TESTED_SKLEARN = '1.9'  # Verze sklearn (major.minor), jejíž vnitřní struktury _compile čte
+PARITY_TOLERANCE = 1e-6  # Povolená odchylka plochých polí od predict sklearn
+
+DEFAULT_PARAMS = {
+    'max_iter': 300,
+    'learning_rate': 0.1,
+    'max_leaf_nodes': 31,
+    'early_stopping': False,
+}
+
+
+class CategoricalBoosting:
+    """
+    HistGradientBoostingRegressor nad kódy kategorií s rozhraním predict pro one-hot matici z encoderu.
+    `categories` je seznam kategorií pro každý sloupec z CATEGORICAL_COLS ve stejném pořadí jako v encoderu.
+    """
+
+    def __init__(self, categories, random_state=42, **params):
+        self.categories = [list(values) for values in categories]
+        self.params = {**DEFAULT_PARAMS, **params}
+        self.model = HistGradientBoostingRegressor(
+            categorical_features=list(range(len(CATEGORICAL_COLS))),
+            random_state=random_state,
+            **self.params
+        )
+        sizes = [len(values) for values in self.categories]
+        self.offsets = np.cumsum([0] + sizes)  # Začátky one-hot bloků v matici z encoderu
+        self.n_encoded = int(self.offsets[-1])
+
+    def fit_codes(self, codes, numeric, y):
+        """
+        Natrénuje model přímo z kódů kategorií (n × 3) a číselných sloupců (n × 2) bez one-hot rozšíření
+        a převede ho do plochých polí.
+        """
+        self.model.fit(np.column_stack([codes, numeric]).astype(np.float64), y)
+        self._compile()
+        self.verify(self.one_hot(codes, numeric))
+        return self
+
+    def one_hot(self, codes, numeric):
+        """
+        Sestaví one-hot matici jako z encoderu z kódů kategorií (n × 3) a číselných sloupců (n × 2).
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        X = np.zeros((len(codes), self.n_encoded + np.shape(numeric)[1]))
+        for i, start in enumerate(self.offsets[:-1]):
+            X[np.arange(len(codes)), start + codes[:, i]] = 1.0
+        X[:, self.n_encoded:] = numeric
+        return X
+
+    def verify(self, X, tolerance=PARITY_TOLERANCE):
+        """
+        Ověří, že predict z plochých polí dává stejné výsledky jako sklearn, na řádcích X a na jejich kopiích
+        s neznámou kategorií (samé nuly v jednom one-hot bloku). Při neshodě vyhodí ValueError.
+        Vrací největší odchylku.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        sample = X[:200]
+        variants = [X]
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            unknown = sample.copy()
+            unknown[:, start:end] = 0.0
+            variants.append(unknown)
+        X = np.vstack(variants)
+        difference = float(np.max(np.abs(self.predict(X) - self.predict_sklearn(X))))
+        if difference > tolerance:
+            raise ValueError(f'Plochá pole se liší od predict sklearn o {difference:.6g} (povoleno {tolerance:g}).')
+        return difference
+
+    def _compile(self):
+        """
+        Převede natrénované stromy do plochých polí. Uzly všech stromů jsou v jednom poli, indexy potomků
+        jsou posunuté o začátek stromu. Kategoriální dělení je bitová maska
+        kategorií, které jdou doleva (kategorií je méně než 32, stačí jedno slovo uint32).
+        """
+        major_minor = '.'.join(sklearn.__version__.split('.')[:2])
+        if major_minor != TESTED_SKLEARN:
+            raise RuntimeError(
+                f'Převod je ověřený pro sklearn {TESTED_SKLEARN}.x, nainstalovaná je {sklearn.__version__}. '
+                f'Ověř vnitřní atributy HistGradientBoostingRegressor a uprav TESTED_SKLEARN.'
+            )
+        self.sklearn_version = sklearn.__version__
+        model = self.model
+        # sklearn kódy kategorií ještě přečísluje (OrdinalEncoder) – kategorie chybějící v trénovacích
+        # datech dostanou NaN, stejně jako neznámá kategorie
+        fitted_categories = model._preprocessor.named_transformers_['encoder'].categories_
+        self.remap = []
+        for values, fitted in zip(self.categories, fitted_categories):
+            remap = np.full(len(values) + 1, np.nan)  # Poslední položka = neznámá kategorie
+            remap[fitted.astype(int)] = np.arange(len(fitted))
+            self.remap.append(remap)
+
+        feature, threshold, left, right, value = [], [], [], [], []
+        is_leaf, is_categorical, missing_left, cat_bits, roots = [], [], [], [], []
+        offset = 0
+        for (predictor,) in model._predictors:
+            nodes = predictor.nodes
+            bitsets = predictor.raw_left_cat_bitsets
+            if len(bitsets) and bitsets[:, 1:].any():
+                raise ValueError('Kategoriální dělení s více než 32 kategoriemi není podporováno.')
+            leaf = nodes['is_leaf'].astype(bool)
+            roots.append(offset)
+            feature.append(nodes['feature_idx'].astype(np.int8))
+            threshold.append(nodes['num_threshold'])
+            left.append(nodes['left'].astype(np.int64) + offset)
+            right.append(nodes['right'].astype(np.int64) + offset)
+            value.append(np.where(leaf, nodes['value'], 0.0))
+            is_leaf.append(leaf)
+            is_categorical.append(nodes['is_categorical'].astype(bool))
+            missing_left.append(nodes['missing_go_to_left'].astype(bool))
+            cat_bits.append(bitsets[nodes['bitset_idx'], 0] if len(bitsets) else np.zeros(len(nodes), np.uint32))
+            offset += len(nodes)
+
+        self.feature = np.concatenate(feature)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.int32)
+        self.right = np.concatenate(right).astype(np.int32)
+        self.value = np.concatenate(value)
+        self.is_leaf = np.concatenate(is_leaf)
+        self.is_categorical = np.concatenate(is_categorical)
+        self.missing_left = np.concatenate(missing_left)
+        self.cat_bits = np.concatenate(cat_bits).astype(np.int64)
+        self.roots = np.array(roots, dtype=np.int32)
+        self.baseline = float(np.ravel(model._baseline_prediction)[0])
+
+    def __getstate__(self):
+        # Do souboru se ukládají jen plochá pole – objekt sklearn není k predikci potřeba
+        state = self.__dict__.copy()
+        state.pop('model', None)
+        return state
+
+    def _category_codes(self, X):
+        """
+        Pro každý one-hot blok vrátí index jedničky; neznámá kategorie (samé nuly) dostane počet kategorií bloku.
+        """
+        X = np.asarray(X)
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            block = X[:, start:end]
+            codes = block.argmax(axis=1)
+            codes[block.max(axis=1) == 0] = end - start
+            yield codes
+
+    def to_codes(self, X):
+        """
+        Převede one-hot matici z encoderu na matici kódů kategorií (v číslování sklearn) a číselných sloupců.
+        """
+        columns = [remap[codes] for remap, codes in zip(self.remap, self._category_codes(X))]
+        return np.column_stack(columns + [np.asarray(X)[:, self.n_encoded:].astype(np.float64)])
+
+    def to_raw_codes(self, X):
+        """
+        Převede one-hot matici na kódy kategorií v číslování encoderu (vstup pro sklearn, který si je přečísluje
+        sám), neznámá kategorie je NaN.
+        """
+        columns = []
+        for values, codes in zip(self.categories, self._category_codes(X)):
+            columns.append(np.where(codes == len(values), np.nan, codes))
+        return np.column_stack(columns + [np.asarray(X)[:, self.n_encoded:].astype(np.float64)])
+
+    def predict(self, X):
+        """
+        Vyhodnotí všechny stromy najednou: v každém kroku se pro všechny dvojice (řádek, strom), které ještě
+        nejsou v listu, posune aktuální uzel o úroveň níž. Dvojice, které došly do listu, se dál nepočítají.
+        """
+        X = self.to_codes(X)
+        n_rows = X.shape[0]
+        flat = X.ravel()
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows) * X.shape[1], len(self.roots))
+        active = np.arange(len(nodes))
+        while active.size:
+            current = nodes[active]
+            x = flat[row_offsets[active] + self.feature[current]]
+            missing = np.isnan(x)
+            categories = np.where(missing, 0, x).astype(np.int64)
+            go_left = np.where(
+                self.is_categorical[current],
+                (self.cat_bits[current] >> categories) & 1 == 1,
+                x <= self.threshold[current]
+            )
+            go_left = np.where(missing, self.missing_left[current], go_left)
+            following = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = following
+            active = active[~self.is_leaf[following]]
+        return self.baseline + self.value[nodes].reshape(n_rows, -1).sum(axis=1)
+
+    def predict_sklearn(self, X):
+        """
+        Predikce původním modelem sklearn (jen před uložením – pro ověření shody s predict).
+        """
+        return self.model.predict(self.to_raw_codes(X))
@@ -0,0 +1,151 @@
+"""Komprese natrénovaného lesa (compress_forest z flat_forest.py) a srovnání artefaktů před a po.
+Stromy se vybírají podle shody s celým lesem na trénovacích řádcích a na náhodných vstupech z celé domény
+formuláře (všechny kategorie encoderu, výkon 30–300 kW, stáří 0–30 let), aby se výběr nepřizpůsobil jen
+několika desítkám unikátních kombinací v datech.
+
+Report pro každý artefakt: velikost souboru, doba načtení, latence predikce jednoho řádku (stejná cesta
+jako /predict) a MAE na testovacích datech (stejné rozdělení jako model.py).
+
+Spuštění (ze složky app/):
+    python compress_model.py                              # random_forest.pkl -> random_forest_compressed.npz
+    python compress_model.py --tolerance 0.02 --value-dtype float16
+    MODEL_PATH=random_forest_compressed.npz python app.py
+"""
+
+import argparse
+import json
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+from features import load_features
+from flat_forest import compile_forest, compress_forest
+from inference import NUMERICAL_COLS, build_category_index, forest_predict, load_model, predict_batch
+
+COMPRESSION_TOLERANCE = 0.01  # Povolená průměrná odchylka od celého lesa (l/100km)
+REFERENCE_RANDOM_ROWS = 5000
+LOAD_REPEATS = 5
+LATENCY_REPEATS = 500
+
+
+def random_inputs(encoder, n_rows, seed=42):
+    """
+    Vygeneruje náhodné zakódované vstupy: jedna kategorie z každého sloupce, výkon 30–300 kW a stáří 0–30 let.
+    """
+    rng = np.random.default_rng(seed)
+    category_index, n_encoded = build_category_index(encoder)
+    X = np.zeros((n_rows, n_encoded + len(NUMERICAL_COLS)))
+    rows = np.arange(n_rows)
+    for mapping in category_index:
+        columns = np.array(list(mapping.values()))
+        X[rows, rng.choice(columns, n_rows)] = 1.0
+    X[:, n_encoded] = rng.integers(30, 300, n_rows)
+    X[:, n_encoded + 1] = rng.integers(0, 30, n_rows)
+    return X
+
+
+def reference_inputs(X_train, encoder, n_random=REFERENCE_RANDOM_ROWS):
+    """
+    Řádky, na kterých se měří shoda vybraných stromů s celým lesem: trénovací data a náhodné vstupy z domény.
+    """
+    return np.vstack([np.asarray(X_train, dtype=np.float32), random_inputs(encoder, n_random).astype(np.float32)])
+
+
+def compress(model, X_train, encoder, tolerance=COMPRESSION_TOLERANCE, value_dtype=np.float32):
+    """
+    Převede RandomForestRegressor do plochých polí a zkomprimuje ho.
+    """
+    return compress_forest(compile_forest(model), reference_inputs(X_train, encoder), tolerance, value_dtype)
+
+
+def measure(path, X_test, y_test, feature_names):
+    """
+    Změří velikost, dobu načtení (nejlepší z LOAD_REPEATS), latenci jednoho řádku (p50) a MAE artefaktu.
+    """
+    load_times = []
+    for _ in range(LOAD_REPEATS):
+        start = time.perf_counter()
+        model = load_model(path)
+        load_times.append(time.perf_counter() - start)
+
+    row = np.ascontiguousarray(X_test[:1], dtype=np.float32)
+    forest_predict(model, row)  # Zahřátí
+    timings = []
+    for i in range(LATENCY_REPEATS):
+        row[0] = X_test[i % len(X_test)]
+        start = time.perf_counter()
+        forest_predict(model, row)
+        timings.append(time.perf_counter() - start)
+
+    y_pred = predict_batch(model, feature_names, X_test)
+    return {
+        'path': path,
+        'size_bytes': os.path.getsize(path),
+        'load_ms': round(min(load_times) * 1000, 3),
+        'latency_p50_ms': round(float(np.percentile(timings, 50)) * 1000, 3),
+        'mae': round(float(mean_absolute_error(y_test, y_pred)), 4)
+    }
+
+
+def compare_artifacts(paths, X_test, y_test, feature_names):
+    """
+    Změří všechny artefakty a vypíše tabulku srovnání.
+    """
+    results = [measure(path, X_test, y_test, feature_names) for path in paths]
+    print(f"\n{'artefakt':<32} {'velikost kB':>11} {'načtení ms':>10} {'p50 ms':>8} {'MAE':>7}")
+    for result in results:
+        print(f"{result['path']:<32} {result['size_bytes'] / 1024:11.1f} {result['load_ms']:10.2f} "
+              f"{result['latency_p50_ms']:8.3f} {result['mae']:7.4f}")
+    return results
+
+
+def test_split():
+    """
+    Stejné rozdělení dat jako v model.py (80/20, random_state=42).
+    """
+    features = load_features()
+    X = np.asarray(features.X, dtype=np.float32)
+    y = np.asarray(features.y)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return X_train, X_test, y_test, features.feature_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Komprese random_forest.pkl a srovnání artefaktů před a po.')
+    parser.add_argument('--model', default='random_forest.pkl')
+    parser.add_argument('--encoder', default='encoder.pkl')
+    parser.add_argument('--output', default='random_forest_compressed.npz')
+    parser.add_argument('--tolerance', type=float, default=COMPRESSION_TOLERANCE,
+                        help='Povolená průměrná odchylka od celého lesa (0 = ponechat všechny stromy)')
+    parser.add_argument('--value-dtype', choices=['float64', 'float32', 'float16'], default='float32',
+                        help='Typ hodnot listů')
+    parser.add_argument('--report', help='Uložit srovnání také jako JSON')
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore')
+    model = joblib.load(args.model)
+    encoder = joblib.load(args.encoder)
+    X_train, X_test, y_test, feature_names = test_split()
+
+    flat = compile_forest(model)
+    compressed = compress(model, X_train, encoder, args.tolerance, np.dtype(args.value_dtype))
+    compressed.save(args.output)
+    print(f"Uloženo {compressed.n_trees} unikátních stromů z {flat.n_trees} "
+          f"({compressed.n_nodes} uzlů místo {flat.n_nodes}) do {args.output}")
+
+    uncompressed = os.path.splitext(args.model)[0] + '.npz'
+    paths = [args.model] + ([uncompressed] if os.path.exists(uncompressed) and uncompressed != args.output else [])
+    paths.append(args.output)
+    results = compare_artifacts(paths, X_test, y_test, feature_names)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
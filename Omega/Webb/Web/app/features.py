@@ -0,0 +1,257 @@
+"""Sdílené úložiště příznaků (feature store) pro trénovací skripty i aplikaci.
+Vyčištěná data z crawleru (doopravdy_hotove_auta.csv) se jednou převedou na čísla (spotřeba bez ' l/100km',
+výkon bez 'kW', stáří vozidla), kategorie se zakódují a výsledek se uloží jako složka souborů .npy
+se schema.json. Trénovací skripty pak data jen mapují do paměti (np.load s mmap_mode) místo opakovaného
+parsování CSV. Úložiště se samo přestaví, když se změní zdrojová data nebo verze schématu.
+
+Pokud existuje sloupcový výstup proudového čištění (crawler/doopravdy_hotove_auta/, viz cleaner.py --stream),
+čte se místo CSV – hodnoty jsou v něm už převedené na čísla, takže odpadá parsování textu.
+Zdrojem může být i soubor '*.parquet' ze stejného čištění.
+
+Obsah složky:
+    schema.json  – verze schématu, kontrolní součet zdroje, kategorie, názvy příznaků
+    X.npy        – matice vstupů modelu (one-hot kategorie + Výkon + Stáří vozidla), float32
+    y.npy        – kombinovaná spotřeba (l/100km), float64
+    <sloupec>.npy – kódy kategorií (int8) a číselné sloupce zvlášť
+
+Sestavení ručně:
+    python features.py [zdroj.csv|zdrojová_složka] [cílová_složka]
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION = 1
+
+CATEGORICAL_COLS = ['Karoserie', 'Palivo', 'Motor']
+NUMERICAL_COLS = ['Výkon', 'Stáří vozidla']
+TARGET_COL = 'Kombinovaná'
+CURRENT_YEAR = 2025
+UNKNOWN_ENGINE = 'zaod'  # Motor, který cleaner nerozpoznal – takové záznamy se do dat nezařazují
+
+# Názvy souborů jednotlivých sloupců ve složce úložiště
+COLUMN_FILES = {
+    'Karoserie': 'karoserie.npy',
+    'Palivo': 'palivo.npy',
+    'Motor': 'motor.npy',
+    'Výkon': 'vykon.npy',
+    'Stáří vozidla': 'stari.npy',
+}
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CRAWLER_DIR = os.path.join(APP_DIR, '..', 'crawler')
+SOURCE_CSV = os.path.join(CRAWLER_DIR, 'doopravdy_hotove_auta.csv')
+SOURCE_COLUMNS = os.path.join(CRAWLER_DIR, 'doopravdy_hotove_auta')  # Výstup cleaner.py --stream
+FEATURES_DIR = os.environ.get('FEATURES_DIR', os.path.join(APP_DIR, 'feature_store'))
+
+
+def file_sha256(path):
+    """
+    Vrátí SHA-256 obsahu souboru (pro zjištění, že se zdrojová data změnila).
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_sha256(source):
+    """
+    Vrátí SHA-256 zdroje. U složky se sloupci se počítá přes schema.json a všechny soubory sloupců.
+    """
+    if not os.path.isdir(source):
+        return file_sha256(source)
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(source)):
+        digest.update(name.encode('utf-8'))
+        digest.update(file_sha256(os.path.join(source, name)).encode('ascii'))
+    return digest.hexdigest()
+
+
+def is_columnar(source):
+    """
+    Vrátí True, pokud je zdroj sloupcový výstup čištění (složka se sloupci nebo Parquet).
+    """
+    return os.path.isdir(source) or source.endswith('.parquet')
+
+
+def default_source():
+    """
+    Vrátí výchozí zdroj dat: sloupcový výstup proudového čištění, pokud je hotový, jinak vyčištěné CSV.
+    """
+    if os.path.exists(os.path.join(SOURCE_COLUMNS, 'schema.json')):
+        return SOURCE_COLUMNS
+    return SOURCE_CSV
+
+
+def read_columns(source):
+    """
+    Načte sloupcový výstup čištění (columnar.py v crawleru) se stejnými sloupci, jaké vrací read_source.
+    Vyřadí neznámé motory.
+    """
+    if CRAWLER_DIR not in sys.path:
+        sys.path.insert(0, CRAWLER_DIR)
+    from columnar import load_columns
+
+    df = load_columns(source, mmap=False)
+    df = df[df['Motor'].astype(str) != UNKNOWN_ENGINE]
+    typed = pd.DataFrame({
+        TARGET_COL: df[TARGET_COL].to_numpy(dtype=np.float64),
+        **{col: df[col].astype(str).to_numpy() for col in CATEGORICAL_COLS},
+        'Výkon': df['Výkon'].to_numpy(dtype=np.float64),
+        'Stáří vozidla': CURRENT_YEAR - df['Rok uvedení do provozu'].to_numpy(dtype=np.float64),
+    })
+    return typed.dropna().reset_index(drop=True)
+
+
+def read_source(source):
+    """
+    Načte vyčištěná data a převede je na typované sloupce. Vyřadí neznámé motory a nečitelné hodnoty.
+    Sloupcový výstup čištění se čte přes read_columns, jinak se parsuje CSV.
+    """
+    if is_columnar(source):
+        return read_columns(source)
+    df = pd.read_csv(source, usecols=[TARGET_COL, 'Rok uvedení do provozu', *CATEGORICAL_COLS, 'Výkon'])
+    df = df[df['Motor'] != UNKNOWN_ENGINE]
+    typed = pd.DataFrame({
+        TARGET_COL: pd.to_numeric(df[TARGET_COL].astype(str).str.replace(' l/100km', '', regex=False),
+                                  errors='coerce'),
+        **{col: df[col].astype(str) for col in CATEGORICAL_COLS},
+        'Výkon': pd.to_numeric(df['Výkon'].astype(str).str.replace('kW', '', regex=False), errors='coerce'),
+        'Stáří vozidla': CURRENT_YEAR - pd.to_numeric(df['Rok uvedení do provozu'], errors='coerce'),
+    })
+    return typed.dropna().reset_index(drop=True)
+
+
+def build_features(source=None, path=FEATURES_DIR):
+    """
+    Sestaví úložiště příznaků ze zdrojových dat (výchozí podle default_source). schema.json se zapisuje jako poslední,
+    takže nedokončené sestavení se při načtení pozná a přestaví.
+    """
+    source = source or default_source()
+    df = read_source(source)
+    os.makedirs(path, exist_ok=True)
+    schema_path = os.path.join(path, 'schema.json')
+    if os.path.exists(schema_path):
+        os.remove(schema_path)
+
+    categories = {}
+    blocks = []
+    for col in CATEGORICAL_COLS:
+        values = sorted(df[col].unique())  # Stejné pořadí jako OneHotEncoder(categories='auto')
+        codes = np.searchsorted(values, df[col].to_numpy()).astype(np.int8)
+        np.save(os.path.join(path, COLUMN_FILES[col]), codes)
+        categories[col] = values
+        blocks.append(np.eye(len(values), dtype=np.float32)[codes])
+    for col in NUMERICAL_COLS:
+        values = df[col].to_numpy(dtype=np.float32)
+        np.save(os.path.join(path, COLUMN_FILES[col]), values)
+        blocks.append(values[:, None])
+
+    np.save(os.path.join(path, 'X.npy'), np.hstack(blocks))
+    np.save(os.path.join(path, 'y.npy'), df[TARGET_COL].to_numpy(dtype=np.float64))
+
+    schema = {
+        'schema_version': SCHEMA_VERSION,
+        'source': os.path.abspath(source),
+        'source_sha256': source_sha256(source),
+        'rows': len(df),
+        'current_year': CURRENT_YEAR,
+        'categories': categories,
+        'feature_names': [f'{col}_{value}' for col in CATEGORICAL_COLS for value in categories[col]]
+                         + NUMERICAL_COLS,
+        'target': TARGET_COL
+    }
+    with open(schema_path, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    return FeatureSet(path, schema)
+
+
+class FeatureSet:
+    """
+    Načtené úložiště příznaků. Pole se čtou z disku líně a mapují do paměti.
+    """
+
+    def __init__(self, path, schema, mmap_mode='r'):
+        self.path = path
+        self.schema = schema
+        self.mmap_mode = mmap_mode
+        self.categories = schema['categories']
+        self.feature_names = schema['feature_names']
+        self.rows = schema['rows']
+
+    def _load(self, name):
+        return np.load(os.path.join(self.path, name), mmap_mode=self.mmap_mode)
+
+    @property
+    def X(self):
+        return self._load('X.npy')
+
+    @property
+    def y(self):
+        return self._load('y.npy')
+
+    def column(self, col):
+        """
+        Vrátí jeden sloupec: kódy kategorií (int8) nebo číselné hodnoty.
+        """
+        return self._load(COLUMN_FILES[col])
+
+    def encoded_frame(self):
+        """
+        Vrátí matici vstupů modelu jako DataFrame s názvy příznaků (stejnými jako encoder.get_feature_names_out).
+        """
+        return pd.DataFrame(np.asarray(self.X), columns=self.feature_names)
+
+    def frame(self):
+        """
+        Vrátí typovaná data: kategoriální sloupce jako pd.Categorical, číselné sloupce a cílovou proměnnou.
+        """
+        data = {
+            col: pd.Categorical.from_codes(np.asarray(self.column(col)), categories=self.categories[col])
+            for col in CATEGORICAL_COLS
+        }
+        data.update({col: np.asarray(self.column(col)) for col in NUMERICAL_COLS})
+        data[TARGET_COL] = np.asarray(self.y)
+        return pd.DataFrame(data)
+
+    def fit_encoder(self):
+        """
+        Vrátí OneHotEncoder se stejnými kategoriemi, jaké má matice X (pro ukládání k modelu a pro app.py).
+        """
+        from sklearn.preprocessing import OneHotEncoder
+        encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
+        return encoder.fit(self.frame()[CATEGORICAL_COLS].astype(object))
+
+
+def load_features(path=FEATURES_DIR, source=None, mmap_mode='r'):
+    """
+    Načte úložiště příznaků. Pokud chybí, má jinou verzi schématu nebo se změnila zdrojová data, nejdřív ho přestaví.
+    Bez `source` se použije default_source().
+    """
+    source = source or default_source()
+    schema_path = os.path.join(path, 'schema.json')
+    schema = None
+    if os.path.exists(schema_path):
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            schema = json.load(f)
+    stale = (
+        schema is None
+        or schema.get('schema_version') != SCHEMA_VERSION
+        or (os.path.exists(source) and schema.get('source_sha256') != source_sha256(source))
+    )
+    if stale:
+        print(f"Sestavuji úložiště příznaků {path} z {source}")
+        return build_features(source, path)
+    return FeatureSet(path, schema, mmap_mode)
+
+
+if __name__ == '__main__':
+    feature_set = build_features(*sys.argv[1:3])
+    print(f"Uloženo {feature_set.rows} řádků a {len(feature_set.feature_names)} příznaků do {feature_set.path}")
@@ -0,0 +1,388 @@
+"""Tento modul převádí natrénovaný RandomForestRegressor do kompaktního formátu z plochých NumPy polí.
+Všechny stromy jsou uloženy za sebou v polích feature, threshold, left, right a value, kořeny stromů
+jsou v poli roots. Uzly každého stromu jsou očíslovány po úrovních tak, že pravý potomek leží vždy
+hned za levým (right == left + 1). Vyhodnocení prochází všechny stromy po úrovních najednou pro celou dávku řádků,
+takže se obejde bez obecného predict ze sklearn.
+
+Celý les obsahuje jen několik desítek různých podmínek (příznak, práh) – one-hot sloupce se dělí jen na 0.5.
+Predikce proto nejprve pro celou dávku spočítá matici výsledků těchto podmínek a řádky se shodnými výsledky
+(stejná buňka prostoru vstupů, tedy stejná predikce) vyhodnotí jen jednou. Skutečné dávky vozidel se hodně
+opakují, takže velké dávky jsou rychlejší než predict ze sklearn, i když samotný průchod stromy v NumPy
+na řádek pomalejší je (srovnání v bench_flat_forest.py).
+
+Komprese (compress_forest) z lesa vybere nejmenší podmnožinu stromů, jejíž predikce se od celého lesa
+liší nejvýš o zadanou toleranci, převede prahy a hodnoty listů na menší typy (prahy tak, aby výsledek porovnání
+zůstal přesně stejný) a sloučí shodné podstromy – uzly se sdílí mezi stromy, shodné stromy se uloží jednou s vahou.
+
+Převod existujícího modelu (ze složky app/):
+    python flat_forest.py random_forest.pkl random_forest.npz
+    python compress_model.py                                   # komprese a srovnání před/po
+"""
+
+import argparse
+import struct
+import zipfile
+
+import numpy as np
+
+FORMAT_VERSION = 2  # Verze 2 přidává váhy stromů; verze 1 se dál načte
+TREE_LEAF = -1  # Označení listu v poli children_left/children_right ve sklearn
+PREDICT_CHUNK_SIZE = 256  # Počet unikátních řádků procházených stromy najednou (pole uzlů zůstane v cache CPU)
+
+
+class FlatForest:
+    """
+    Les rozhodovacích stromů uložený v plochých polích. Listy odkazují samy na sebe a mají práh +inf,
+    takže vyhodnocení může udělat pevný počet kroků (hloubka lesa) pro všechny stromy zároveň.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, n_features, weights=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        # Váhy stromů (kolikrát se strom v původním lese opakuje); None = všechny stromy mají váhu 1
+        self.weights = weights
+        self._index_conditions()
+
+    def _index_conditions(self):
+        """
+        Očísluje různé podmínky (příznak, práh) v lese. Listy dostanou podmínku x > +inf, která nikdy neplatí,
+        takže v nich průchod zůstane. `_node_condition` je pro každý uzel číslo jeho podmínky.
+        """
+        is_leaf = self.left == np.arange(self.n_nodes)
+        keys = np.stack([
+            np.where(is_leaf, 0, self.feature).astype(np.float64),
+            np.where(is_leaf, np.inf, self.threshold.astype(np.float64))
+        ], axis=1)
+        conditions, node_condition = np.unique(keys, axis=0, return_inverse=True)
+        self._condition_feature = conditions[:, 0].astype(np.intp)
+        self._condition_threshold = conditions[:, 1]  # float64 – porovnání s float32 vstupem je přesné
+        self._node_condition = node_condition.ravel().astype(np.intp)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def predict(self, X, chunk_size=PREDICT_CHUNK_SIZE):
+        """
+        Vrátí průměr predikcí všech stromů pro každý řádek matice X.
+        Vstup se stejně jako ve sklearn převede na float32 a porovnává se podmínkou x <= threshold.
+        Řádky se shodnými výsledky všech podmínek lesa se stromy projdou jen jednou, po blocích `chunk_size`.
+        """
+        conditions = self.conditions(X)
+        inverse = None
+        if conditions.shape[1] > 1:
+            # Sloupce podmínek zabalené do bajtů slouží jako klíč buňky; unikátní buňky se vyhodnotí jednou
+            packed = np.ascontiguousarray(np.packbits(conditions, axis=0).T)
+            keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            conditions = conditions[:, first]
+        result = np.empty(conditions.shape[1], dtype=np.float64)
+        for start in range(0, conditions.shape[1], chunk_size):
+            block = np.ascontiguousarray(conditions[:, start:start + chunk_size])
+            result[start:start + chunk_size] = self._aggregate(self._leaf_values(block))
+        return result if inverse is None else result[inverse.ravel()]
+
+    def conditions(self, X):
+        """
+        Vrátí matici (počet podmínek, počet řádků) s výsledky x > threshold pro všechny různé podmínky lesa.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        return X.T[self._condition_feature] > self._condition_threshold[:, np.newaxis]
+
+    def tree_predictions(self, X):
+        """
+        Vrátí hodnoty listů, do kterých řádky X došly v jednotlivých stromech (tvar počet stromů × počet řádků).
+        """
+        return self._leaf_values(np.ascontiguousarray(self.conditions(X)))
+
+    def _leaf_values(self, conditions):
+        """
+        Projde všechny stromy po úrovních pro blok řádků daný maticí podmínek. Pole `nodes` má tvar
+        (počet stromů, počet řádků) a v každém kroku se všechny uzly posunou do levého potomka,
+        nebo o jedno dál do pravého, pokud podmínka uzlu pro daný řádek platí.
+        """
+        n_rows = conditions.shape[1]
+        flat_conditions = conditions.ravel()
+        condition_offsets = self._node_condition * n_rows
+        rows = np.arange(n_rows)[np.newaxis, :]
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_right = np.take(flat_conditions, np.take(condition_offsets, nodes) + rows)
+            nodes = np.take(self.left, nodes) + go_right
+        return np.take(self.value, nodes)
+
+    def _aggregate(self, values):
+        """
+        Průměr (případně vážený) hodnot listů přes stromy.
+        """
+        if self.weights is None:
+            return values.mean(axis=0, dtype=np.float64)
+        return self.weights @ values.astype(np.float64) / self.weights.sum()
+
+    def save(self, path):
+        """
+        Uloží les do nekomprimovaného .npz souboru.
+        """
+        np.savez(
+            path,
+            format_version=np.int64(FORMAT_VERSION),
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=np.int64(self.max_depth),
+            n_features=np.int64(self.n_features_in_),
+            **({'weights': self.weights} if self.weights is not None else {})
+        )
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Načte les uložený metodou save. S `mmap_mode='r'` se pole mapují přímo ze souboru, takže je
+        procesy (workery serveru) sdílí přes page cache místo vlastních kopií.
+        """
+        if mmap_mode is not None:
+            data = _memmap_npz(path, mmap_mode)
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'], data['value'],
+                data['roots'], data['max_depth'], data['n_features'], data.get('weights')
+            )
+        with np.load(path) as data:
+            if int(data['format_version']) not in (1, FORMAT_VERSION):
+                raise ValueError(f'Nepodporovaná verze formátu: {int(data["format_version"])}')
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['right'], data['value'],
+                data['roots'], data['max_depth'], data['n_features'],
+                data['weights'] if 'weights' in data.files else None
+            )
+
+
+def _memmap_npz(path, mmap_mode):
+    """
+    Namapuje pole z nekomprimovaného .npz (np.savez) do paměti. np.load u .npz mmap_mode ignoruje,
+    ale nekomprimovaný zip obsahuje soubory .npy beze změny, takže stačí najít začátek dat každého pole.
+    Skaláry (verze, hloubka) se přečtou normálně.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as raw:
+        for info in archive.infolist():
+            name = info.filename[:-len('.npy')]
+            with archive.open(info) as member:
+                version = np.lib.format.read_magic(member)
+                shape, fortran_order, dtype = (
+                    np.lib.format.read_array_header_1_0(member) if version == (1, 0)
+                    else np.lib.format.read_array_header_2_0(member)
+                )
+                header_size = member.tell()
+                if info.compress_type != zipfile.ZIP_STORED or not shape:
+                    member.seek(0)
+                    arrays[name] = np.lib.format.read_array(member)
+                    continue
+            # Lokální hlavička zipu: 30 bajtů + název + extra pole (délky na offsetech 26 a 28)
+            raw.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', raw.read(4))
+            offset = info.header_offset + 30 + name_length + extra_length + header_size
+            arrays[name] = np.memmap(path, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                                     order='F' if fortran_order else 'C')
+    if int(arrays['format_version']) not in (1, FORMAT_VERSION):
+        raise ValueError(f'Nepodporovaná verze formátu: {int(arrays["format_version"])}')
+    return arrays
+
+
+def _breadth_first_order(tree):
+    """
+    Vrátí pořadí uzlů stromu po úrovních, ve kterém jsou oba potomci každého uzlu vedle sebe.
+    """
+    order = [0]
+    for node in order:
+        if tree.children_left[node] != TREE_LEAF:
+            order.append(tree.children_left[node])
+            order.append(tree.children_right[node])
+    return np.array(order, dtype=np.int64)
+
+
+def compile_forest(model):
+    """
+    Převede natrénovaný RandomForestRegressor (jeden výstup) na FlatForest.
+    Uzly se přečíslují po úrovních a indexy potomků se přepočítají na absolutní pozice v plochých polích.
+    """
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        order = _breadth_first_order(tree)
+        new_id = np.empty(tree.node_count, dtype=np.int64)
+        new_id[order] = np.arange(tree.node_count) + offset
+
+        is_leaf = tree.children_left[order] == TREE_LEAF
+        own_id = new_id[order]
+        left = np.where(is_leaf, own_id, new_id[np.where(is_leaf, 0, tree.children_left[order])])
+        right = np.where(is_leaf, own_id, new_id[np.where(is_leaf, 0, tree.children_right[order])])
+
+        features.append(np.where(is_leaf, 0, tree.feature[order]).astype(np.int32))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold[order]).astype(np.float64))
+        lefts.append(left.astype(np.int32))
+        rights.append(right.astype(np.int32))
+        values.append(tree.value[order, 0, 0].astype(np.float64))
+        roots.append(offset)
+
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    return FlatForest(
+        np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+        np.concatenate(rights), np.concatenate(values), np.array(roots, dtype=np.int32),
+        max_depth, model.n_features_in_
+    )
+
+
+def select_trees(forest, X, tolerance):
+    """
+    Hladově vybere stromy, dokud se průměr vybraných stromů na řádcích X neliší od celého lesa
+    v průměru o víc než `tolerance`. V každém kroku přidá strom, který odchylku nejvíc zmenší.
+    Vrátí indexy vybraných stromů.
+    """
+    values = forest.tree_predictions(X).astype(np.float64)
+    target = forest._aggregate(values)
+    selected = []
+    remaining = np.arange(forest.n_trees)
+    total = np.zeros(values.shape[1])
+    while len(remaining):
+        errors = np.abs((total + values[remaining]) / (len(selected) + 1) - target).mean(axis=1)
+        best = int(np.argmin(errors))
+        selected.append(int(remaining[best]))
+        total += values[remaining[best]]
+        remaining = np.delete(remaining, best)
+        if errors[best] <= tolerance:
+            break
+    return np.array(selected, dtype=np.int64)
+
+
+def float32_floor(threshold):
+    """
+    Zaokrouhlí prahy na float32 dolů. Vstupy jsou float32, takže podmínka x <= práh dává stejný výsledek
+    jako s původním prahem float64.
+    """
+    rounded = threshold.astype(np.float32)
+    too_high = rounded > threshold
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+def _canonical_nodes(forest, threshold, value):
+    """
+    Přiřadí každému uzlu identifikátor podle obsahu jeho podstromu, takže shodné podstromy dostanou stejné id.
+    Dělení, jehož oba potomci jsou shodní, se nahradí potomkem. Vrací id uzlů a tabulku unikátních uzlů.
+    Předpokládá, že potomci mají vyšší index než rodič (tak je les uložen v compile_forest).
+    """
+    ids = {}
+    table = []  # (je list, příznak, práh, hodnota, id levého, id pravého)
+    node_id = np.empty(forest.n_nodes, dtype=np.int64)
+    is_leaf = forest.left == np.arange(forest.n_nodes)
+    for node in range(forest.n_nodes - 1, -1, -1):
+        if is_leaf[node]:
+            key = (True, 0, np.inf, value[node].item(), -1, -1)
+        else:
+            left = node_id[forest.left[node]]
+            right = node_id[forest.right[node]]
+            if left == right:
+                node_id[node] = left
+                continue
+            key = (False, int(forest.feature[node]), threshold[node].item(), 0.0, int(left), int(right))
+        if key not in ids:
+            ids[key] = len(table)
+            table.append(key)
+        node_id[node] = ids[key]
+    return node_id, table
+
+
+def compress_forest(forest, X=None, tolerance=0.0, value_dtype=np.float32):
+    """
+    Vrátí zmenšenou kopii lesa:
+    - s `tolerance` > 0 jen stromy vybrané funkcí select_trees na řádcích X,
+    - prahy jako float32 (float16, pokud jsou v něm všechny přesně vyjádřitelné), hodnoty listů jako `value_dtype`,
+    - shodné podstromy uložené jednou (sdílené dvojice potomků), shodné stromy jednou s vahou,
+    - indexy a příznaky v nejmenším celočíselném typu, do kterého se vejdou.
+    Kromě výběru stromů a zaokrouhlení hodnot listů na `value_dtype` se predikce nemění.
+    """
+    trees = select_trees(forest, X, tolerance) if tolerance > 0 else np.arange(forest.n_trees)
+    threshold = float32_floor(forest.threshold)
+    value = forest.value.astype(value_dtype)
+    node_id, table = _canonical_nodes(forest, threshold, value)
+
+    # Shodné stromy se vyhodnotí jen jednou, váha je počet jejich výskytů
+    root_ids, weights = np.unique(node_id[forest.roots[trees]], return_counts=True)
+
+    # Rozmístění unikátních uzlů: kořeny za sebou, potom dvojice potomků (pravý hned za levým).
+    # Dvojice se stejným obsahem se uloží jen jednou a odkazuje na ni více rodičů.
+    slots = [int(root) for root in root_ids]
+    left = []
+    pairs = {}
+    position = 0
+    while position < len(slots):
+        is_leaf, _, _, _, left_id, right_id = table[slots[position]]
+        if is_leaf:
+            left.append(position)
+        else:
+            if (left_id, right_id) not in pairs:
+                pairs[(left_id, right_id)] = len(slots)
+                slots.extend((left_id, right_id))
+            left.append(pairs[(left_id, right_id)])
+        position += 1
+
+    height = np.zeros(len(table), dtype=np.int64)
+    for i, (is_leaf, _, _, _, left_id, right_id) in enumerate(table):
+        if not is_leaf:  # Potomci jsou v tabulce vždy dřív než rodič
+            height[i] = 1 + max(height[left_id], height[right_id])
+
+    rows = [table[slot] for slot in slots]
+    left = np.array(left, dtype=np.int64)
+    is_leaf = np.array([row[0] for row in rows])
+    thresholds = np.array([row[2] for row in rows], dtype=np.float32)
+    if np.array_equal(thresholds.astype(np.float16).astype(np.float32), thresholds):
+        thresholds = thresholds.astype(np.float16)
+    index_dtype = np.int16 if len(slots) <= np.iinfo(np.int16).max else np.int32
+    feature_dtype = np.uint8 if forest.n_features_in_ <= np.iinfo(np.uint8).max else np.int32
+
+    return FlatForest(
+        np.array([row[1] for row in rows], dtype=feature_dtype),
+        thresholds,
+        left.astype(index_dtype),
+        np.where(is_leaf, left, left + 1).astype(index_dtype),
+        np.array([row[3] for row in rows], dtype=value_dtype),
+        np.arange(len(root_ids), dtype=index_dtype),
+        int(height[root_ids].max()),
+        forest.n_features_in_,
+        weights.astype(np.int32) if (weights != 1).any() else None
+    )
+
+
+def main():
+    import joblib
+
+    parser = argparse.ArgumentParser(description='Převod random_forest.pkl do kompaktního formátu .npz.')
+    parser.add_argument('model', nargs='?', default='random_forest.pkl')
+    parser.add_argument('output', nargs='?', default='random_forest.npz')
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    flat = compile_forest(model)
+    flat.save(args.output)
+    print(f'Uloženo {flat.n_trees} stromů ({flat.n_nodes} uzlů, hloubka {flat.max_depth}) do {args.output}')
+
+
+if __name__ == '__main__':
+    main()
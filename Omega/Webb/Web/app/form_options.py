@@ -0,0 +1,64 @@
+"""Tento modul drží možnosti formuláře (karoserie, palivo, motor) načtené z natrénovaného encoderu.
+Možnosti se načtou jednou při startu z encoder.categories_, takže formulář vždy odpovídá modelu,
+a znovu se načtou jen tehdy, když se změní čas poslední úpravy souboru encoderu."""
+
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+import joblib
+
+from inference import CATEGORICAL_COLS
+
+
+class FormOptions:
+    """
+    Cache možností formuláře. Kromě seznamů možností uchovává i vykreslené HTML formuláře,
+    jeho ETag a čas poslední změny pro podmíněné HTTP odpovědi.
+    """
+
+    def __init__(self, encoder_path):
+        self.encoder_path = encoder_path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self.options = {}
+        self.last_modified = None
+        self._html = None
+        self.etag = None
+        self.reload_if_changed()
+
+    def reload_if_changed(self):
+        """
+        Znovu načte kategorie z encoderu, pokud se soubor od posledního načtení změnil.
+        Vrací True, pokud došlo k opětovnému načtení.
+        """
+        mtime = os.stat(self.encoder_path).st_mtime
+        if mtime == self._mtime:
+            return False
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+            categories = dict(zip(CATEGORICAL_COLS, joblib.load(self.encoder_path).categories_))
+            self.options = {
+                'body_types': sorted(str(c) for c in categories['Karoserie']),
+                'fuel_types': sorted(str(c) for c in categories['Palivo']),
+                'engine_types': sorted(str(c) for c in categories['Motor'])
+            }
+            self.last_modified = datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+            self._html = None
+            self.etag = None
+            self._mtime = mtime
+            return True
+
+    def render(self, render):
+        """
+        Vrátí HTML formuláře a jeho ETag. `render` je funkce, která z možností vykreslí šablonu;
+        výsledek se uchová až do další změny encoderu.
+        """
+        self.reload_if_changed()
+        with self._lock:
+            if self._html is None:
+                self._html = render(**self.options)
+                self.etag = hashlib.sha1(self._html.encode('utf-8')).hexdigest()
+            return self._html, self.etag
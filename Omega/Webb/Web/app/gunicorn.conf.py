@@ -0,0 +1,124 @@
+"""Konfigurace produkčního serveru gunicorn (pre-fork) pro app.py.
+Aplikace se načte jednou v masteru (preload_app) – model, encoder a lookup tabulka jsou v paměti ještě před
+forkem a workery je sdílí přes copy-on-write. Zapisovač historie predikcí a připojení k SQLite si každý
+worker otevírá sám (post_fork), v masteru se po startu zavřou. Stejně tak sledování nových verzí modelu
+(model_registry.py) běží v každém workeru zvlášť.
+Metriky (metrics.py) má každý worker v paměti a každou sekundu zapisuje jejich snímek do METRICS_DIR
+(výchozí dočasná složka serveru). /metrics tak z kteréhokoli workeru vrací součet přes všechny workery
+včetně již ukončených; složka se vyprázdní při startu masteru a ukončené workery označí master.
+S `python serve.py --asgi` obsluhují požadavky ASGI workery (asgi_app.py) se stejnými hooky – ASGI aplikace
+sdílí model i historii s modulem app.
+
+Nastavení proměnnými prostředí:
+    BIND              – adresa a port (výchozí 0.0.0.0:8000)
+    WEB_CONCURRENCY   – počet workerů (výchozí počet CPU)
+    WEB_THREADS       – vláken na worker (výchozí 1)
+    TIMEOUT           – po kolika sekundách bez odpovědi master worker restartuje (výchozí 30)
+    GRACEFUL_TIMEOUT  – kolik sekund má worker na dokončení požadavků při restartu (výchozí 30)
+    MAX_REQUESTS      – po kolika požadavcích se worker recykluje, 0 = nikdy (výchozí 0)
+    METRICS_DIR       – složka snímků metrik workerů (výchozí nová dočasná složka fuel-metrics-*)
+
+Řízení běžícího serveru (PID masteru vypíše start):
+    kill -HUP <pid>   – postupný restart workerů; noví se forknou z masteru s již načteným modelem
+    kill -USR2 <pid>  – nový master s novým kódem a modelem vedle starého, potom kill -TERM <starý pid>
+    kill -TERM <pid>  – ukončení; workery dokončí rozpracované požadavky a zapíšou historii
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+from metrics import clear_snapshots, mark_process_dead
+from process_stats import memory_usage
+
+SERVER_STARTED_AT = time.perf_counter()
+TEMP_METRICS_PREFIX = 'fuel-metrics-'
+
+# Nastaví se před načtením aplikace, takže ji app.py i všechny workery převezmou z prostředí
+if not os.environ.get('METRICS_DIR'):
+    os.environ['METRICS_DIR'] = tempfile.mkdtemp(prefix=TEMP_METRICS_PREFIX)
+METRICS_DIR = os.environ['METRICS_DIR']
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+threads = int(os.environ.get('WEB_THREADS', 1))
+chdir = APP_DIR
+preload_app = True
+timeout = int(os.environ.get('TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GRACEFUL_TIMEOUT', 30))
+max_requests = int(os.environ.get('MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10  # Workery se nerecyklují všechny najednou
+wsgi_app = 'app:app'
+
+
+def on_starting(server):
+    """
+    Start masteru: smaže snímky metrik z předchozího běhu, aby se nepřičítaly k novým.
+    """
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    clear_snapshots(METRICS_DIR)
+
+
+def when_ready(server):
+    """
+    Master je připravený: aplikace je načtená a zahřátá. Zapisovač historie masteru se zavře – požadavky
+    obsluhují jen workery, které si otevřou vlastní.
+    """
+    import app
+    app.prediction_log.close()
+    app.registry.stop()
+    server.log.info(
+        f'Aplikace načtena za {app.STARTUP_S:.2f} s, master připraven za '
+        f'{time.perf_counter() - SERVER_STARTED_AT:.2f} s (model {app.registry.current.version}), '
+        f'paměť masteru: {memory_usage()}'
+    )
+
+
+def post_fork(server, worker):
+    """
+    Nový worker: otevře vlastní připojení k SQLite, spustí vlastní zapisovač historie, sledování verzí modelu
+    a zápis snímků metrik.
+    """
+    import app
+    app.open_prediction_log()
+    app.registry.start()
+    app.start_metrics_snapshots()
+
+
+def post_worker_init(worker):
+    """
+    Worker je připravený přijímat požadavky: vypíše jeho paměť (sdílenou s masterem a vlastní).
+    """
+    worker.log.info(f'Worker {worker.pid} připraven, paměť MB: {memory_usage()}')
+
+
+def worker_exit(server, worker):
+    """
+    Ukončení workeru (i při postupném restartu): zapíše zbývající historii predikcí, zavře databázi
+    a zapíše poslední snímek metrik.
+    """
+    import app
+    app.prediction_log.close()
+    app.metrics.stop_snapshots()
+
+
+def child_exit(server, worker):
+    """
+    Master zaznamenal konec workeru (i násilný): jeho čítače se dál sčítají, hodnoty (gauge) už ne.
+    """
+    mark_process_dead(METRICS_DIR, worker.pid)
+
+
+def on_exit(server):
+    """
+    Ukončení serveru: smaže snímky metrik a dočasnou složku, pokud ji vytvořil server.
+    """
+    clear_snapshots(METRICS_DIR)
+    if os.path.basename(METRICS_DIR).startswith(TEMP_METRICS_PREFIX):
+        try:
+            os.rmdir(METRICS_DIR)
+        except OSError:
+            pass
@@ -0,0 +1,262 @@
+"""Tento modul obsahuje vektorizované kódování vstupních dat a dávkovou predikci spotřeby paliva.
+Kategoriální proměnné se kódují přímo do NumPy matice podle kategorií natrénovaného OneHotEncoderu,
+takže pro celou dávku vozidel stačí jeden průchod bez vytváření DataFrame pro každý řádek.
+Pro jednotlivé požadavky obsahuje rychlou cestu FastPredictor, která nevytváří žádné pandas objekty."""
+
+import math
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from features import CATEGORICAL_COLS, CURRENT_YEAR, NUMERICAL_COLS  # Sdílené s trénováním (features.py)
+from flat_forest import FlatForest
+
+# Mapování názvů polí z API (formuláře) na sloupce modelu
+INPUT_FIELDS = {
+    'Karoserie': 'body_type',
+    'Palivo': 'fuel_type',
+    'Motor': 'engine_type',
+}
+
+MAX_BATCH_ROWS = 100_000  # Maximální počet řádků v jedné dávce
+YEAR_MIN, YEAR_MAX = 1950, CURRENT_YEAR  # Povolený rok vozidla
+POWER_MIN, POWER_MAX = 1, 500  # Povolený výkon v kW
+CHUNK_SIZE = 10_000  # Počet řádků předávaných modelu v jednom volání predict
+
+
+def _finite_number(value, field):
+    """
+    Převede hodnotu pole na konečné číslo. Jiné než skalární hodnoty, NaN a nekonečno vyhodí ValueError.
+    """
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise ValueError(f'Pole {field} musí být číslo, ne {value!r}.')
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f'Pole {field} musí být číslo, ne {value!r}.')
+    if not math.isfinite(number):
+        raise ValueError(f'Pole {field} musí být konečné číslo, ne {value!r}.')
+    return number
+
+
+def validate_vehicle(fields):
+    """
+    Ověří pole jednoho vozidla z formuláře nebo JSON (body_type, engine_type, fuel_type, horsepower, year)
+    a vrátí argumenty modelu (karoserie, palivo, motor, výkon, stáří vozidla). Chybějící pole, výkon mimo
+    POWER_MIN–POWER_MAX, neceločíselný rok nebo rok mimo YEAR_MIN–YEAR_MAX vyhodí ValueError.
+    Sdílí ho /predict ve Flask aplikaci (app.py) i v ASGI aplikaci (asgi_app.py).
+    """
+    missing = [field for field in ('body_type', 'engine_type', 'fuel_type', 'horsepower', 'year') if field not in fields]
+    if missing:
+        raise ValueError(f"Chybí pole: {', '.join(missing)}")
+    categories = []
+    for field in ('body_type', 'fuel_type', 'engine_type'):
+        value = fields[field]
+        if not isinstance(value, str):
+            raise ValueError(f'Pole {field} musí být text, ne {value!r}.')
+        categories.append(value.strip())
+    power = _finite_number(fields['horsepower'], 'horsepower')
+    if not POWER_MIN <= power <= POWER_MAX:
+        raise ValueError(f'Výkon musí být v rozsahu {POWER_MIN}–{POWER_MAX} kW, ne {power:g}.')
+    year = _finite_number(fields['year'], 'year')
+    if not year.is_integer() or not YEAR_MIN <= year <= YEAR_MAX:
+        raise ValueError(f'Rok musí být celé číslo v rozsahu {YEAR_MIN}–{YEAR_MAX}, ne {fields["year"]!r}.')
+    return (*categories, power, CURRENT_YEAR - int(year))
+
+
+def validate_batch(columns):
+    """
+    Ověří sloupce dávky (slovník polí jako v encode_batch) a vrátí je s výkonem a rokem jako float poli.
+    Kategorie musí být text, výkon a rok konečná skalární čísla ve stejných mezích jako validate_vehicle.
+    Při chybě vyhodí ValueError s číslem řádku (od 1) a názvem pole.
+    """
+    checked = dict(columns)
+    for field in ('body_type', 'fuel_type', 'engine_type'):
+        for i, value in enumerate(columns[field]):
+            if not isinstance(value, str):
+                raise ValueError(f'Řádek {i + 1}: pole {field} musí být text, ne {value!r}.')
+
+    for field in ('horsepower', 'year'):
+        values = columns[field]
+        try:
+            numbers = np.asarray(values, dtype=np.float64)
+            if numbers.ndim != 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            # Pomalá cesta jen pro nalezení prvního chybného řádku
+            for i, value in enumerate(values):
+                try:
+                    _finite_number(value, field)
+                except ValueError as e:
+                    message = str(e)
+                    raise ValueError(f'Řádek {i + 1}: {message[0].lower()}{message[1:]}')
+            raise ValueError(f'Pole {field} obsahuje neplatné hodnoty.')
+        bad = ~np.isfinite(numbers)
+        if field == 'horsepower':
+            bad |= (numbers < POWER_MIN) | (numbers > POWER_MAX)
+            limits = f'konečné číslo v rozsahu {POWER_MIN}–{POWER_MAX} kW'
+        else:
+            bad |= (numbers < YEAR_MIN) | (numbers > YEAR_MAX) | (numbers != np.round(numbers))
+            limits = f'celé číslo v rozsahu {YEAR_MIN}–{YEAR_MAX}'
+        if bad.any():
+            i = int(np.flatnonzero(bad)[0])
+            raise ValueError(f'Řádek {i + 1}: pole {field} musí být {limits}, ne {values[i]!r}.')
+        checked[field] = numbers
+    return checked
+
+
+def load_model(path, mmap_mode=None):
+    """
+    Načte model podle přípony souboru: .npz je kompaktní FlatForest, .pt a .onnx exportovaná neuronová síť
+    (net_model.py), ostatní soubory se načtou přes joblib. `mmap_mode='r'` mapuje pole modelu ze souboru
+    (FlatForest i joblib; stromy sklearn si ale data při načtení stejně zkopírují).
+    """
+    if str(path).endswith('.npz'):
+        return FlatForest.load(path, mmap_mode)
+    if str(path).endswith(('.pt', '.onnx')):
+        from net_model import NetModel  # torch / onnxruntime jsou potřeba jen pro síť
+        return NetModel(path)
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def build_category_index(encoder):
+    """
+    Pro každý kategoriální sloupec vytvoří slovník {kategorie: index sloupce v zakódované matici}.
+    Vrací seznam slovníků (ve stejném pořadí jako CATEGORICAL_COLS) a celkový počet one-hot sloupců.
+    """
+    index = []
+    offset = 0
+    for categories in encoder.categories_:
+        index.append({str(category): offset + i for i, category in enumerate(categories)})
+        offset += len(categories)
+    return index, offset
+
+
+def encode_batch(category_index, n_encoded, columns):
+    """
+    Zakóduje celou dávku vozidel do matice vstupů modelu jedním průchodem v NumPy.
+    `columns` je slovník s poli 'body_type', 'engine_type', 'fuel_type', 'horsepower' a 'year'.
+    Neznámé kategorie jsou stejně jako u encoderu (handle_unknown='ignore') zakódovány samými nulami.
+    """
+    n_rows = len(columns['year'])
+    X = np.zeros((n_rows, n_encoded + len(NUMERICAL_COLS)), dtype=np.float64)
+    rows = np.arange(n_rows)
+
+    for col, mapping in zip(CATEGORICAL_COLS, category_index):
+        values = np.asarray(columns[INPUT_FIELDS[col]], dtype=str)
+        # Každá unikátní hodnota se přeloží jen jednou, pak se index rozšíří na všechny řádky
+        uniques, inverse = np.unique(values, return_inverse=True)
+        unique_idx = np.array([mapping.get(value, -1) for value in uniques], dtype=np.int64)
+        col_idx = unique_idx[inverse]
+        known = col_idx >= 0
+        X[rows[known], col_idx[known]] = 1.0
+
+    X[:, n_encoded] = np.asarray(columns['horsepower'], dtype=np.float64)
+    X[:, n_encoded + 1] = CURRENT_YEAR - np.asarray(columns['year'], dtype=np.float64)
+    return X
+
+
+def count_unknown(category_index, columns):
+    """
+    Spočítá v dávce hodnoty kategorií, které encoder nezná (encode_batch je zakóduje samými nulami).
+    Vrací slovník {pole API: počet neznámých hodnot}.
+    """
+    counts = {}
+    for col, mapping in zip(CATEGORICAL_COLS, category_index):
+        uniques, occurrences = np.unique(np.asarray(columns[INPUT_FIELDS[col]], dtype=str), return_counts=True)
+        counts[INPUT_FIELDS[col]] = int(sum(n for value, n in zip(uniques, occurrences) if value not in mapping))
+    return counts
+
+
+def predict_batch(model, feature_names, X, chunk_size=CHUNK_SIZE):
+    """
+    Provede predikci pro zakódovanou matici po blocích o velikosti `chunk_size`.
+    Model se volá jednou pro každý blok, takže režie volání predict se rozloží na mnoho řádků.
+    Modely natrénované s názvy sloupců (sklearn) dostanou blok jako DataFrame, ostatní přímo NumPy matici.
+    """
+    named = getattr(model, 'feature_names_in_', None) is not None
+    result = np.empty(X.shape[0], dtype=np.float64)
+    for start in range(0, X.shape[0], chunk_size):
+        chunk = X[start:start + chunk_size]
+        if named:
+            chunk = pd.DataFrame(chunk, columns=feature_names, copy=False)
+        result[start:start + chunk_size] = model.predict(chunk)
+    return result
+
+
+def forest_predict(model, X):
+    """
+    Predikce pro již zakódovanou matici bez pandas a bez validace vstupu.
+    U RandomForestRegressor se stromy vyhodnotí přímo v aktuálním vlákně (bez joblib vláken z n_jobs=-1),
+    matice musí být float32 a C-contiguous. Ostatní modely se volají přes své predict.
+    """
+    estimators = getattr(model, 'estimators_', None)
+    if estimators is None:
+        return model.predict(X)
+    total = np.zeros(X.shape[0], dtype=np.float64)
+    for tree in estimators:
+        total += tree.predict(X, check_input=False)
+    return total / len(estimators)
+
+
+class FastPredictor:
+    """
+    Rychlá cesta pro predikci jednoho vozidla. Indexy one-hot sloupců pro všechny kategorie
+    (Karoserie, Palivo, Motor) se spočítají jednou při startu a každý požadavek jen vyplní
+    předalokovaný NumPy řádek (jeden na vlákno), bez vytváření DataFrame.
+    """
+
+    def __init__(self, model, encoder):
+        self.model = model
+        self.category_index, self.n_encoded = build_category_index(encoder)
+        self.n_features = self.n_encoded + len(NUMERICAL_COLS)
+        self._local = threading.local()
+
+    def _row(self):
+        """
+        Vrátí předalokovaný řádek vstupů pro aktuální vlákno.
+        """
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.zeros((1, self.n_features), dtype=np.float32)
+        return row
+
+    def encode_one(self, body_type, fuel_type, engine_type, power, age):
+        """
+        Zakóduje jedno vozidlo do předalokovaného řádku. Neznámé kategorie zůstanou nulové
+        stejně jako u encoderu s handle_unknown='ignore'.
+        """
+        row = self._row()
+        row.fill(0.0)
+        self._fill(row[0], body_type, fuel_type, engine_type, power, age)
+        return row
+
+    def _fill(self, values, body_type, fuel_type, engine_type, power, age):
+        """
+        Vyplní vynulovaný řádek matice vstupů pro jedno vozidlo.
+        """
+        for mapping, value in zip(self.category_index, (body_type, fuel_type, engine_type)):
+            idx = mapping.get(value)
+            if idx is not None:
+                values[idx] = 1.0
+        values[self.n_encoded] = power
+        values[self.n_encoded + 1] = age
+
+    def predict_one(self, body_type, fuel_type, engine_type, power, age):
+        """
+        Vrátí predikovanou spotřebu pro jedno vozidlo.
+        """
+        row = self.encode_one(body_type, fuel_type, engine_type, power, age)
+        return float(forest_predict(self.model, row)[0])
+
+    def predict_many(self, vehicles):
+        """
+        Predikce pro seznam vozidel (n-tice se stejnými argumenty jako predict_one) jedním voláním modelu.
+        Vrací NumPy pole spotřeb ve stejném pořadí.
+        """
+        X = np.zeros((len(vehicles), self.n_features), dtype=np.float32)
+        for values, vehicle in zip(X, vehicles):
+            self._fill(values, *vehicle)
+        return forest_predict(self.model, X)
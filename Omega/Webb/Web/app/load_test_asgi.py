@@ -0,0 +1,166 @@
+"""Zátěžový test: propustnost /predict ve Flask aplikaci a v ASGI aplikaci s mikro-dávkami a bez nich.
+Pro každou konfiguraci spustí server přes serve.py na volném portu (cache predikcí vypnutá, každý požadavek
+tedy počítá model), pošle `--requests` požadavků s vozidly vybranými náhodně z vyčištěných dat crawleru
+(load_vehicles z bench_api.py) z `--concurrency` souběžných klientů a změří propustnost, latenci (p50/p95/p99)
+a chyby. U ASGI konfigurací vypíše i průměrnou velikost dávky z /stats.
+
+Konfigurace:
+    flask         – gunicorn se synchronními workery (app.py), jedno volání lesa na požadavek
+    asgi-single   – ASGI workery s MICRO_BATCH_MAX_SIZE=1 (bez slučování, výpočet mimo smyčku událostí)
+    asgi-batch    – ASGI workery s mikro-dávkami (--batch-size, --wait-ms)
+
+Spuštění (ze složky app/):
+    python load_test_asgi.py
+    python load_test_asgi.py --concurrency 64 --requests 5000 --batch-size 128 --wait-ms 5 --output load.json
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+from bench_api import load_vehicles
+from serve import free_port, wait_ready
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVE_PATH = os.path.join(APP_DIR, 'serve.py')
+CONFIGS = ['flask', 'asgi-single', 'asgi-batch']
+
+
+def vehicle_bodies(vehicles, n, seed=42):
+    """
+    Těla n požadavků s vozidly vybranými náhodně (ve stejném poměru jako v datech) ze seznamu `vehicles`.
+    """
+    rng = random.Random(seed)
+    return [urllib.parse.urlencode(vehicle).encode() for vehicle in rng.choices(vehicles, k=n)]
+
+
+def start_server(config, workers, batch_size, wait_ms, db_path):
+    """
+    Spustí server v dané konfiguraci a počká na /ready. Vrátí proces a základní URL.
+    """
+    port = free_port()
+    env = dict(
+        os.environ, BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(workers), PREDICTION_CACHE_SIZE='0',
+        MODEL_REGISTRY_POLL='0', PREDICTIONS_DB=db_path,
+        MICRO_BATCH_MAX_SIZE='1' if config == 'asgi-single' else str(batch_size), MICRO_BATCH_WAIT_MS=str(wait_ms)
+    )
+    args = [sys.executable, SERVE_PATH] + (['--asgi'] if config != 'flask' else [])
+    process = subprocess.Popen(args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    wait_ready(f'{base_url}/ready', process)
+    return process, base_url
+
+
+def run_load(base_url, bodies, concurrency):
+    """
+    Pošle všechna těla na /predict z `concurrency` vláken. Vrátí latence úspěšných požadavků,
+    počet chyb a celkovou dobu.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    next_index = [0]
+
+    def client():
+        while True:
+            with lock:
+                i = next_index[0]
+                next_index[0] += 1
+            if i >= len(bodies):
+                return
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(f'{base_url}/predict', bodies[i], timeout=30) as response:
+                    response.read()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                with lock:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def measure(config, args, vehicles):
+    """
+    Změří jednu konfiguraci: zahřátí, zátěž a statistiky serveru.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        process, base_url = start_server(config, args.workers, args.batch_size, args.wait_ms,
+                                         os.path.join(tmp, 'predictions.db'))
+        try:
+            run_load(base_url, vehicle_bodies(vehicles, args.concurrency * 2, seed=0), args.concurrency)  # Zahřátí
+            latencies, errors, total_s = run_load(base_url, vehicle_bodies(vehicles, args.requests), args.concurrency)
+            micro_batch = None
+            if config != 'flask':
+                with urllib.request.urlopen(f'{base_url}/stats', timeout=10) as response:
+                    micro_batch = json.load(response)['micro_batch']
+        finally:
+            process.send_signal(signal.SIGTERM)
+            process.wait(timeout=60)
+
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'config': config,
+        'requests': args.requests,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / total_s, 1),
+        'latency_p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'latency_p95_ms': round(float(np.percentile(ms, 95)), 2),
+        'latency_p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'mean_batch_size': micro_batch['mean_batch_size'] if micro_batch else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zátěžový test /predict: Flask vs. ASGI s mikro-dávkami.')
+    parser.add_argument('--configs', nargs='+', choices=CONFIGS, default=CONFIGS)
+    parser.add_argument('--requests', type=int, default=2000, help='Počet měřených požadavků na konfiguraci')
+    parser.add_argument('--concurrency', type=int, default=32, help='Počet souběžných klientů')
+    parser.add_argument('--workers', type=int, default=1, help='Počet workerů serveru')
+    parser.add_argument('--batch-size', type=int, default=64, help='MICRO_BATCH_MAX_SIZE pro asgi-batch')
+    parser.add_argument('--wait-ms', type=float, default=2.0, help='MICRO_BATCH_WAIT_MS pro asgi-batch')
+    parser.add_argument('--output', help='Uložit výsledky také jako JSON')
+    args = parser.parse_args()
+
+    vehicles = load_vehicles()
+    results = []
+    for config in args.configs:
+        print(f"⏳ {config}: {args.requests} požadavků, {args.concurrency} souběžných klientů...")
+        results.append(measure(config, args, vehicles))
+
+    print(f"\n{'konfigurace':<12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'chyby':>6} {'dávka':>6}")
+    for result in results:
+        batch = f"{result['mean_batch_size']:6.1f}" if result['mean_batch_size'] else f"{'–':>6}"
+        print(f"{result['config']:<12} {result['throughput_rps']:8.1f} {result['latency_p50_ms']:8.2f} "
+              f"{result['latency_p95_ms']:8.2f} {result['latency_p99_ms']:8.2f} {result['errors']:6d} {batch}")
+    baseline = results[0]['throughput_rps']
+    for result in results[1:]:
+        print(f"{result['config']}: {result['throughput_rps'] / baseline:.1f}× propustnost {results[0]['config']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
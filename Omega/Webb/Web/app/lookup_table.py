@@ -0,0 +1,146 @@
+"""Tento modul předpočítá predikce modelu pro celý rozsah vstupů a obsluhuje je z paměťově mapované tabulky.
+Vstupní doména je malá: kategorie z encoderu, rok 1950–2025 a výkon 1–500 kW. Tabulka má tvar
+(karoserie, palivo, motor, stáří vozidla, výkon) a predikce je pak jen indexace do pole.
+Neceločíselný výkon se lineárně interpoluje mezi sousedními celými kW.
+
+Sestavení tabulky (ze složky app/):
+    python lookup_table.py --model random_forest.pkl --encoder encoder.pkl --output lookup_table.npy
+"""
+
+import argparse
+import itertools
+import json
+import math
+import time
+
+import joblib
+import numpy as np
+
+from features import file_sha256
+from inference import (
+    CATEGORICAL_COLS, CURRENT_YEAR, NUMERICAL_COLS, POWER_MAX, POWER_MIN, YEAR_MAX, YEAR_MIN,
+    build_category_index, load_model, predict_batch
+)
+
+BUILD_CHUNK_SIZE = 50_000  # Počet řádků mřížky vyhodnocených najednou
+
+
+def metadata_path(table_path):
+    """
+    Vrátí cestu k JSON souboru s metadaty tabulky.
+    """
+    return str(table_path).rsplit('.', 1)[0] + '.json'
+
+
+def build_table(model, encoder, output_path, chunk_size=BUILD_CHUNK_SIZE):
+    """
+    Vyhodnotí model nad celou mřížkou vstupů po blocích a zapíše výsledky do paměťově mapovaného .npy souboru.
+    Vrací metadata tabulky (kategorie a rozsahy os).
+    """
+    category_index, n_encoded = build_category_index(encoder)
+    feature_names = [str(name) for name in encoder.get_feature_names_out(CATEGORICAL_COLS)] + NUMERICAL_COLS
+    categories = [list(mapping) for mapping in category_index]
+    ages = np.arange(CURRENT_YEAR - YEAR_MAX, CURRENT_YEAR - YEAR_MIN + 1)
+    powers = np.arange(POWER_MIN, POWER_MAX + 1)
+
+    shape = tuple(len(c) for c in categories) + (len(ages), len(powers))
+    table = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=shape)
+
+    # Numerická část mřížky (stáří × výkon) je pro každou kombinaci kategorií stejná
+    grid_age, grid_power = np.meshgrid(ages, powers, indexing='ij')
+    grid_age, grid_power = grid_age.ravel(), grid_power.ravel()
+    n_cells = len(grid_age)
+
+    for combo in itertools.product(*(range(len(c)) for c in categories)):
+        X = np.zeros((n_cells, n_encoded + len(NUMERICAL_COLS)))
+        for mapping, value_idx, names in zip(category_index, combo, categories):
+            X[:, mapping[names[value_idx]]] = 1.0
+        X[:, n_encoded] = grid_power
+        X[:, n_encoded + 1] = grid_age
+        table[combo] = predict_batch(model, feature_names, X, chunk_size).reshape(len(ages), len(powers))
+
+    table.flush()
+    return {
+        'categories': dict(zip(CATEGORICAL_COLS, categories)),
+        'age_min': int(ages[0]),
+        'age_max': int(ages[-1]),
+        'power_min': POWER_MIN,
+        'power_max': POWER_MAX
+    }
+
+
+class LookupTable:
+    """
+    Predikce z předpočítané tabulky načtené přes np.load(mmap_mode='r'), takže ji sdílí všechny procesy
+    přes page cache. Pro vstupy mimo tabulku (neznámá kategorie, rok nebo výkon mimo rozsah) vrací None.
+    """
+
+    def __init__(self, table, metadata):
+        self.table = table
+        self.category_index = [
+            {name: i for i, name in enumerate(metadata['categories'][col])} for col in CATEGORICAL_COLS
+        ]
+        self.age_min = metadata['age_min']
+        self.age_max = metadata['age_max']
+        self.power_min = metadata['power_min']
+        self.power_max = metadata['power_max']
+
+    @classmethod
+    def load(cls, path, model_path=None):
+        """
+        Načte tabulku a metadata. Pokud je zadán `model_path`, ověří, že tabulka byla vytvořena z tohoto modelu.
+        """
+        with open(metadata_path(path), 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if model_path is not None and metadata.get('model_sha256') != file_sha256(model_path):
+            raise ValueError(f'Tabulka {path} nebyla vytvořena z modelu {model_path}.')
+        return cls(np.load(path, mmap_mode='r'), metadata)
+
+    def predict(self, body_type, fuel_type, engine_type, power, age):
+        """
+        Vrátí predikci pro jedno vozidlo v O(1), nebo None, pokud vstup leží mimo tabulku.
+        """
+        idx = []
+        for mapping, value in zip(self.category_index, (body_type, fuel_type, engine_type)):
+            position = mapping.get(value)
+            if position is None:
+                return None
+            idx.append(position)
+        if not (self.age_min <= age <= self.age_max and self.power_min <= power <= self.power_max):
+            return None
+
+        row = self.table[idx[0], idx[1], idx[2], int(age) - self.age_min]
+        lower = math.floor(power)
+        offset = lower - self.power_min
+        fraction = power - lower
+        if fraction == 0:
+            return float(row[offset])
+        # Lineární interpolace mezi sousedními celými kW
+        return float(row[offset] * (1 - fraction) + row[offset + 1] * fraction)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Předpočítání predikcí modelu pro celou vstupní doménu.')
+    parser.add_argument('--model', default='random_forest.pkl')
+    parser.add_argument('--encoder', default='encoder.pkl')
+    parser.add_argument('--output', default='lookup_table.npy')
+    parser.add_argument('--chunk-size', type=int, default=BUILD_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    encoder = joblib.load(args.encoder)
+
+    start = time.perf_counter()
+    metadata = build_table(model, encoder, args.output, args.chunk_size)
+    metadata['model_sha256'] = file_sha256(args.model)
+    with open(metadata_path(args.output), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    elapsed = time.perf_counter() - start
+    table = np.load(args.output, mmap_mode='r')
+    print(f'Tabulka {table.shape} ({table.size} predikcí, {table.nbytes / 1e6:.1f} MB) '
+          f'uložena do {args.output} za {elapsed:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
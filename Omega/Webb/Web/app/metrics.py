@@ -0,0 +1,387 @@
+"""Lehké metriky aplikace (čítače, histogramy, hodnoty) ve formátu Prometheus bez dalších závislostí.
+Metriky se drží v paměti procesu. U serveru s více workery (gunicorn) každý worker navíc po `start_snapshots()`
+zapisuje každých `interval` sekund snímek svých metrik do sdílené složky (soubor metrics-<pid>.json) a render()
+pak vrátí metriky sečtené přes všechny workery: čítače a histogramy se sčítají (i za již ukončené workery,
+takže nikdy neklesají), hodnoty (gauge) se berou jen z běžících workerů a při shodných štítcích ta největší.
+Vlastní metriky má worker vždy aktuální, metriky ostatních workerů jsou staré nejvýš `interval` sekund.
+Složku je potřeba při startu serveru vyprázdnit (`clear_snapshots()`) a ukončený worker označit
+(`mark_process_dead()`) – viz gunicorn.conf.py.
+
+Vypnutý registr (`MetricsRegistry(enabled=False)`) vrací místo metrik prázdné objekty, jejichž metody nic
+nedělají, a `stage_timer()` vrací sdílené prázdné stopky – v horké cestě pak zbývá jen volání prázdné metody.
+
+Použití:
+    metrics = MetricsRegistry()
+    requests = metrics.counter('fuel_requests_total', 'Počet požadavků', ['endpoint', 'status'])
+    stages = metrics.histogram('fuel_predict_stage_seconds', 'Doba fází', ['endpoint', 'stage'])
+    requests.inc('/predict', '200')
+    timer = metrics.stage_timer(stages, '/predict')
+    ...; timer.lap('parse')
+    ...; timer.lap('predict')
+    text = metrics.render()
+
+    metrics.start_snapshots('/tmp/metrics', interval=1.0)  # V každém workeru (po forku)
+"""
+
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+# Hranice košů histogramu v sekundách (od 10 µs do 2.5 s)
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SNAPSHOT_PATTERN = 'metrics-*.json'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Společný základ metrik: název, popis, názvy štítků a hodnoty podle n-tice hodnot štítků.
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _check(self, labelvalues):
+        if len(labelvalues) != len(self.labelnames):
+            raise ValueError(f'Metrika {self.name} očekává štítky {self.labelnames}, dostala {labelvalues}.')
+
+    def render(self, values=None):
+        """
+        Řádky metriky ve formátu Prometheus – vlastní hodnoty, nebo `values` sečtené ze snímků workerů.
+        """
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        if values is None:
+            with self._lock:
+                items = sorted(self._values.items())
+        else:
+            items = sorted(values.items())
+        for labelvalues, value in items:
+            lines.extend(self._render_value(labelvalues, value))
+        return lines
+
+    def snapshot(self):
+        """
+        Hodnoty jako seznam dvojic [hodnoty štítků, hodnota] pro zápis do JSON.
+        """
+        with self._lock:
+            return [[list(labelvalues), self._copy(value)] for labelvalues, value in self._values.items()]
+
+    def _copy(self, value):
+        return value
+
+    def merge(self, total, value):
+        """
+        Sloučí hodnotu z dalšího snímku do průběžného součtu (`total` je None u první hodnoty).
+        """
+        return value if total is None else total + value
+
+    def _render_value(self, labelvalues, value):
+        return [f'{self.name}{_labels(self.labelnames, labelvalues)} {_number(value)}']
+
+
+class Counter(_Metric):
+    """
+    Čítač, který jen roste.
+    """
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        key = tuple(labelvalues)
+        with self._lock:
+            if key not in self._values:
+                self._check(key)
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """
+    Hodnota, která se nastavuje (např. verze modelu nebo velikost fronty).
+    """
+    kind = 'gauge'
+
+    def set(self, value, *labelvalues):
+        key = tuple(labelvalues)
+        self._check(key)
+        with self._lock:
+            self._values[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def merge(self, total, value):
+        return value if total is None else max(total, value)
+
+
+class Histogram(_Metric):
+    """
+    Histogram s pevnými koši. Pro každou kombinaci štítků drží počty v koších (nekumulativně),
+    součet a počet pozorování; kumulativní koše podle formátu Prometheus se počítají až při výpisu.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labelvalues):
+        key = tuple(labelvalues)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                self._check(key)
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def merge(self, total, value):
+        if total is None:
+            return self._copy(value)
+        if len(total[0]) != len(value[0]):
+            raise ValueError(f'Metrika {self.name} má ve snímcích různé koše.')
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def _render_value(self, labelvalues, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets + (math.inf,), counts):
+            cumulative += n
+            labels = _labels(self.labelnames, labelvalues, [('le', _number(bound))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _labels(self.labelnames, labelvalues)
+        lines.append(f'{self.name}_sum{labels} {_number(total)}')
+        lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class StageTimer:
+    """
+    Stopky pro fáze jednoho požadavku: `lap(stage)` zapíše do histogramu čas od předchozího volání
+    (nebo od vytvoření) se štítky `labelvalues` a názvem fáze jako posledním štítkem.
+    """
+
+    def __init__(self, histogram, *labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+        self._last = time.perf_counter()
+
+    def lap(self, stage):
+        now = time.perf_counter()
+        self.histogram.observe(now - self._last, *self.labelvalues, stage)
+        self._last = now
+
+
+class _NullMetric:
+    """
+    Metrika vypnutého registru: všechny metody nic nedělají.
+    """
+
+    def inc(self, *labelvalues, amount=1):
+        pass
+
+    def set(self, value, *labelvalues):
+        pass
+
+    def clear(self):
+        pass
+
+    def observe(self, value, *labelvalues):
+        pass
+
+    def lap(self, stage):
+        pass
+
+
+_NULL = _NullMetric()
+
+
+def _snapshot_path(directory, pid):
+    return os.path.join(directory, f'metrics-{pid}.json')
+
+
+def _write_json(path, data):
+    """
+    Zapíše JSON atomicky (dočasný soubor a přejmenování), čtenář tak nikdy nenarazí na rozepsaný snímek.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def clear_snapshots(directory):
+    """
+    Smaže snímky metrik ze složky (při startu serveru, aby se nesčítaly metriky předchozího běhu).
+    """
+    for path in glob.glob(os.path.join(directory, SNAPSHOT_PATTERN)):
+        os.remove(path)
+
+
+def mark_process_dead(directory, pid):
+    """
+    Označí snímek ukončeného procesu: jeho čítače a histogramy se dál sčítají, hodnoty (gauge) už ne.
+    Volá master serveru, takže to platí i pro worker ukončený bez úklidu (např. po vypršení timeoutu).
+    """
+    path = _snapshot_path(directory, pid)
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    data['alive'] = False
+    _write_json(path, data)
+
+
+class MetricsRegistry:
+    """
+    Registr metrik procesu. S `enabled=False` nic neměří a render() vrací prázdný text.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = []
+        self.snapshot_dir = None
+        self._snapshot_pid = None
+        self._stopping = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def _register(self, metric):
+        if not self.enabled:
+            return _NULL
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def stage_timer(self, histogram, *labelvalues):
+        """
+        Vrátí stopky pro fáze požadavku (u vypnutého registru sdílené prázdné stopky).
+        """
+        return StageTimer(histogram, *labelvalues) if self.enabled else _NULL
+
+    def render(self):
+        """
+        Vypíše všechny metriky v textovém formátu Prometheus. Po start_snapshots() sečtené přes všechny procesy,
+        které zapisují snímky do stejné složky, jinak jen metriky tohoto procesu.
+        """
+        if self.snapshot_dir is not None and self._snapshot_pid == os.getpid():
+            return self._render_snapshots()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def start_snapshots(self, directory, interval=1.0, before_write=None):
+        """
+        Spustí vlákno, které každých `interval` sekund zapíše snímek metrik procesu do `directory`
+        (v každém workeru zvlášť – vlákna nepřežijí fork). `before_write()` se zavolá před každým zápisem
+        (např. pro nastavení hodnot, které se jinak mění jen při dotazu na /metrics).
+        """
+        if not self.enabled:
+            return
+        if self._thread is not None and self._snapshot_pid == os.getpid() and self._thread.is_alive():
+            return
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_dir = directory
+        self._snapshot_pid = os.getpid()
+        self._stopping.clear()
+
+        def run():
+            while not self._stopping.wait(interval):
+                if before_write is not None:
+                    before_write()
+                self.write_snapshot()
+
+        self._thread = threading.Thread(target=run, name='metrics-snapshot', daemon=True)
+        self._thread.start()
+
+    def stop_snapshots(self):
+        """
+        Ukončí vlákno a zapíše poslední snímek, označený jako snímek ukončeného procesu.
+        """
+        if self.snapshot_dir is None or self._snapshot_pid != os.getpid():
+            return
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.write_snapshot(alive=False)
+        self._thread = None
+
+    def write_snapshot(self, alive=True):
+        """
+        Zapíše snímek metrik procesu do složky snímků.
+        """
+        data = {
+            'pid': os.getpid(),
+            'alive': alive,
+            'metrics': {metric.name: metric.snapshot() for metric in self._metrics}
+        }
+        with self._write_lock:  # Vlákno snímků a obsluha /metrics zapisují stejný soubor
+            _write_json(_snapshot_path(self.snapshot_dir, os.getpid()), data)
+
+    def _render_snapshots(self):
+        """
+        Sečte metriky ze snímků všech procesů. Vlastní snímek se před čtením zapíše znovu, aby byl aktuální.
+        """
+        self.write_snapshot()
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.snapshot_dir, SNAPSHOT_PATTERN))):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Soubor mezitím smazaný nebo cizí
+        lines = []
+        for metric in self._metrics:
+            values = {}
+            for data in snapshots:
+                if isinstance(metric, Gauge) and not data.get('alive', True):
+                    continue
+                for labelvalues, value in data.get('metrics', {}).get(metric.name, []):
+                    key = tuple(labelvalues)
+                    values[key] = metric.merge(values.get(key), value)
+            lines.extend(metric.render(values))
+        return '\n'.join(lines) + '\n' if lines else ''
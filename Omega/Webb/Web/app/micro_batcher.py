@@ -0,0 +1,133 @@
+"""Tento modul implementuje slučování souběžných požadavků do mikro-dávek (asyncio).
+Každý požadavek vloží svůj vstup do fronty a čeká na výsledek. Sběrná smyčka vezme první čekající vstup,
+počká nejvýš `max_wait_ms` milisekund na další (nebo dokud jich není `max_batch_size`) a celou dávku
+vyhodnotí jedním voláním `predict_fn` v pracovním vlákně, takže smyčka událostí mezitím přijímá další
+požadavky. Ty se během výpočtu hromadí ve frontě a tvoří další dávku – při zátěži dávky rostou samy.
+Výsledky se vrátí volajícím ve stejném pořadí, chyba výpočtu se předá všem požadavkům z dávky.
+
+Použití (uvnitř běžící smyčky událostí):
+    batcher = MicroBatcher(lambda vehicles: predictor.predict_many(vehicles), max_batch_size=64, max_wait_ms=2)
+    batcher.start()
+    value = await batcher.submit(vehicle)
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """
+    Sběr vstupů do dávek a jejich vyhodnocení v jednom pracovním vlákně. `predict_fn(inputs)` dostane
+    seznam vstupů a vrátí posloupnost výsledků stejné délky. `max_batch_size=1` dávkování vypne
+    (každý požadavek se vyhodnotí zvlášť, ale stále mimo smyčku událostí).
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size musí být alespoň 1.')
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self._queue = None
+        self._full = None
+        self._task = None
+        self._executor = None
+
+    def start(self):
+        """
+        Spustí sběrnou smyčku v aktuální smyčce událostí. Opakované volání nic nedělá.
+        """
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._full = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='micro-batch')
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """
+        Ukončí sběrnou smyčku a pracovní vlákno. Čekající požadavky dostanou CancelledError.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            self._queue.get_nowait()[1].cancel()
+        self._executor.shutdown(wait=True)
+        self._task = None
+
+    async def submit(self, item):
+        """
+        Vloží vstup do příští dávky a počká na jeho výsledek.
+        """
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        if self._queue.qsize() >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    def stats(self):
+        """
+        Vrátí počet dávek, vyhodnocených vstupů a průměrnou i největší velikost dávky.
+        """
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': round(self.rows / self.batches, 2) if self.batches else None,
+            'largest_batch': self.largest_batch
+        }
+
+    async def _collect(self):
+        """
+        Počká na první vstup a pak na další, dokud neuplyne okno `max_wait` nebo se dávka nenaplní.
+        """
+        batch = [await self._queue.get()]
+        if self.max_batch_size > 1 and self.max_wait > 0 and self._queue.qsize() < self.max_batch_size - 1:
+            self._full.clear()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        """
+        Hlavní smyčka: sběr dávky, výpočet v pracovním vlákně a předání výsledků čekajícím požadavkům.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [(item, future) for item, future in batch if not future.done()]  # Zrušené požadavky
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_fn, [item for item, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
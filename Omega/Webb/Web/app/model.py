@@ -2,60 +2,38 @@ import pandas as pd
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import OneHotEncoder
 import numpy as np
 import joblib
+import json
+import os
+
+from features import load_features
+from flat_forest import compile_forest
+from compress_model import compare_artifacts, compress
+from model_registry import publish_version
 
 # ---------------------------
 # 1. Načtení a úprava dat
 # ---------------------------
 
-# Načtení datového souboru
-file_path = 'C:/Users/danhe/Downloads/Webb/Web/crawler/doopravdy_hotove_auta.csv'
-df = pd.read_csv(file_path)
-
-# Převedení spotřeby na číselný formát (odstranění jednotek)
-df['Kombinovaná'] = df['Kombinovaná'].str.replace(' l/100km', '').astype(float)
-
-# Převedení výkonu motoru na číselný formát
-df['Výkon'] = df['Výkon'].str.replace('kW', '').astype(float)
+# Načtení sdíleného úložiště příznaků (features.py); při změně zdrojového CSV se samo přestaví
+features = load_features()
 
-# Výpočet stáří vozidla z roku uvedení do provozu
-df['Stáří vozidla'] = 2025 - df['Rok uvedení do provozu']
-
-# Odstranění chybných nebo nerelevantních záznamů (např. 'zaod' v poli Motor)
-df = df[df['Motor'] != 'zaod']
-
-# ---------------------------
-# 2. Příprava vstupních a cílových dat
-# ---------------------------
-
-# Vstupní proměnné (bez cílové proměnné a roku)
-X = df.drop(['Kombinovaná', 'Rok uvedení do provozu'], axis=1)
+# Vstupní proměnné: one-hot zakódované kategorie, výkon a stáří vozidla (záznamy s motorem 'zaod' jsou vyřazené)
+X_processed = features.encoded_frame()
 
 # Cílová proměnná – kombinovaná spotřeba
-y = df['Kombinovaná']
+y = pd.Series(features.y, name='Kombinovaná')
 
 # ---------------------------
-# 3. Kódování kategoriálních proměnných
+# 2. Encoder kategoriálních proměnných
 # ---------------------------
 
-# Definování kategoriálních sloupců
-categorical_cols = ['Karoserie', 'Palivo', 'Motor']
-
-# Použití OneHotEncoder pro zakódování kategorií
-encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
-X_encoded = encoder.fit_transform(X[categorical_cols])
-
-# Spojení zakódovaných dat s číselnými vstupy (výkon a stáří)
-feature_names = list(encoder.get_feature_names_out(categorical_cols)) + ['Výkon', 'Stáří vozidla']
-X_processed = pd.DataFrame(
-    np.hstack([X_encoded, X[['Výkon', 'Stáří vozidla']]]),
-    columns=feature_names
-)
+# Encoder se stejnými kategoriemi, jaké má matice příznaků (ukládá se k modelu pro app.py)
+encoder = features.fit_encoder()
 
 # ---------------------------
-# 4. Rozdělení dat
+# 3. Rozdělení dat
 # ---------------------------
 
 # Rozdělení na trénovací a testovací sadu (80 % trénink, 20 % test)
@@ -64,21 +42,27 @@ X_train, X_test, y_train, y_test = train_test_split(
 )
 
 # ---------------------------
-# 5. Trénování modelu
+# 4. Trénování modelu
 # ---------------------------
 
+# Hyperparametry: nejlepší RandomForest z výběru modelu (modely/model_selection.py), jinak výchozí hodnoty
+rf_params = {'n_estimators': 200, 'max_depth': 10, 'min_samples_leaf': 2}
+selection_report = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'modely', 'model_selection.json')
+if os.path.exists(selection_report):
+    with open(selection_report, 'r', encoding='utf-8') as f:
+        rf_params = json.load(f)['best_params'].get('RandomForest', rf_params)
+    print(f"Hyperparametry z {selection_report}: {rf_params}")
+
 # Inicializace a trénink Random Forest modelu
 model = RandomForestRegressor(
-    n_estimators=200,
-    max_depth=10,
-    min_samples_leaf=2,
+    **rf_params,
     random_state=42,
     n_jobs=-1
 )
 model.fit(X_train, y_train)
 
 # ---------------------------
-# 6. Uložení modelu a encoderu
+# 5. Uložení modelu a encoderu
 # ---------------------------
 
 # Serializace modelu a encoderu do souboru pomocí joblib
@@ -86,8 +70,20 @@ joblib.dump(model, 'random_forest.pkl')
 joblib.dump(encoder, 'encoder.pkl')
 print("Model a encoder byly úspěšně uloženy.")
 
+# Export do kompaktního formátu z plochých NumPy polí (načítá ho app.py s MODEL_PATH=random_forest.npz)
+compile_forest(model).save('random_forest.npz')
+print("Kompaktní model byl uložen do random_forest.npz.")
+
+# Komprese: výběr stromů s odchylkou od celého lesa do 0.01 l/100km, menší typy prahů a hodnot,
+# sloučení shodných podstromů (compress_model.py); srovnání velikosti, načtení, latence a MAE před a po
+compressed = compress(model, X_train.to_numpy(), encoder)
+compressed.save('random_forest_compressed.npz')
+print(f"Komprimovaný model ({compressed.n_trees} stromů, {compressed.n_nodes} uzlů) byl uložen do random_forest_compressed.npz.")
+compare_artifacts(['random_forest.pkl', 'random_forest.npz', 'random_forest_compressed.npz'],
+                  X_test.to_numpy(), y_test.to_numpy(), features.feature_names)
+
 # ---------------------------
-# 7. Vyhodnocení modelu
+# 6. Vyhodnocení modelu
 # ---------------------------
 
 # Predikce na testovacích datech
@@ -104,13 +100,35 @@ print(f'RMSE: {rmse:.2f}')
 print(f'R²: {r2:.2f}')
 
 # ---------------------------
-# 8. Cross-validace modelu
+# 7. Cross-validace modelu
 # ---------------------------
 
 # 5-fold cross-validace a výpočet průměrného R² skóre
 cv_scores = cross_val_score(model, X_processed, y, cv=5, scoring='r2')
 print(f'Cross-val R²: {cv_scores.mean():.2f} (±{cv_scores.std():.2f})')
 
+# ---------------------------
+# 8. Publikování verze modelu
+# ---------------------------
+
+# Nová verze pro registr modelů (model_registry.py) – běžící aplikace ji načte a vymění bez restartu
+models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.environ.get('MODEL_REGISTRY_DIR', 'models'))
+version = publish_version(
+    models_dir,
+    {
+        'random_forest.pkl': 'random_forest.pkl',
+        'random_forest.npz': 'random_forest.npz',
+        'random_forest_compressed.npz': 'random_forest_compressed.npz',
+        'encoder.pkl': 'encoder.pkl'
+    },
+    {
+        'params': rf_params,
+        'metrics': {'mae': mae, 'rmse': rmse, 'r2': r2, 'cv_r2': cv_scores.mean()},
+        'features_sha256': features.schema['source_sha256']
+    }
+)
+print(f"Verze modelu {version} byla publikována do {models_dir}.")
+
 """
 MAE: 0.06
 RMSE: 0.10
@@ -0,0 +1,342 @@
+"""Registr verzí modelu s výměnou za běhu.
+model.py po natrénování publikuje novou verzi jako složku models/<verze>/ (model, encoder, manifest.json).
+Složka vzniká pod dočasným jménem a přejmenuje se až hotová, takže registr nikdy neuvidí rozepsanou verzi.
+
+Registr na pozadí sleduje složku s verzemi. Novou verzi načte a zahřeje ve vlastním vlákně a teprve potom
+ji jediným přiřazením (`registry.current = bundle`) nastaví jako aktuální. Požadavek si na začátku vezme
+aktuální verzi a použije ji až do konce, takže rozpracované požadavky výměna neovlivní.
+
+Předchozí verze zůstávají načtené v paměti (`keep`), návrat k nim je okamžitý. Návrat i ruční výběr verze
+se zapisují do souboru ACTIVE ve složce verzí, podle kterého se řídí všechny procesy (workery serveru);
+bez souboru ACTIVE je aktivní nejnovější verze (podle času vytvoření v manifestu). Do ACTIVE se zapisují
+jen verze, které ve složce existují – návrat k záložnímu modelu (MODEL_PATH) ho nejdřív publikuje jako verzi.
+
+Použití:
+    registry = ModelRegistry('models', 'random_forest.pkl', fallback_model='random_forest.pkl',
+                             fallback_encoder='encoder.pkl')
+    registry.start()
+    bundle = registry.current
+    bundle.fast_predictor.predict_one(...)
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+
+import joblib
+
+from features import file_sha256
+from form_options import FormOptions
+from inference import CATEGORICAL_COLS, NUMERICAL_COLS, FastPredictor, build_category_index, load_model
+from lookup_table import LookupTable
+
+MANIFEST_FILE = 'manifest.json'
+ACTIVE_FILE = 'ACTIVE'
+LATEST = 'latest'
+
+
+class ModelBundle:
+    """
+    Jedna načtená verze modelu: model, encoder a vše, co z nich aplikace předpočítává.
+    """
+
+    def __init__(self, version, model_path, encoder_path, manifest=None, mmap_mode=None, lookup_table_path=None):
+        self.version = version
+        self.model_path = model_path
+        self.encoder_path = encoder_path
+        self.manifest = manifest or {}
+        self.model = load_model(model_path, mmap_mode)
+        self.encoder = joblib.load(encoder_path)
+        self.category_index, self.n_encoded = build_category_index(self.encoder)
+        self.feature_names = [str(name) for name in self.encoder.get_feature_names_out(CATEGORICAL_COLS)] + NUMERICAL_COLS
+        self.fast_predictor = FastPredictor(self.model, self.encoder)
+        self.form_options = FormOptions(encoder_path)
+        self.lookup_table = None
+        if lookup_table_path is not None:
+            try:
+                self.lookup_table = LookupTable.load(lookup_table_path, model_path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Lookup tabulku pro verzi {version} nelze použít ({e}), predikce počítá model.")
+        self.loaded_at = time.time()
+
+    def warm_up(self):
+        """
+        Jedna predikce pro každou kategorii karoserie – první volání modelu neproběhne až v požadavku.
+        """
+        other = [str(categories[0]) for categories in self.encoder.categories_[1:]]
+        for body_type in self.encoder.categories_[0]:
+            self.fast_predictor.predict_one(str(body_type), *other, 100.0, 10.0)
+        return self
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'model': os.path.basename(self.model_path),
+            'loaded_at': datetime.fromtimestamp(self.loaded_at).isoformat(timespec='seconds'),
+            'metrics': self.manifest.get('metrics')
+        }
+
+
+def publish_version(root, files, metadata=None, version=None):
+    """
+    Zkopíruje soubory modelu (slovník {název v balíčku: cesta}) do nové složky verze a zapíše manifest.
+    Složka se přejmenuje na cílové jméno až po zápisu všech souborů. Vrátí název verze.
+    """
+    version = version or datetime.now().strftime('%Y%m%d-%H%M%S')
+    os.makedirs(root, exist_ok=True)
+    staging = os.path.join(root, f'.{version}.tmp')
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, path in files.items():
+        shutil.copy2(path, os.path.join(staging, name))
+    manifest = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'files': {name: file_sha256(os.path.join(staging, name)) for name in files},
+        **(metadata or {})
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.rename(staging, os.path.join(root, version))
+    return version
+
+
+class ModelRegistry:
+    """
+    Aktuální verze modelu (`current`), předchozí verze v paměti (`history`) a vlákno, které sleduje
+    nové verze ve složce `root`. Pokud ve složce žádná verze není, použije se `fallback_model`
+    a `fallback_encoder` (verze je pak začátek SHA-256 souboru modelu).
+    """
+
+    def __init__(self, root, model_file, encoder_file='encoder.pkl', fallback_model=None, fallback_encoder=None,
+                 poll_interval=5.0, keep=2, mmap_mode=None, lookup_table_path=None):
+        self.root = root
+        self.model_file = model_file
+        self.encoder_file = encoder_file
+        self.poll_interval = poll_interval
+        self.keep = keep
+        self.bundle_options = {'mmap_mode': mmap_mode, 'lookup_table_path': lookup_table_path}
+        self.history = []  # Předchozí verze od nejstarší, poslední je ta, na kterou vede rollback
+        self.failed = {}  # Verze, které se nepodařilo načíst: {verze: chyba}
+        self.swaps = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        self.current = self._initial_bundle(fallback_model, fallback_encoder)
+
+    def _initial_bundle(self, fallback_model, fallback_encoder):
+        """
+        Načte verzi pro start: zafixovanou v ACTIVE nebo nejnovější, při chybě další načitatelnou verzi
+        od nejnovější a nakonec záložní model. Neúspěšné verze zapíše do `failed`.
+        """
+        candidates = [self.target_version()] + list(reversed(self.versions()))
+        for version in dict.fromkeys(v for v in candidates if v is not None):
+            try:
+                return self._load(version).warm_up()
+            except Exception as e:
+                self.failed[version] = str(e)
+                print(f"⚠️ Verzi modelu {version} se nepodařilo načíst: {e}")
+        version = file_sha256(fallback_model)[:12]
+        return ModelBundle(version, fallback_model, fallback_encoder, **self.bundle_options).warm_up()
+
+    def versions(self):
+        """
+        Vrátí názvy hotových verzí (složka s manifestem a souborem modelu) od nejstarší podle času vytvoření
+        v manifestu, při shodě podle názvu.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        names = [
+            name for name in os.listdir(self.root)
+            if not name.startswith('.')
+            and os.path.exists(os.path.join(self.root, name, MANIFEST_FILE))
+            and os.path.exists(os.path.join(self.root, name, self.model_file))
+        ]
+        return sorted(names, key=lambda name: (self._created_at(name), name))
+
+    def _created_at(self, version):
+        try:
+            with open(os.path.join(self.root, version, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                return str(json.load(f).get('created_at', ''))
+        except (OSError, ValueError):
+            return ''
+
+    def pinned(self):
+        """
+        Vrátí verzi zapsanou v souboru ACTIVE, nebo None (aktivní je nejnovější verze).
+        """
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE), 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _pin(self, version):
+        """
+        Zapíše (atomicky) nebo s version=None smaže soubor ACTIVE. Verze musí ve složce existovat.
+        """
+        path = os.path.join(self.root, ACTIVE_FILE)
+        if version is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        if version not in self.versions():
+            raise LookupError(f'Verze modelu {version} není ve složce {self.root}.')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(path + '.tmp', path)
+
+    def target_version(self):
+        """
+        Verze, která má být aktivní: zapsaná v ACTIVE, jinak nejnovější. None, pokud žádná verze není.
+        """
+        pinned = self.pinned()
+        if pinned is not None:
+            return pinned
+        versions = self.versions()
+        return versions[-1] if versions else None
+
+    def _load(self, version):
+        """
+        Načte verzi ze složky `root`.
+        """
+        folder = os.path.join(self.root, version)
+        with open(os.path.join(folder, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return ModelBundle(
+            version, os.path.join(folder, self.model_file), os.path.join(folder, self.encoder_file),
+            manifest, **self.bundle_options
+        )
+
+    def _publish(self, bundle):
+        """
+        Zajistí, že verze načtená v paměti existuje i ve složce (záložní model z MODEL_PATH tam není),
+        aby ji po zápisu do ACTIVE mohly načíst ostatní procesy i příští start. Čas vytvoření je čas
+        úpravy souboru modelu, takže publikovaná záloha nepředběhne novější verze.
+        """
+        if bundle.version in self.versions():
+            return
+        created_at = datetime.fromtimestamp(os.path.getmtime(bundle.model_path)).isoformat(timespec='seconds')
+        publish_version(
+            self.root, {self.model_file: bundle.model_path, self.encoder_file: bundle.encoder_path},
+            {'created_at': created_at, 'source': 'fallback'}, version=bundle.version
+        )
+
+    def _swap(self, bundle):
+        """
+        Nastaví verzi jako aktuální; dosavadní se přesune do historie. Volá se se zamčeným zámkem.
+        """
+        previous = self.current
+        self.history = [b for b in self.history if b.version != bundle.version] + [previous]
+        self.history = self.history[-(self.keep - 1):] if self.keep > 1 else []
+        self.current = bundle
+        self.swaps += 1
+        print(f"🔄 Model {previous.version} → {bundle.version}")
+
+    def check(self):
+        """
+        Pokud má být aktivní jiná verze, než je aktuální, načte ji (nebo vezme z historie), zahřeje a vymění.
+        Chyba při načtení verzi označí jako neúspěšnou a aktuální verze zůstane.
+        """
+        target = self.target_version()
+        if target is None or target == self.current.version or target in self.failed:
+            return False
+        bundle = next((b for b in self.history if b.version == target), None)
+        if bundle is None:
+            if target not in self.versions():
+                return False
+            try:
+                bundle = self._load(target).warm_up()
+            except Exception as e:
+                self.failed[target] = str(e)
+                print(f"⚠️ Verzi modelu {target} se nepodařilo načíst: {e}")
+                return False
+        with self._lock:
+            if self.target_version() != target:  # Mezitím se cíl změnil (rollback) – rozhodne další kontrola
+                return False
+            self._swap(bundle)
+        return True
+
+    def rollback(self):
+        """
+        Okamžitě se vrátí k předchozí verzi v paměti a zapíše ji do ACTIVE, aby ji převzaly i ostatní procesy.
+        Vyhodí LookupError, pokud žádná předchozí verze není načtená.
+        """
+        with self._lock:
+            if not self.history:
+                raise LookupError('Žádná předchozí verze modelu není načtená.')
+            previous = self.history[-1]
+            self._publish(previous)
+            self._pin(previous.version)
+            self._swap(previous)
+            return previous
+
+    def activate(self, version):
+        """
+        Nastaví verzi, která má být aktivní ('latest' = vždy nejnovější), a probudí sledovací vlákno.
+        Samotné načtení proběhne na pozadí. Vyhodí LookupError pro neznámou verzi.
+        """
+        if version == LATEST:
+            self._pin(None)
+        else:
+            if version not in self.versions():
+                loaded = next((b for b in self.history + [self.current] if b.version == version), None)
+                if loaded is None:
+                    raise LookupError(f'Neznámá verze modelu: {version}')
+                self._publish(loaded)
+            self._pin(version)
+        self.failed.pop(version, None)
+        self._wake.set()
+
+    def start(self):
+        """
+        Spustí sledovací vlákno (v každém procesu zvlášť – vlákna nepřežijí fork). Opakované volání nic nedělá.
+        """
+        if self.poll_interval <= 0:
+            return
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='model-registry', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Ukončí sledovací vlákno.
+        """
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                self.check()
+            except Exception as e:
+                print(f"⚠️ Chyba při kontrole verzí modelu: {e}")
+
+    def describe(self):
+        """
+        Stav registru pro endpoint /model.
+        """
+        return {
+            'current': self.current.describe(),
+            'previous': [bundle.version for bundle in reversed(self.history)],
+            'pinned': self.pinned(),
+            'available': self.versions(),
+            'failed': self.failed,
+            'swaps': self.swaps
+        }
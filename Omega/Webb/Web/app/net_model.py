@@ -0,0 +1,65 @@
+"""Obsluha neuronové sítě exportované z modely/net_trainer.py.
+Exportovaná síť obsahuje i standardizaci číselných sloupců, takže přijímá stejnou matici z encoderu
+jako Random Forest a app.py ji volá přes predict jako ostatní modely. Velké dávky se rozdělí
+na bloky o velikosti `batch_size`, aby síť nealokovala mezivýsledky pro celou dávku najednou.
+
+Formát podle přípony:
+    *.pt   – TorchScript (vyžaduje torch)
+    *.onnx – ONNX (vyžaduje onnxruntime)
+
+Nastavení proměnnými prostředí:
+    NET_BATCH_SIZE – řádků na jedno volání sítě (výchozí 1024)
+    NET_THREADS    – počet vláken pro výpočet sítě (výchozí podle knihovny)
+"""
+
+import os
+
+import numpy as np
+
+NET_BATCH_SIZE = int(os.environ.get('NET_BATCH_SIZE', 1024))
+NET_THREADS = int(os.environ.get('NET_THREADS', 0))
+
+
+class NetModel:
+    """
+    Exportovaná síť s rozhraním predict(X) pro zakódovanou matici.
+    """
+
+    def __init__(self, path, batch_size=NET_BATCH_SIZE, threads=NET_THREADS):
+        self.path = path
+        self.batch_size = batch_size
+        if str(path).endswith('.onnx'):
+            try:
+                import onnxruntime
+            except ImportError:
+                raise RuntimeError('Model ONNX vyžaduje balíček onnxruntime (pip install onnxruntime).')
+            options = onnxruntime.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+            self.session = onnxruntime.InferenceSession(str(path), options, providers=['CPUExecutionProvider'])
+            self.input_name = self.session.get_inputs()[0].name
+            self._run = self._run_onnx
+        else:
+            try:
+                import torch
+            except ImportError:
+                raise RuntimeError('Model TorchScript vyžaduje balíček torch (pip install torch).')
+            if threads:
+                torch.set_num_threads(threads)
+            self.torch = torch
+            self.module = torch.jit.load(str(path), map_location='cpu').eval()
+            self._run = self._run_torch
+
+    def _run_torch(self, X):
+        with self.torch.inference_mode():
+            return self.module(self.torch.from_numpy(X)).numpy().ravel()
+
+    def _run_onnx(self, X):
+        return self.session.run(None, {self.input_name: X})[0].ravel()
+
+    def predict(self, X):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        result = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], self.batch_size):
+            result[start:start + self.batch_size] = self._run(X[start:start + self.batch_size])
+        return result
@@ -0,0 +1,84 @@
+"""Tento modul implementuje omezenou LRU/TTL cache predikcí.
+Všechny vstupy modelu jsou diskrétní (karoserie, palivo, motor, rok a téměř vždy celočíselný výkon),
+takže opakované konfigurace lze vrátit z cache bez kódování a bez průchodu lesem.
+Aplikace do klíče přidává verzi modelu (model_registry.py), takže po výměně verze se staré predikce
+nepoužijí a po návratu k předchozí verzi je cache stále teplá."""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(body_type, fuel_type, engine_type, power, age):
+    """
+    Vytvoří normalizovaný klíč cache ze vstupů predikce (výkon jako float, stáří vozidla jako int).
+    """
+    return (body_type.strip(), fuel_type.strip(), engine_type.strip(), float(power), int(age))
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache s omezeným počtem položek a volitelnou dobou platnosti (TTL) v sekundách.
+    """
+
+    def __init__(self, max_entries=10000, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """
+        Vrátí uloženou predikci pro klíč, nebo None, pokud v cache není nebo vypršela.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not self.ttl or now - entry[1] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Uloží predikci do cache. Při překročení kapacity se odstraní nejdéle nepoužitá položka.
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Vyprázdní cache (počítadla zůstanou zachována).
+        """
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Vrátí počítadla zásahů a výpadků cache jako slovník.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,144 @@
+"""Tento modul implementuje zápis historie predikcí na pozadí.
+Požadavky jen vloží záznam do omezené fronty a samostatné vlákno je předává úložišti (sink) po dávkách,
+jakmile se nasbírá `batch_size` záznamů nebo uplyne `flush_interval` sekund. Do úložiště zapisuje
+jediné vlákno, takže se záznamy z různých požadavků nemohou prolínat.
+Úložiště je objekt s metodami write_batch(batch) a close() a atributem durability – v aplikaci
+PredictionStore (SQLite, prediction_store.py)."""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+
+# Režimy trvanlivosti zápisu (PredictionStore je převádí na PRAGMA synchronous):
+#   'buffered' – na disk zapisuje až operační systém, kdy sám uzná za vhodné (synchronous=OFF)
+#   'flush'    – po každé dávce jsou data předaná operačnímu systému (přežije pád procesu; NORMAL)
+#   'fsync'    – po každé dávce se data vynutí až na disk (přežije i pád systému; FULL)
+DURABILITY_MODES = ('buffered', 'flush', 'fsync')
+
+_STOP = object()  # Značka pro ukončení zapisovacího vlákna
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionLog:
+    """
+    Asynchronní zapisovač predikcí do úložiště `sink`. Fronta má omezenou velikost; když je plná,
+    `append` počká, dokud zapisovač nestihne frontu vyprázdnit (zpětný tlak místo neomezeného růstu paměti).
+    """
+
+    def __init__(self, sink, max_queue=10000, batch_size=100, flush_interval=1.0):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._write_lock = threading.Lock()
+        self.written = 0
+        self.batches = 0
+        self.failed = 0  # Záznamy, které úložiště odmítlo ani při zápisu po jednom
+        self._thread = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, record):
+        """
+        Vloží záznam do fronty k zápisu. Po uzavření logu se záznam zapíše rovnou.
+        """
+        if self._closed:
+            self._write_batch([record])
+            self.sink.close()
+            return
+        self._queue.put(record)
+
+    def flush(self):
+        """
+        Počká, dokud nejsou zapsány všechny záznamy vložené před voláním.
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Zapíše zbývající záznamy, ukončí zapisovací vlákno a zavře úložiště. Opakované volání nic nedělá.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        with self._write_lock:
+            self.sink.close()
+
+    def is_alive(self):
+        """
+        Vrátí True, pokud zapisovací vlákno běží a log není uzavřený.
+        """
+        return not self._closed and self._thread.is_alive()
+
+    def stats(self):
+        """
+        Vrátí počet čekajících, zapsaných a odmítnutých záznamů.
+        """
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'batches': self.batches,
+            'failed': self.failed,
+            'durability': self.sink.durability
+        }
+
+    def _write_batch(self, batch):
+        """
+        Předá dávku záznamů úložišti. Když dávka selže, zapisuje záznamy po jednom, takže se ztratí
+        jen ty, které úložiště odmítne; ty se zalogují a započítají do `failed`. Zapisovač pokračuje dál.
+        """
+        with self._write_lock:
+            try:
+                self.sink.write_batch(batch)
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception as e:
+                if len(batch) == 1:
+                    self.failed += 1
+                    logger.error('Záznam predikce nelze zapsat (%s): %r', e, batch[0])
+                    return
+                logger.warning('Dávku %d predikcí nelze zapsat (%s), zapisuji po jednom.', len(batch), e)
+            for record in batch:
+                try:
+                    self.sink.write_batch([record])
+                    self.written += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.error('Záznam predikce nelze zapsat (%s): %r', e, record)
+            self.batches += 1
+
+    def _run(self):
+        """
+        Hlavní smyčka zapisovacího vlákna: sbírá záznamy do dávky a zapisuje ji při naplnění nebo po čase.
+        """
+        batch = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+                self._queue.task_done()
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write_batch(batch)
+                for _ in batch:
+                    self._queue.task_done()
+                batch = []
+                deadline = None
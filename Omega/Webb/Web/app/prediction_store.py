@@ -0,0 +1,150 @@
+"""Tento modul ukládá historii predikcí do vestavěné databáze SQLite.
+Tabulka má indexy na čase vytvoření a na kategoriálních polích, stránkování je kurzorové (podle id),
+takže načtení jedné stránky historie trvá stejně dlouho bez ohledu na to, kolik predikcí je uloženo.
+PredictionStore zároveň slouží jako úložiště (sink) pro zapisovač na pozadí z prediction_log.py."""
+
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+from prediction_log import DURABILITY_MODES
+
+FILTER_FIELDS = ['body_type', 'engine_type', 'fuel_type']
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Režim trvanlivosti zapisovače odpovídá nastavení PRAGMA synchronous
+SYNCHRONOUS = {'buffered': 'OFF', 'flush': 'NORMAL', 'fsync': 'FULL'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    body_type TEXT NOT NULL,
+    engine_type TEXT NOT NULL,
+    fuel_type TEXT NOT NULL,
+    horsepower REAL NOT NULL,
+    fuel_consumption REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_created_at ON predictions (created_at);
+CREATE INDEX IF NOT EXISTS idx_predictions_body_type ON predictions (body_type, id);
+CREATE INDEX IF NOT EXISTS idx_predictions_engine_type ON predictions (engine_type, id);
+CREATE INDEX IF NOT EXISTS idx_predictions_fuel_type ON predictions (fuel_type, id);
+"""
+
+COLUMNS = ['id', 'created_at', 'body_type', 'engine_type', 'fuel_type', 'horsepower', 'fuel_consumption']
+
+
+class PredictionStore:
+    """
+    Historie predikcí v SQLite (režim WAL, takže čtení stránek neblokuje zapisovač).
+    Každé vlákno používá vlastní připojení, close() zavře připojení všech vláken.
+    """
+
+    def __init__(self, path, durability='flush'):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f'Neznámý režim trvanlivosti: {durability} (povolené: {", ".join(DURABILITY_MODES)})')
+        self.path = path
+        self.durability = durability
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connection(self):
+        """
+        Vrátí připojení k databázi pro aktuální vlákno.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)  # Zavírá ho i close() z jiného vlákna
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA synchronous={SYNCHRONOUS[self.durability]}')
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def write_batch(self, batch):
+        """
+        Vloží dávku predikcí v jedné transakci. Záznamy bez 'created_at' dostanou aktuální čas.
+        """
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                'INSERT INTO predictions (created_at, body_type, engine_type, fuel_type, horsepower, fuel_consumption) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (record.get('created_at', now), record['body_type'], record['engine_type'],
+                     record['fuel_type'], float(record['horsepower']), float(record['fuel_consumption']))
+                    for record in batch
+                ]
+            )
+
+    def close(self):
+        """
+        Zavře připojení všech vláken – zapisovače historie i vláken obsluhujících požadavky. Vlákno,
+        které úložiště použije znovu, si otevře nové připojení.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def is_empty(self):
+        """
+        Vrátí True, pokud v historii není žádná predikce.
+        """
+        return self._connection().execute('SELECT 1 FROM predictions LIMIT 1').fetchone() is None
+
+    def import_csv(self, path):
+        """
+        Jednorázově převede původní historii z predictions.csv. Všechny záznamy dostanou čas úpravy souboru.
+        Vrací počet převedených záznamů.
+        """
+        if not os.path.exists(path):
+            return 0
+        created_at = os.path.getmtime(path)
+        with open(path, 'r', encoding='utf-8') as csvfile:
+            records = [dict(row, created_at=created_at) for row in csv.DictReader(csvfile)]
+        if records:
+            self.write_batch(records)
+        return len(records)
+
+    def page(self, cursor=None, limit=DEFAULT_PAGE_SIZE, filters=None, since=None, until=None):
+        """
+        Vrátí jednu stránku predikcí od nejnovější a kurzor na další stránku (nebo None, pokud už žádná není).
+        `cursor` je id posledního záznamu předchozí stránky, `filters` slovník hodnot pro FILTER_FIELDS,
+        `since`/`until` omezují čas vytvoření (unixový čas).
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        conditions, params = [], []
+        if cursor is not None:
+            conditions.append('id < ?')
+            params.append(int(cursor))
+        for field in FILTER_FIELDS:
+            value = (filters or {}).get(field)
+            if value:
+                conditions.append(f'{field} = ?')
+                params.append(value)
+        if since is not None:
+            conditions.append('created_at >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('created_at < ?')
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self._connection().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM predictions {where} ORDER BY id DESC LIMIT ?",
+            params + [limit + 1]
+        ).fetchall()
+
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [dict(zip(COLUMNS, row)) for row in rows[:limit]], next_cursor
@@ -0,0 +1,41 @@
+"""Paměť a doba běhu procesu pro readiness probe (/ready) a report serveru (gunicorn.conf.py, serve.py).
+Čte /proc (Linux). Sdílená paměť jsou stránky společné s jinými procesy – u workerů forknutých z masteru
+s předem načteným modelem sem patří pole modelu, dokud je žádný worker nezmění (copy-on-write).
+Na systémech bez /proc vrací None."""
+
+import os
+
+
+def memory_usage(pid='self'):
+    """
+    Vrátí paměť procesu v MB: rss, pss (rss s poměrně rozpočítanými sdílenými stránkami), shared a private.
+    """
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+    fields = {}
+    for line in lines[1:]:
+        name, value = line.split(':', 1)
+        fields[name] = int(value.split()[0]) / 1024  # kB -> MB
+    return {
+        'rss': round(fields.get('Rss', 0.0), 1),
+        'pss': round(fields.get('Pss', 0.0), 1),
+        'shared': round(fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0), 1),
+        'private': round(fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0), 1)
+    }
+
+
+def child_pids(pid):
+    """
+    Vrátí PID přímých potomků procesu (workery masteru gunicorn).
+    """
+    children = []
+    try:
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children', 'r') as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        return []
+    return children
@@ -0,0 +1,145 @@
+"""Produkční spuštění aplikace: pre-fork server gunicorn s konfigurací z gunicorn.conf.py
+(model načtený jednou v masteru a sdílený workery, readiness probe /ready, postupný restart přes HUP).
+
+Spuštění (z libovolné složky – cesty se berou vůči app/):
+    python serve.py                                   # gunicorn -c gunicorn.conf.py app:app
+    WEB_CONCURRENCY=4 MODEL_PATH=random_forest.npz MODEL_MMAP=1 python serve.py
+    python serve.py --report --workers 4              # změří studený start a paměť workerů a server ukončí
+    python serve.py --asgi                            # ASGI workery s mikro-dávkami (asgi_app.py)
+
+Report spustí server na volném portu, změří dobu do první úspěšné odpovědi /ready (studený start),
+paměť masteru a každého workeru po startu a po zátěži `--requests` predikcemi. U workerů je podstatná
+soukromá paměť (private) – sdílená část (shared) jsou stránky společné s masterem, hlavně načtený model.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from process_stats import child_pids, memory_usage
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(APP_DIR, 'gunicorn.conf.py')
+READY_TIMEOUT = 60
+SAMPLE_VEHICLE = {'body_type': 'SUV', 'engine_type': 'I4', 'fuel_type': 'Benzín', 'horsepower': '110', 'year': '2018'}
+
+
+def run_server(asgi=False):
+    """
+    Spustí gunicorn s konfigurací gunicorn.conf.py v aktuálním procesu (ten se stane masterem).
+    S `asgi=True` obsluhují požadavky ASGI workery s aplikací asgi_app.py místo Flask aplikace.
+    """
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        sys.exit('Produkční server vyžaduje balíček gunicorn (pip install gunicorn); vývojový server: python app.py')
+    sys.argv = ['gunicorn', '--config', CONFIG_PATH]
+    if asgi:
+        sys.argv += ['--worker-class', 'asgi', 'asgi_app:app']
+    run()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url, process, timeout=READY_TIMEOUT):
+    """
+    Opakuje GET /ready, dokud server neodpoví 200. Vrátí tělo odpovědi.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Server skončil s kódem {process.returncode}.')
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                return json.load(response)
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.05)
+    raise TimeoutError(f'Server nebyl připraven do {timeout} s.')
+
+
+def snapshot(master_pid):
+    """
+    Paměť masteru a všech jeho workerů.
+    """
+    return {
+        'master': memory_usage(master_pid),
+        'workers': {pid: memory_usage(pid) for pid in child_pids(master_pid)}
+    }
+
+
+def print_snapshot(title, memory):
+    print(f"\n{title}")
+    print(f"{'proces':<16} {'RSS MB':>8} {'PSS MB':>8} {'sdíleno MB':>11} {'soukromě MB':>12}")
+    rows = [('master', memory['master'])] + [(f'worker {pid}', usage) for pid, usage in memory['workers'].items()]
+    for name, usage in rows:
+        if usage:
+            print(f"{name:<16} {usage['rss']:8.1f} {usage['pss']:8.1f} {usage['shared']:11.1f} {usage['private']:12.1f}")
+
+
+def report(workers, requests, output=None, asgi=False):
+    """
+    Spustí server, změří studený start a paměť workerů před a po zátěži a server ukončí (SIGTERM).
+    """
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    env = dict(os.environ, BIND=f'127.0.0.1:{port}', WEB_CONCURRENCY=str(workers))
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__)] + (['--asgi'] if asgi else []), env=env)
+    try:
+        ready = wait_ready(f'{base_url}/ready', process)
+        cold_start_s = time.perf_counter() - start
+        deadline = time.monotonic() + READY_TIMEOUT
+        while len(child_pids(process.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.5)  # Ostatní workery dokončí inicializaci
+        idle = snapshot(process.pid)
+
+        for i in range(requests):
+            vehicle = dict(SAMPLE_VEHICLE, horsepower=str(60 + i % 200))
+            with urllib.request.urlopen(f'{base_url}/predict', urllib.parse.urlencode(vehicle).encode(), timeout=10):
+                pass
+        loaded = snapshot(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+    print(f"\nStudený start (spuštění → první 200 z /ready): {cold_start_s:.2f} s, "
+          f"z toho import aplikace a načtení modelu {ready['startup_s']:.2f} s (model {ready['model']})")
+    print_snapshot('Paměť po startu', idle)
+    print_snapshot(f'Paměť po {requests} požadavcích /predict', loaded)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'workers': workers, 'cold_start_s': round(cold_start_s, 3), 'app_startup_s': ready['startup_s'],
+                'model': ready['model'], 'memory_idle_mb': idle, 'memory_loaded_mb': loaded
+            }, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Produkční server aplikace (gunicorn) a report paměti a startu.')
+    parser.add_argument('--report', action='store_true', help='Změřit studený start a paměť workerů a skončit')
+    parser.add_argument('--workers', type=int, default=2, help='Počet workerů pro --report')
+    parser.add_argument('--requests', type=int, default=200, help='Počet požadavků /predict pro --report')
+    parser.add_argument('--output', help='Uložit report také jako JSON')
+    parser.add_argument('--asgi', action='store_true', help='ASGI workery s mikro-dávkami (asgi_app.py)')
+    args = parser.parse_args()
+    if args.report:
+        report(args.workers, args.requests, args.output, args.asgi)
+    else:
+        run_server(args.asgi)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Trénování modelu HistGradientBoosting s nativními kategoriemi (boosting.py) a srovnání se současným Random Forest.
+Oba modely se učí na stejném rozdělení dat jako model.py (80/20, random_state=42) ze sdíleného úložiště
+příznaků. Report porovnává dobu trénování, latenci predikce jednoho řádku přes FastPredictor (stejná cesta
+jako /predict v app.py), propustnost dávky, velikost uloženého souboru a MAE.
+
+Spuštění:
+    python train_boosting.py                      # uloží hist_boosting.pkl a vypíše srovnání
+    MODEL_TYPE=boosting python app.py             # obsluha aplikace novým modelem
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+from boosting import CategoricalBoosting
+from features import CATEGORICAL_COLS, NUMERICAL_COLS, load_features
+from inference import FastPredictor, predict_batch
+
+LATENCY_REPEATS = 500
+RF_PARAMS = {'n_estimators': 200, 'max_depth': 10, 'min_samples_leaf': 2}  # Jako v model.py
+
+
+def artifact_size(model):
+    """
+    Vrátí velikost modelu uloženého přes joblib (stejně jako random_forest.pkl) v bajtech.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model.pkl')
+        joblib.dump(model, path)
+        return os.path.getsize(path)
+
+
+def measure(model, encoder, X_test, y_test, train_s, feature_names):
+    """
+    Změří latenci jednoho řádku (p50/p99), propustnost dávky, velikost a MAE na testovacích datech.
+    """
+    predictor = FastPredictor(model, encoder)
+    n_encoded = predictor.n_encoded
+    rows = []
+    for row in X_test[:LATENCY_REPEATS]:
+        offsets = np.cumsum([0] + [len(values) for values in encoder.categories_])
+        values = [
+            str(encoder.categories_[i][int(np.argmax(row[offsets[i]:offsets[i + 1]]))])
+            for i in range(len(CATEGORICAL_COLS))
+        ]
+        rows.append((*values, float(row[n_encoded]), float(row[n_encoded + 1])))
+    predictor.predict_one(*rows[0])  # Zahřátí
+    timings = []
+    for row in rows:
+        start = time.perf_counter()
+        predictor.predict_one(*row)
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    y_pred = predict_batch(model, feature_names, X_test)
+    batch_s = time.perf_counter() - start
+    return {
+        'train_s': round(train_s, 3),
+        'latency_p50_ms': round(float(np.percentile(timings, 50)) * 1000, 3),
+        'latency_p99_ms': round(float(np.percentile(timings, 99)) * 1000, 3),
+        'batch_rows_per_second': round(len(X_test) / batch_s),
+        'size_bytes': artifact_size(model),
+        'mae': round(float(mean_absolute_error(y_test, y_pred)), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trénování HistGradientBoosting a srovnání s Random Forest.')
+    parser.add_argument('--output', default='hist_boosting.pkl', help='Cesta k uloženému modelu')
+    parser.add_argument('--report', help='Uložit srovnání také jako JSON')
+    parser.add_argument('--max-iter', type=int, default=300)
+    parser.add_argument('--learning-rate', type=float, default=0.1)
+    args = parser.parse_args()
+
+    features = load_features()
+    X = np.asarray(features.X, dtype=np.float64)
+    y = np.asarray(features.y)
+    codes = np.column_stack([features.column(col) for col in CATEGORICAL_COLS])
+    numeric = X[:, -len(NUMERICAL_COLS):]
+    encoder = features.fit_encoder()
+    train, test = train_test_split(np.arange(len(y)), test_size=0.2, random_state=42)
+
+    start = time.perf_counter()
+    boosting = CategoricalBoosting(
+        [features.categories[col] for col in CATEGORICAL_COLS],
+        max_iter=args.max_iter, learning_rate=args.learning_rate
+    ).fit_codes(codes[train], numeric[train], y[train])
+    boosting_train_s = time.perf_counter() - start
+    difference = boosting.verify(X[test])  # Při neshodě plochých polí se sklearn se model neuloží
+    joblib.dump(boosting, args.output)
+    print(f"Model uložen do {args.output} (největší odchylka od sklearn {difference:.2g})")
+
+    start = time.perf_counter()
+    forest = RandomForestRegressor(**RF_PARAMS, random_state=42, n_jobs=-1).fit(X[train], y[train])
+    forest_train_s = time.perf_counter() - start
+
+    report = {
+        'random_forest': measure(forest, encoder, X[test], y[test], forest_train_s, features.feature_names),
+        'hist_boosting': measure(boosting, encoder, X[test], y[test], boosting_train_s, features.feature_names),
+    }
+    print(f"\n{'model':<15} {'trénink s':>9} {'p50 ms':>8} {'p99 ms':>8} {'řádků/s':>10} {'velikost kB':>11} {'MAE':>7}")
+    for name, result in report.items():
+        print(f"{name:<15} {result['train_s']:9.2f} {result['latency_p50_ms']:8.3f} {result['latency_p99_ms']:8.3f} "
+              f"{result['batch_rows_per_second']:10} {result['size_bytes'] / 1024:11.1f} {result['mae']:7.4f}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""Asynchronní varianta crawleru postavená na asyncio a aiohttp.
+Všechny kategorie se procházejí souběžně přes sdílený omezený pool spojení. Pro každý host platí
+limit souběžných požadavků a rychlost požadavků hlídá token bucket místo pevného náhodného čekání.
+Parsování HTML používá stejné funkce jako crawler.py (parse_car_links, parse_car_page).
+S parametrem --state se stav ukládá do SQLite (frontier.py) stejně jako u crawler.py.
+
+Spuštění:
+    python async_crawler.py --concurrency 20 --per-host 6 --rate 3
+    python async_crawler.py --base-url http://127.0.0.1:8000 --rate 500   # proti fixture_server.py
+"""
+
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp je potřeba jen pro asynchronní režim
+    aiohttp = None
+
+from crawler import (
+    MAX_PAGES, categories, category_page_url, headers, parse_car_links, parse_car_page, save_results
+)
+from extractors import get_extractor
+from frontier import Frontier
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}  # Stejné kódy jako Retry v create_session
+MAX_RETRIES = 5
+BACKOFF_FACTOR = 0.5
+
+
+class TokenBucket:
+    """
+    Token bucket pro omezení rychlosti: `rate` požadavků za sekundu s nárazovou kapacitou `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Počká, dokud není k dispozici token, a odebere ho.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncCrawler:
+    """
+    Souběžné procházení kategorií aut. `concurrency` omezuje celkový počet otevřených spojení,
+    `per_host` souběžné požadavky na jeden host a `rate`/`burst` rychlost požadavků na host.
+    S `frontier` se stahují jen nové nebo zastaralé inzeráty a každé auto se hned uloží.
+    """
+
+    def __init__(self, category_urls, concurrency=20, per_host=6, rate=3.0, burst=5, max_pages=MAX_PAGES,
+                 frontier=None, parse=parse_car_page):
+        self.category_urls = list(category_urls)
+        self.frontier = frontier
+        self.parse = parse
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.max_pages = max_pages
+        self._buckets = {}
+        self._semaphores = {}
+        self.pages = 0
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def _limits(self, url):
+        """
+        Vrátí token bucket a semafor pro host dané URL.
+        """
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._buckets[host], self._semaphores[host]
+
+    async def fetch(self, session, url):
+        """
+        Stáhne stránku s ohledem na limity hostu. Při chybách serveru opakuje s exponenciálním zpožděním.
+        Vrací text stránky, nebo None při neúspěchu.
+        """
+        bucket, semaphore = self._limits(url)
+        for attempt in range(MAX_RETRIES + 1):
+            await bucket.acquire()
+            try:
+                async with semaphore:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                            raise aiohttp.ClientResponseError(
+                                response.request_info, response.history, status=response.status
+                            )
+                        text = await response.text()
+                self.pages += 1
+                return text
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == MAX_RETRIES:
+                    self.errors += 1
+                    print(f"Chyba: {url} | {str(e)}")
+                    return None
+                await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+
+    async def extract(self, session, url):
+        """
+        Stáhne detail auta a zpracuje ho ve vlákně, aby parsování neblokovalo smyčku událostí.
+        Chyba parsování se jen vypíše a inzerát se označí jako neúspěšný – ostatní stránky se zpracují dál.
+        """
+        html = await self.fetch(session, url)
+        car = None
+        if html is not None:
+            try:
+                car = await asyncio.get_running_loop().run_in_executor(None, self.parse, html)
+            except Exception as e:
+                self.errors += 1
+                print(f"Chyba: {url} | {str(e)}")
+        if self.frontier:
+            if car:
+                self.frontier.mark_done(url, car)
+            else:
+                self.frontier.mark_failed(url)
+        return car
+
+    async def crawl_category(self, session, category_url, seen):
+        """
+        Projde stránky jedné kategorie a souběžně stáhne všechny nové detaily aut.
+        Končí na první stránce bez nových odkazů.
+        """
+        results = []
+        for page in range(1, self.max_pages):
+            url = category_page_url(category_url, page)
+            html = await self.fetch(session, url)
+            if html is None:
+                break
+            car_links = [link for link in parse_car_links(html, url) if link not in seen]
+            if not car_links:
+                break
+            seen.update(car_links)
+            if self.frontier:
+                car_links = self.frontier.add(car_links, category_url)  # Jen nové nebo zastaralé inzeráty
+            print(f"\n🔹 {category_url} stránka {page} ({len(car_links)} aut)")
+            cars = await asyncio.gather(*(self.extract(session, link) for link in car_links))
+            results.extend(car for car in cars if car)
+        return results
+
+    async def run(self):
+        """
+        Spustí procházení všech kategorií souběžně a vrátí seznam získaných záznamů.
+        """
+        if aiohttp is None:
+            raise RuntimeError('Asynchronní crawler vyžaduje balíček aiohttp (pip install aiohttp).')
+        start = time.perf_counter()
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        timeout = aiohttp.ClientTimeout(sock_connect=5, sock_read=10)
+        seen = set()
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            resumed = []
+            if self.frontier:
+                # Nejdřív se dokončí inzeráty rozpracované při minulém běhu
+                pending = self.frontier.pending()
+                seen.update(pending)
+                resumed = await asyncio.gather(*(self.extract(session, link) for link in pending))
+            per_category = await asyncio.gather(
+                *(self.crawl_category(session, url, seen) for url in self.category_urls)
+            )
+            per_category.append([car for car in resumed if car])
+        self.elapsed = time.perf_counter() - start
+        return [car for results in per_category for car in results]
+
+    def stats(self):
+        """
+        Vrátí počet stažených stránek, chyb a rychlost v stránkách za sekundu.
+        """
+        return {
+            'pages': self.pages,
+            'errors': self.errors,
+            'elapsed_s': round(self.elapsed, 2),
+            'pages_per_second': round(self.pages / self.elapsed, 2) if self.elapsed else 0.0
+        }
+
+
+def rebase_url(url, base_url):
+    """
+    Nahradí schéma a host URL kategorie zadanou adresou (např. lokálního fixture_server.py).
+    """
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Asynchronní crawler aut.')
+    parser.add_argument('--base-url', help='Náhradní adresa webu, např. http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=20, help='Maximální počet otevřených spojení')
+    parser.add_argument('--per-host', type=int, default=6, help='Maximální počet souběžných požadavků na host')
+    parser.add_argument('--rate', type=float, default=3.0, help='Počet požadavků za sekundu na host')
+    parser.add_argument('--burst', type=int, default=5, help='Nárazová kapacita token bucketu')
+    parser.add_argument('--output', default='vsechna_auta.csv')
+    parser.add_argument('--parser', default='bs4', choices=['bs4', 'lxml', 'stream'], help='Extrakční backend')
+    parser.add_argument('--state', help='SQLite soubor se stavem procházení (přírůstkový režim s pokračováním)')
+    parser.add_argument('--max-age-days', type=float, default=7, help='Po kolika dnech se uložené auto stáhne znovu')
+    args = parser.parse_args()
+
+    category_urls = [rebase_url(url, args.base_url) for url in categories] if args.base_url else categories
+    frontier = Frontier(args.state, args.max_age_days) if args.state else None
+    crawler = AsyncCrawler(category_urls, args.concurrency, args.per_host, args.rate, args.burst,
+                           frontier=frontier, parse=get_extractor(args.parser))
+    all_results = []
+    try:
+        all_results = asyncio.run(crawler.run())
+    except KeyboardInterrupt:
+        print("\n🛑 Ukončeno uživatelem")
+    finally:
+        if frontier:
+            frontier.export_csv(args.output)  # Všechna uložená auta, nejen z tohoto běhu
+            frontier.close()
+        else:
+            save_results(all_results, args.output)
+        stats = crawler.stats()
+        print(f"📈 {stats['pages']} stránek za {stats['elapsed_s']} s "
+              f"({stats['pages_per_second']} stránek/s, chyb: {stats['errors']})")
+
+
+if __name__ == '__main__':
+    main()
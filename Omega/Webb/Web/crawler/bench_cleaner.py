@@ -0,0 +1,82 @@
+"""Benchmark čištění dat (cleaner.py) na syntetických datech.
+Porovná původní postup (df.apply s řetězcem podmínek pro každý řádek a samostatné průchody
+str.contains) s vektorovým vyhodnocením nad unikátními hodnotami a ověří, že výsledky jsou stejné.
+
+Spuštění:
+    python bench_cleaner.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaner import clean, convert_engine_type
+
+ENGINES = [
+    '1.0 TSI', '1.2 TSI', '1.5 eTSI', '1.6 CRDi', '1.9 TDI', '2.0 TDI', 'D5 AWD', '3.0 TDI', 'xDrive30d',
+    '300 d 4MATIC', 'E 350 CGI', '50 TDI quattro', '55 TFSI', 'Flying Spur', 'Turbo S', 'RS6', '2.5 L', 'Electric'
+]
+FUELS = ['Benzín', 'Diesel', 'Benzín + LPG', 'Hybridní', 'Elektro', None]
+BODY_TYPES = ['Combi', 'SUV', 'Sedan', 'Hatchback', 'Rodinné vozy', 'Coupe']
+
+
+def make_dataset(rows, seed=0):
+    """
+    Vygeneruje data ve tvaru vsechna_auta.csv z crawleru.
+    """
+    rng = np.random.default_rng(seed)
+    power = rng.integers(50, 400, rows)
+    motor = np.array(ENGINES, dtype=object)[rng.integers(0, len(ENGINES), rows)] + ', ' + power.astype(str) + 'kW'
+    consumption = pd.Series(np.round(rng.uniform(4, 15, rows), 1).astype(str)) + ' l/100km'
+    consumption[rng.random(rows) < 0.3] = None  # Část záznamů bez spotřeby
+    return pd.DataFrame({
+        'Kombinovaná': consumption,
+        'Rok uvedení do provozu': rng.integers(2000, 2025, rows),
+        'Karoserie': np.array(BODY_TYPES, dtype=object)[rng.integers(0, len(BODY_TYPES), rows)],
+        'Palivo': np.array(FUELS, dtype=object)[rng.integers(0, len(FUELS), rows)],
+        'Motor': motor,
+        'Výkon': power
+    })
+
+
+def legacy_clean(df):
+    """
+    Původní postup cleaner.py: samostatné filtry a df.apply po řádcích.
+    """
+    df_clean = df[df['Kombinovaná'].notna()]
+    is_spotreba_ok = df_clean['Kombinovaná'].notna()
+    is_benzin_or_diesel = df_clean['Palivo'].str.contains('benzín|diesel', case=False, na=False)
+    is_not_hybrid = ~df_clean['Palivo'].str.contains('hybrid', case=False, na=False)
+    is_not_lpg = ~df_clean['Palivo'].str.contains('LPG', case=False, na=False)
+    is_not_zaod = ~df_clean['Motor'].str.contains('zaod', case=False, na=False)
+    df_clean = df_clean[is_spotreba_ok & is_benzin_or_diesel & is_not_hybrid & is_not_lpg & is_not_zaod].copy()
+    df_clean[['Motor', 'Výkon']] = df_clean['Motor'].str.extract(r'^([^,]+),\s*([^,]+)')
+    df_clean['Motor'] = df_clean['Motor'].apply(convert_engine_type)
+    return df_clean.dropna(subset=['Motor'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark čištění dat.')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = make_dataset(args.rows)
+    print(f"Řádků: {len(df):,}")
+
+    start = time.perf_counter()
+    expected = legacy_clean(df)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, result = clean(df)
+    vectorized_time = time.perf_counter() - start
+
+    same = expected.reset_index(drop=True).equals(result.reset_index(drop=True))
+    print(f"původní   {legacy_time:8.3f} s")
+    print(f"vektorový {vectorized_time:8.3f} s | {legacy_time / vectorized_time:5.1f}x | shodné výsledky: {same}")
+
+
+if __name__ == '__main__':
+    main()
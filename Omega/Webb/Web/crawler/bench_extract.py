@@ -0,0 +1,59 @@
+"""Benchmark extrakčních backendů (extractors.py) nad uloženými stránkami detailu auta.
+Pro každý backend vypíše počet zpracovaných stránek za sekundu a ověří, že výsledky odpovídají
+původnímu parseru 'bs4'. Bez --pages-dir se použijí stránky generované fixture_server.py.
+
+Spuštění:
+    python bench_extract.py --pages-dir ulozene_stranky
+    python bench_extract.py --pages 200
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from extractors import BACKENDS
+from fixture_server import make_car_page
+
+
+def load_pages(pages_dir, count):
+    """
+    Načte všechny .html soubory ze složky, nebo vygeneruje `count` stránek.
+    """
+    if pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                pages.append(f.read())
+        return pages
+    return [make_car_page(car_id) for car_id in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Porovnání rychlosti extrakčních backendů.')
+    parser.add_argument('--pages-dir', help='Složka s uloženými stránkami detailu auta (*.html)')
+    parser.add_argument('--pages', type=int, default=200, help='Počet generovaných stránek bez --pages-dir')
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages_dir, args.pages)
+    if not pages:
+        print("❌ Žádné stránky k testování")
+        return
+    expected = [BACKENDS['bs4'](html) for html in pages]
+
+    baseline = None
+    for name in args.backends:
+        extract = BACKENDS[name]
+        start = time.perf_counter()
+        results = [extract(html) for html in pages]
+        elapsed = time.perf_counter() - start
+        pages_per_second = len(pages) / elapsed
+        baseline = baseline or pages_per_second
+        mismatches = sum(result != reference for result, reference in zip(results, expected))
+        print(f"{name:<7} {pages_per_second:9.1f} stránek/s | {pages_per_second / baseline:5.1f}x | "
+              f"rozdílů proti bs4: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,89 +1,194 @@
+"""Čištění dat stažených crawlerem.
+Typ motoru se určuje podle deklarativní tabulky pravidel ENGINE_RULES (první shoda vyhrává).
+Pravidla i filtr paliva se vyhodnocují vektorově jen nad unikátními hodnotami sloupce
+(pd.factorize + np.select) a výsledek se rozprostře zpět na všechny řádky, takže cena nezávisí
+na počtu řádků, ale na počtu různých motorů. Všechny filtry řádků jsou spojené do jedné masky.
+
+Proudový režim (--stream) čte vstup po dávkách, každou dávku vyčistí, převede jednotky na čísla
+a průběžně ji připíše do typovaného sloupcového výstupu (columnar.py). Paměť tak nezávisí na velikosti
+vstupu, jen na velikosti dávky.
+
+Spuštění:
+    python cleaner.py
+    python cleaner.py --input ../crawler/vsechna_auta.csv --output doopravdy_hotove_auta.csv
+    python cleaner.py --stream --chunksize 100000 --output doopravdy_hotove_auta          # složka se sloupci
+    python cleaner.py --stream --output doopravdy_hotove_auta.parquet                     # Parquet (pyarrow)
+"""
+
+import argparse
+
+import numpy as np
 import pandas as pd
 
-# Načteme CSV soubor do DataFrame
-df = pd.read_csv("../crawler/vsechna_auta.csv")
+from columnar import open_sink
 
-# 1. Filtrování: odstranění záznamů, kde je 'Kombinovaná' hodnota null (neúplné záznamy)
-df_clean = df[df['Kombinovaná'].notna()]  # Záznamy s platnou hodnotou v 'Kombinovaná'
-df_bad = df[df['Kombinovaná'].isna()]  # Záznamy s nulovou hodnotou v 'Kombinovaná'
+# Pravidla pro typ motoru: (podřetězec v označení motoru, typ motoru). Vyhodnocují se v tomto pořadí.
+# Typ None znamená motory, které nebudeme zpracovávat.
+ENGINE_RULES = [
+    ('1.0', 'I3'),  # Tříválec
+    ('1.2', 'I3'),
+    ('1.5', 'I4'),  # Čtyřválec
+    ('1.6', 'I4'),
+    ('1.7', 'I4'),
+    ('1.9', 'I4'),
+    ('2.0', 'I4'),
+    ('D5', 'I5'),  # Pětiválec
+    ('3.0', 'I6'),  # Šestiválec
+    ('xDrive30d', 'I6'),
+    ('300 d', 'I6'),
+    ('E 350 CGI', 'V6'),  # V6 motor
+    ('S 350 d 4MATIC', 'V6'),
+    ('50 TDI', 'V6'),
+    ('55 TFSI', 'V6'),
+    ('Flying Spur', 'V8'),  # V8 motor
+    ('Turbo', None),
+    ('L', None),
+    ('RS', None),
+]
+UNKNOWN_ENGINE = 'zaod'  # Neznámý motor
 
-# Uložení neúplných a čistých záznamů do CSV souborů
-df_clean.to_csv("auta_cista.csv", index=False, encoding='utf-8-sig')
-print(f"✅ Čistých záznamů: {len(df_clean)}")  # Výpis počtu čistých záznamů
-print(f"❌ Neúplných záznamů: {len(df_bad)}")  # Výpis počtu neúplných záznamů
+CURRENT_YEAR = 2025  # Rok, ke kterému se počítá stáří vozidla (stejně jako v app/model.py)
 
-# 2. Filtr: výběr aut, která mají platnou spotřebu, nejsou hybridní, nejsou LPG, a mají benzin nebo diesel
-is_spotreba_ok = df_clean['Kombinovaná'].notna()  # Záznamy, které mají platnou spotřebu
-is_benzin_or_diesel = df_clean['Palivo'].str.contains('benzín|diesel', case=False, na=False)  # Auta na benzin nebo diesel
-is_not_hybrid = ~df_clean['Palivo'].str.contains('hybrid', case=False, na=False)  # Auta, která nejsou hybridní
-is_not_lpg = ~df_clean['Palivo'].str.contains('LPG', case=False, na=False)  # Auta, která nejsou LPG
-is_not_zaod = ~df_clean['Motor'].str.contains('zaod', case=False, na=False)  # Auta, která nemají označení 'zaod' v motoru
+# Filtr paliva: musí obsahovat některý z povolených vzorů a žádný z vyloučených (bez ohledu na velikost písmen)
+FUEL_ALLOWED = 'benzín|diesel'
+FUEL_EXCLUDED = 'hybrid|lpg'
 
-# Filtrace aut, která splňují všechny podmínky
-df_clean = df_clean[is_spotreba_ok & is_benzin_or_diesel & is_not_hybrid & is_not_lpg & is_not_zaod]
 
-# Filtrace nevyhovujících záznamů
-df_bad = df_clean[~(is_spotreba_ok & is_benzin_or_diesel & is_not_hybrid & is_not_lpg & is_not_zaod)]
+def factorize(series):
+    """
+    Rozloží sloupec na kódy řádků a pd.Series unikátních hodnot. Chybějící hodnota je také jednou z unikátních
+    hodnot, takže se dá vyhodnotit stejně jako ostatní. Výsledek pro unikátní hodnoty se na řádky
+    rozprostře indexací `vysledek[codes]`.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return codes, pd.Series(uniques, dtype=object)
 
-# Uložení filtrovaných dat
-df_clean.to_csv("auta_cista.csv", index=False, encoding='utf-8-sig')
-print(f"✅ Čistých záznamů: {len(df_clean)}")  # Výpis počtu čistých záznamů
-print(f"❌ Neúplných záznamů: {len(df_bad)}")  # Výpis počtu neúplných záznamů
 
-# 3. Rozdělení sloupce 'Motor' na 'Motor' a 'Výkon' podle vzoru
-df_clean[['Motor', 'Výkon']] = df_clean['Motor'].str.extract(r'^([^,]+),\s*([^,]+)')  # Extrakce 'Motor' a 'Výkon' z jednoho sloupce
+def classify_engines(engines):
+    """
+    Vrátí pole typů motorů podle ENGINE_RULES pro pd.Series unikátních označení motoru.
+    """
+    conditions = [engines.str.contains(pattern, regex=False).to_numpy(dtype=bool) for pattern, _ in ENGINE_RULES]
+    choices = [np.full(len(engines), engine_type, dtype=object) for _, engine_type in ENGINE_RULES]
+    return np.select(conditions, choices, default=UNKNOWN_ENGINE)
 
-# Vyhození sloupce 'Výkon.1', pokud existuje (duplicitní sloupec)
-if 'Výkon.1' in df_clean.columns:
-    df_clean.drop(columns=['Výkon.1'], inplace=True)
 
-# 4. Funkce pro přiřazení typu motoru na základě velikosti motoru
 def convert_engine_type(engine):
-    engine = str(engine).strip()  # Odstranění nežádoucích mezer
-    if '1.0' in engine:
-        return 'I3'  # Tříválec
-    elif '1.2' in engine:
-        return 'I3'
-    elif '1.5' in engine:
-        return 'I4'  # Čtyřválec
-    elif '1.6' in engine:
-        return 'I4'
-    elif '1.7' in engine:
-        return 'I4'
-    elif '1.9' in engine:
-        return 'I4'
-    elif '2.0' in engine:
-        return 'I4'
-    elif 'D5' in engine:
-        return 'I5'  # Pětiválec
-    elif '3.0' in engine:
-        return 'I6'  # Šestiválec
-    elif 'xDrive30d' in engine:
-        return 'I6'
-    elif '300 d' in engine:
-        return 'I6'
-    elif 'E 350 CGI' in engine:
-        return 'V6'  # V6 motor
-    elif 'S 350 d 4MATIC' in engine:
-        return 'V6'
-    elif '50 TDI' in engine:
-        return 'V6'
-    elif '55 TFSI' in engine:
-        return 'V6'
-    elif 'Flying Spur' in engine:
-        return 'V8'  # V8 motor
-    elif 'Turbo' in engine or 'L' in engine or 'RS' in engine:
-        return None  # Tyto motory nebudeme zpracovávat
-    else:
-        return 'zaod'  # Neznámý motor, označeno jako 'zaod'
+    """
+    Přiřadí typ motoru jednomu označení motoru (stejná pravidla jako classify_engines).
+    """
+    engine = str(engine).strip()
+    for pattern, engine_type in ENGINE_RULES:
+        if pattern in engine:
+            return engine_type
+    return UNKNOWN_ENGINE
+
+
+def is_allowed_fuel(fuels):
+    """
+    Vrátí masku paliv, která nejsou hybridní ani LPG a jsou benzín nebo diesel.
+    """
+    fuels = fuels.str.lower()
+    return (fuels.str.contains(FUEL_ALLOWED) & ~fuels.str.contains(FUEL_EXCLUDED)).to_numpy(dtype=bool)
+
+
+def clean(df):
+    """
+    Vyčistí data z crawleru. Vrací (filtrované záznamy v původním tvaru, hotová data pro modely).
+    Regulární výrazy a pravidla se počítají jen pro unikátní hodnoty 'Palivo' a 'Motor'.
+    """
+    fuel_codes, fuels = factorize(df['Palivo'])
+    motor_codes, motors = factorize(df['Motor'])
+
+    # Rozdělení označení 'Motor' na 'Motor' a 'Výkon' podle vzoru a typ motoru podle ENGINE_RULES
+    parts = motors.str.extract(r'^([^,]+),\s*([^,]+)')
+    engine_types = classify_engines(parts[0].astype(str).str.strip())  # Chybějící hodnota jako 'nan'
+    powers = parts[1].to_numpy(dtype=object)
+
+    # Jedna spojená maska všech filtrů: platná spotřeba, povolené palivo a motor bez označení 'zaod'
+    fuel_ok = is_allowed_fuel(fuels.astype(str))
+    motor_ok = ~motors.str.contains('zaod', case=False, na=False).to_numpy(dtype=bool)
+    mask = df['Kombinovaná'].notna().to_numpy() & fuel_ok[fuel_codes] & motor_ok[motor_codes]
+    df_filtered = df[mask]
 
-# 5. Aplikace funkce pro úpravu typu motoru na celý sloupec 'Motor'
-df_clean['Motor'] = df_clean['Motor'].apply(convert_engine_type)
+    df_clean = df_filtered.drop(columns=['Výkon.1'], errors='ignore')  # Duplicitní sloupec, pokud existuje
+    df_clean = df_clean.assign(Motor=engine_types[motor_codes[mask]], Výkon=powers[motor_codes[mask]])
+    df_clean = df_clean.dropna(subset=['Motor'])  # Motory, které nebudeme zpracovávat
+    return df_filtered, df_clean
 
-# 6. Odstranění řádků, kde je v 'Motor' hodnota None (nevalidní hodnoty)
-df_clean = df_clean.dropna(subset=['Motor'])
 
-# Uložení výsledného souboru s vyčištěnými daty
-df_clean.to_csv('doopravdy_hotove_auta.csv', index=False, encoding='utf-8-sig')
-print("✅ Uloženo jako doopravdy_hotove_auta.csv")  # Potvrzení o úspěšném uložení
-print(f"Hotovo! Počet záznamů po vyčištění: {len(df_clean)}")  # Výpis počtu záznamů po vyčištění
+def parse_number(series, unit):
+    """
+    Odstraní jednotku (např. ' l/100km' nebo 'kW') a převede hodnoty na čísla; nečitelné hodnoty dají NaN.
+    Převod se počítá jen pro unikátní hodnoty.
+    """
+    codes, uniques = factorize(series)
+    numbers = pd.to_numeric(uniques.astype(str).str.replace(unit, '', regex=False), errors='coerce')
+    return numbers.to_numpy(dtype=float)[codes]
+
+
+def to_typed(df_clean):
+    """
+    Převede vyčištěná data na číselné sloupce (spotřeba, rok, výkon) a doplní 'Stáří vozidla'.
+    Řádky, ve kterých nejde některé číslo přečíst, vyřadí.
+    """
+    typed = pd.DataFrame({
+        'Kombinovaná': parse_number(df_clean['Kombinovaná'], ' l/100km'),
+        'Rok uvedení do provozu': parse_number(df_clean['Rok uvedení do provozu'], ''),
+        'Karoserie': df_clean['Karoserie'].to_numpy(dtype=object),
+        'Palivo': df_clean['Palivo'].to_numpy(dtype=object),
+        'Motor': df_clean['Motor'].to_numpy(dtype=object),
+        'Výkon': parse_number(df_clean['Výkon'], 'kW'),
+    })
+    typed = typed.dropna(subset=['Kombinovaná', 'Rok uvedení do provozu', 'Výkon'])
+    typed['Stáří vozidla'] = CURRENT_YEAR - typed['Rok uvedení do provozu']
+    return typed
+
+
+def clean_stream(input_path, output_path, chunksize=100_000):
+    """
+    Vyčistí vstupní CSV po dávkách a průběžně zapisuje typovaný sloupcový výstup.
+    Vrací (počet vstupních řádků, počet zapsaných řádků).
+    """
+    sink = open_sink(output_path)
+    total = written = 0
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype=str):
+            _, df_clean = clean(chunk)
+            typed = to_typed(df_clean)
+            sink.write(typed)
+            total += len(chunk)
+            written += len(typed)
+    finally:
+        sink.close()
+    return total, written
+
+
+def main(input_path='../crawler/vsechna_auta.csv', filtered_path='auta_cista.csv',
+         output_path='doopravdy_hotove_auta.csv'):
+    df = pd.read_csv(input_path)
+    df_filtered, df_clean = clean(df)
+
+    df_filtered.to_csv(filtered_path, index=False, encoding='utf-8-sig')
+    print(f"✅ Čistých záznamů: {len(df_filtered)}")
+    print(f"❌ Vyřazených záznamů: {len(df) - len(df_filtered)}")
+
+    df_clean.to_csv(output_path, index=False, encoding='utf-8-sig')
+    print(f"✅ Uloženo jako {output_path}")
+    print(f"Hotovo! Počet záznamů po vyčištění: {len(df_clean)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Čištění dat z crawleru.')
+    parser.add_argument('--input', default='../crawler/vsechna_auta.csv')
+    parser.add_argument('--filtered', default='auta_cista.csv', help='Záznamy po filtraci (před úpravou motoru)')
+    parser.add_argument('--output', default='doopravdy_hotove_auta.csv')
+    parser.add_argument('--stream', action='store_true', help='Čtení po dávkách a typovaný sloupcový výstup')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Počet řádků v jedné dávce')
+    args = parser.parse_args()
+    if args.stream:
+        output = args.output[:-len('.csv')] if args.output.endswith('.csv') else args.output
+        total, written = clean_stream(args.input, output, args.chunksize)
+        print(f"✅ Zpracováno {total} řádků, uloženo {written} do {output}")
+    else:
+        main(args.input, args.filtered, args.output)
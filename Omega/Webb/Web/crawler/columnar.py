@@ -0,0 +1,146 @@
+"""Typovaný sloupcový výstup čištění dat, zapisovaný průběžně po dávkách.
+- '*.parquet' – Parquet přes pyarrow (volitelná závislost), jedna skupina řádků na dávku
+- jinak složka se sloupci – každý sloupec jako binární soubor NumPy, do kterého se dávky připisují,
+  kategorie jako kódy int16 a popis sloupců v schema.json
+
+Obsah se nikdy nedrží celý v paměti: zapisovač drží jen aktuální dávku a slovníky kategorií.
+
+Použití:
+    sink = open_sink('doopravdy_hotove_auta')
+    for chunk in chunks:
+        sink.write(chunk)
+    sink.close()
+    df = load_columns('doopravdy_hotove_auta')
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow je potřeba jen pro výstup do Parquetu
+    pa = None
+
+# Sloupce výstupu: název, název souboru, typ ('category' = kódy int16 se slovníkem hodnot)
+COLUMNS = [
+    ('Kombinovaná', 'kombinovana', 'float32'),
+    ('Rok uvedení do provozu', 'rok', 'int16'),
+    ('Karoserie', 'karoserie', 'category'),
+    ('Palivo', 'palivo', 'category'),
+    ('Motor', 'motor', 'category'),
+    ('Výkon', 'vykon', 'float32'),
+    ('Stáří vozidla', 'stari', 'int16'),
+]
+SCHEMA_FILE = 'schema.json'
+CODE_DTYPE = np.int16
+
+
+class ColumnDirSink:
+    """
+    Zapisuje dávky do složky s jedním binárním souborem na sloupec.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.rows = 0
+        self.categories = {name: {} for name, _, dtype in COLUMNS if dtype == 'category'}
+        self.files = {name: open(os.path.join(path, f'{file}.bin'), 'wb') for name, file, _ in COLUMNS}
+
+    def _codes(self, name, values):
+        """
+        Převede hodnoty kategoriálního sloupce na kódy; nové hodnoty se přidají na konec slovníku.
+        """
+        mapping = self.categories[name]
+        codes, uniques = pd.factorize(values)
+        unique_codes = np.array([mapping.setdefault(value, len(mapping)) for value in uniques], dtype=CODE_DTYPE)
+        return np.where(codes < 0, -1, unique_codes[codes]).astype(CODE_DTYPE)
+
+    def write(self, chunk):
+        for name, _, dtype in COLUMNS:
+            if dtype == 'category':
+                values = self._codes(name, chunk[name])
+            else:
+                values = chunk[name].to_numpy(dtype=dtype)
+            values.tofile(self.files[name])
+        self.rows += len(chunk)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        schema = {
+            'rows': self.rows,
+            'columns': [
+                {
+                    'name': name,
+                    'file': f'{file}.bin',
+                    'dtype': np.dtype(CODE_DTYPE).name if dtype == 'category' else dtype,
+                    **({'categories': list(self.categories[name])} if dtype == 'category' else {})
+                }
+                for name, file, dtype in COLUMNS
+            ]
+        }
+        with open(os.path.join(self.path, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(schema, f, ensure_ascii=False, indent=2)
+
+
+class ParquetSink:
+    """
+    Zapisuje dávky do souboru Parquet, každou jako samostatnou skupinu řádků.
+    """
+
+    def __init__(self, path):
+        if pa is None:
+            raise RuntimeError('Výstup do Parquetu vyžaduje balíček pyarrow (pip install pyarrow).')
+        types = {'float32': pa.float32(), 'int16': pa.int16(), 'category': pa.string()}
+        self.schema = pa.schema([(name, types[dtype]) for name, _, dtype in COLUMNS])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows = 0
+
+    def write(self, chunk):
+        chunk = chunk[[name for name, _, _ in COLUMNS]].astype(
+            {name: object if dtype == 'category' else dtype for name, _, dtype in COLUMNS}
+        )
+        self.writer.write_table(pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False))
+        self.rows += len(chunk)
+
+    def close(self):
+        self.writer.close()
+
+
+def open_sink(path):
+    """
+    Vrátí zapisovač podle cesty: '*.parquet' zapisuje Parquet, jinak složku se sloupci.
+    """
+    return ParquetSink(path) if path.endswith('.parquet') else ColumnDirSink(path)
+
+
+def load_columns(path, mmap=True):
+    """
+    Načte sloupcový výstup jako DataFrame. Číselné sloupce se ze složky mapují do paměti (np.memmap),
+    kategoriální sloupce se vrací jako pd.Categorical.
+    """
+    if path.endswith('.parquet'):
+        if pa is None:
+            raise RuntimeError('Čtení Parquetu vyžaduje balíček pyarrow (pip install pyarrow).')
+        return pq.read_table(path).to_pandas()
+
+    with open(os.path.join(path, SCHEMA_FILE), 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    data = {}
+    for column in schema['columns']:
+        file = os.path.join(path, column['file'])
+        if not schema['rows']:
+            values = np.empty(0, dtype=column['dtype'])
+        elif mmap:
+            values = np.memmap(file, dtype=column['dtype'], mode='r', shape=(schema['rows'],))
+        else:
+            values = np.fromfile(file, dtype=column['dtype'])
+        if 'categories' in column:
+            values = pd.Categorical.from_codes(np.asarray(values), categories=column['categories'])
+        data[column['name']] = values
+    return pd.DataFrame(data)
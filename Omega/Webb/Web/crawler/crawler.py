@@ -1,3 +1,4 @@
+import argparse
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
@@ -7,12 +8,17 @@ from urllib.parse import urljoin
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
+from frontier import Frontier
+from http_cache import CachedSession, ResponseCache
+
 # Nastavení hlaviček pro simulaci požadavku od skutečného prohlížeče (pomáhá to předejít blokování webem)
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
     'Accept-Language': 'cs-CZ,cs;q=0.9'
 }
 
+MAX_PAGES = 30  # Horní mez (bez ní) pro čísla stránek kategorie
+
 # Seznam URL pro různé kategorie aut
 categories = [
     "https://www.aaaauto.cz/sleva/",
@@ -43,67 +49,94 @@ def clean_text(text):
     """
     return ' '.join(str(text).strip().split()) if text else None
 
-def extract_car_data(session, url):
+def empty_car_data():
+    """
+    Vrátí slovník pro uchování získaných dat o autě (všechny hodnoty None).
+    """
+    return {
+        'Kombinovaná': None,
+        'Rok uvedení do provozu': None,
+        'Karoserie': None,
+        'Palivo': None,
+        'Motor': None,
+        'Výkon': None
+    }
+
+def assign_field(data, text, value):
     """
-    Extrahuje data o autě z dané URL. Odesílá HTTP požadavek na stránku, analyzuje HTML a získá požadované
-    informace o autě, jako je kombinovaná spotřeba, rok uvedení do provozu, typ karoserie, palivo, motor a výkon.
+    Uloží hodnotu parametru podle textu položky seznamu (např. Kombinovaná, Rok uvedení do provozu, ...).
+    Sdílí ji všechny extrakční backendy (viz extractors.py).
+    """
+    if 'Kombinovaná' in text:
+        data['Kombinovaná'] = value
+    elif 'Rok uvedení do provozu' in text:
+        data['Rok uvedení do provozu'] = value
+    elif 'Karoserie' in text:
+        data['Karoserie'] = value
+    elif 'Palivo' in text:
+        data['Palivo'] = value
+    elif 'Motor' in text:
+        data['Motor'] = value
+    elif 'Výkon' in text:
+        if value:
+            for part in value.split():  # Hledání výkonu ve formátu s 'kw'
+                if 'kw' in part.lower():
+                    data['Výkon'] = part.lower()
+                    break
+
+def parse_car_page(html):
+    """
+    Z HTML stránky detailu auta získá požadované informace o autě, jako je kombinovaná spotřeba,
+    rok uvedení do provozu, typ karoserie, palivo, motor a výkon. Pokud nenajde žádná data, vrátí None.
+    """
+    soup = BeautifulSoup(html, 'html.parser')  # Parsování HTML
+    data = empty_car_data()
+
+    # Procházení seznamu 'li' elementů a hledání potřebných informací
+    for li in soup.find_all('li'):
+        text = clean_text(li.get_text())  # Vyčištění textu
+        if not text:  # Pokud je text prázdný, přeskočíme
+            continue
+        strong = li.find('strong')  # Hledání tagu <strong> pro hodnotu
+        value = clean_text(strong.text) if strong else None
+        assign_field(data, text, value)
+
+    # Pokud chybí kombinovaná spotřeba, zkusíme ji najít na jiném místě na stránce
+    if not data['Kombinovaná']:
+        spotreba_span = soup.find('span', class_='countbarValue')
+        if spotreba_span:
+            nested = spotreba_span.find('span')
+            if nested:
+                value = clean_text(nested.get_text())
+                if value and 'l/100km' in value:
+                    data['Kombinovaná'] = value
+
+    # Pokud jsou získána nějaká data, vrátíme je, jinak vrátíme None
+    return data if any(data.values()) else None
+
+def extract_car_data(session, url, parse=parse_car_page):
+    """
+    Extrahuje data o autě z dané URL. Odesílá HTTP požadavek na stránku a výsledné HTML zpracuje
+    funkcí `parse` (výchozí parse_car_page, další backendy viz extractors.py).
     """
     try:
         response = session.get(url, headers=headers, timeout=(5, 10))  # HTTP požadavek
-        soup = BeautifulSoup(response.text, 'html.parser')  # Parsování HTML
-
-        # Inicializace slovníku pro uchování získaných dat
-        data = {
-            'Kombinovaná': None,
-            'Rok uvedení do provozu': None,
-            'Karoserie': None,
-            'Palivo': None,
-            'Motor': None,
-            'Výkon': None
-        }
-
-        # Procházení seznamu 'li' elementů a hledání potřebných informací
-        for li in soup.find_all('li'):
-            text = clean_text(li.get_text())  # Vyčištění textu
-            if not text:  # Pokud je text prázdný, přeskočíme
-                continue
-            strong = li.find('strong')  # Hledání tagu <strong> pro hodnotu
-            value = clean_text(strong.text) if strong else None
-
-            # Uložení hodnot podle klíče (např. Kombinovaná, Rok uvedení do provozu, ...)
-            if 'Kombinovaná' in text:
-                data['Kombinovaná'] = value
-            elif 'Rok uvedení do provozu' in text:
-                data['Rok uvedení do provozu'] = value
-            elif 'Karoserie' in text:
-                data['Karoserie'] = value
-            elif 'Palivo' in text:
-                data['Palivo'] = value
-            elif 'Motor' in text:
-                data['Motor'] = value
-            elif 'Výkon' in text:
-                if value:
-                    for part in value.split():  # Hledání výkonu ve formátu s 'kw'
-                        if 'kw' in part.lower():
-                            data['Výkon'] = part.lower()
-                            break
-
-        # Pokud chybí kombinovaná spotřeba, zkusíme ji najít na jiném místě na stránce
-        if not data['Kombinovaná']:
-            spotreba_span = soup.find('span', class_='countbarValue')
-            if spotreba_span:
-                nested = spotreba_span.find('span')
-                if nested:
-                    value = clean_text(nested.get_text())
-                    if value and 'l/100km' in value:
-                        data['Kombinovaná'] = value
-
-        # Pokud jsou získána nějaká data, vrátíme je, jinak vrátíme None
-        return data if any(data.values()) else None
+        return parse(response.text)
     except Exception as e:
         print(f"Chyba: {url} | {str(e)}")  # Pokud dojde k chybě, vypíše chybu
         return None
 
+def parse_car_links(html, base_url):
+    """
+    Z HTML stránky kategorie vybere všechny odkazy na auta, které obsahují '/car.html' a mají parametr 'id='.
+    """
+    soup = BeautifulSoup(html, 'html.parser')  # Parsování HTML
+    return list(set(
+        urljoin(base_url, a['href'])  # Získání úplných URL
+        for a in soup.select('a[href*="/car.html"]')  # Výběr odkazů, které obsahují '/car.html'
+        if 'id=' in a['href']  # Kontrola, že URL obsahuje parametr 'id='
+    ))
+
 def get_car_links(session, base_url):
     """
     Získá všechny odkazy na auta z dané stránky kategorie. Procházením HTML hledá odkazy, které obsahují '/car.html'
@@ -111,88 +144,137 @@ def get_car_links(session, base_url):
     """
     try:
         response = session.get(base_url, headers=headers, timeout=10)  # HTTP požadavek
-        soup = BeautifulSoup(response.text, 'html.parser')  # Parsování HTML
-        return list(set(
-            urljoin(base_url, a['href'])  # Získání úplných URL
-            for a in soup.select('a[href*="/car.html"]')  # Výběr odkazů, které obsahují '/car.html'
-            if 'id=' in a['href']  # Kontrola, že URL obsahuje parametr 'id='
-        ))
+        return parse_car_links(response.text, base_url)
     except Exception as e:
         print(f"Chyba při získávání odkazů: {str(e)}")  # Chyba při získávání odkazů
         return []
 
-def process_category(session, category_url, all_results):
+def category_page_url(category_url, page):
+    """
+    Vrátí URL dané stránky kategorie. První stránka je samotná URL kategorie.
+    """
+    if page == 1:
+        return category_url
+    # Vytváří URL pro další stránky podle kategorie
+    if "sleva" in category_url:
+        return f"{category_url}#!&category=156&page={page}"
+    elif "4x4-offroad-suv" in category_url:
+        return f"{category_url}#!&category=15&page={page}"
+    elif "luxusni-vozy" in category_url:
+        return f"{category_url}#!&category=35&sort[]=0&sort[]=1&page={page}"
+    return f"{category_url}#!&page={page}"
+
+def process_links(session, car_links, all_results, frontier=None, parse=parse_car_page):
+    """
+    Stáhne a zpracuje seznam odkazů na auta. S frontier se každé auto hned uloží do stavu procházení.
+    Vrací True, pokud uživatel zpracování přerušil.
+    """
+    for i, link in enumerate(car_links, 1):
+        try:
+            if not getattr(session, 'offline', False):
+                time.sleep(random.expovariate(1.5))  # Náhodné zpoždění pro zpomalení scrapování
+            print(f"Zpracovávám {i}/{len(car_links)}: {link[:70]}...")  # Informace o zpracovávaném odkazu
+            car_data = extract_car_data(session, link, parse)  # Extrahování dat o autě
+            if car_data:
+                all_results.append(car_data)  # Přidání dat do seznamu výsledků
+                if frontier:
+                    frontier.mark_done(link, car_data)  # Checkpoint – auto je uložené i při pozdějším pádu
+                print("✅ OK")
+            else:
+                if frontier:
+                    frontier.mark_failed(link)
+                print("❌ Chyby ve zpracování")
+        except KeyboardInterrupt:
+            print("\n🛑 Ukončeno uživatelem")  # Ukončení, pokud uživatel přeruší proces
+            return True
+        except Exception as e:
+            print(f"⚠️ Chyba: {str(e)}")  # Vypíše chybu, pokud dojde k nějaké neočekávané chybě
+    return False
+
+def process_category(session, category_url, all_results, frontier=None, parse=parse_car_page):
     """
     Zpracovává jednu kategorii aut, prochází jednotlivé stránky (až do stránky 30) a získává odkazy na auta.
     Pro každý odkaz na auto zavolá funkci pro extrakci dat o autě a uloží je do seznamu.
+    S frontier se stahují jen nové inzeráty a inzeráty se zastaralými daty.
     """
-    for page in range(1, 30):  # Prochází až 30 stránek
-        if page == 1:
-            url = category_url
-        else:
-            # Vytváří URL pro další stránky podle kategorie
-            if "sleva" in category_url:
-                url = f"{category_url}#!&category=156&page={page}"
-            elif "4x4-offroad-suv" in category_url:
-                url = f"{category_url}#!&category=15&page={page}"
-            elif "luxusni-vozy" in category_url:
-                url = f"{category_url}#!&category=35&sort[]=0&sort[]=1&page={page}"
-            else:
-                url = f"{category_url}#!&page={page}"
+    for page in range(1, MAX_PAGES):  # Prochází až 30 stránek
+        url = category_page_url(category_url, page)
 
         # Získání odkazů na auta z této stránky
         car_links = get_car_links(session, url)
         if not car_links:  # Pokud nejsou žádné odkazy, ukončíme zpracování
             break
 
+        if frontier:
+            car_links = frontier.add(car_links, category_url)  # Jen nové nebo zastaralé inzeráty
+
         print(f"\n🔹 Stránka {page} ({len(car_links)} aut)")  # Vypíše počet aut na stránce
-        for i, link in enumerate(car_links, 1):
-            try:
-                time.sleep(random.expovariate(1.5))  # Náhodné zpoždění pro zpomalení scrapování
-                print(f"Zpracovávám {i}/{len(car_links)}: {link[:70]}...")  # Informace o zpracovávaném odkazu
-                car_data = extract_car_data(session, link)  # Extrahování dat o autě
-                if car_data:
-                    all_results.append(car_data)  # Přidání dat do seznamu výsledků
-                    print("✅ OK")
-                else:
-                    print("❌ Chyby ve zpracování")
-            except KeyboardInterrupt:
-                print("\n🛑 Ukončeno uživatelem")  # Ukončení, pokud uživatel přeruší proces
-                return True
-            except Exception as e:
-                print(f"⚠️ Chyba: {str(e)}")  # Vypíše chybu, pokud dojde k nějaké neočekávané chybě
+        if process_links(session, car_links, all_results, frontier, parse):
+            return True
     return False
 
-def save_results(all_results):
+def save_results(all_results, path='vsechna_auta.csv'):
     """
     Uloží získaná data o autech do CSV souboru. Pokud nejsou žádná data, vypíše chybovou zprávu.
     """
     if all_results:
         df = pd.DataFrame(all_results)  # Převede seznam dat na DataFrame
-        df.to_csv('vsechna_auta.csv', index=False, encoding='utf-8-sig')  # Uloží do CSV
-        print(f"\n✅ Uloženo {len(all_results)} záznamů do vsechna_auta.csv")
+        df.to_csv(path, index=False, encoding='utf-8-sig')  # Uloží do CSV
+        print(f"\n✅ Uloženo {len(all_results)} záznamů do {path}")
     else:
         print("\n❌ Žádná data k uložení")
 
-def main():
+def main(state_path=None, max_age_days=7, parser='bs4', cache_path=None, offline=False):
     """
     Hlavní funkce, která spustí celý scraping. Vytvoří session, prochází všechny kategorie aut
-    a ukládá získaná data.
+    a ukládá získaná data. Se `state_path` se stav procházení ukládá do SQLite (frontier.py):
+    nejdřív se dokončí inzeráty rozpracované při minulém běhu a výsledkem je CSV se všemi uloženými auty.
+    `parser` vybírá extrakční backend z extractors.py ('bs4', 'lxml' nebo 'stream').
+    S `cache_path` se odpovědi ukládají do diskové cache (http_cache.py) a posílají se podmíněné požadavky;
+    s `offline` se stránky čtou jen z cache bez přístupu k síti.
     """
-    session = create_session()  # Vytvoření session
+    from extractors import get_extractor  # Import až zde – extractors.py importuje tento modul
+    parse = get_extractor(parser)
+    cache = ResponseCache(cache_path) if cache_path else None
+    if offline and cache is None:
+        raise ValueError('Režim offline vyžaduje cache (--cache).')
+    session = None if offline else create_session()  # Vytvoření session
+    if cache:
+        session = CachedSession(session, cache, offline)
     all_results = []  # Seznam pro uchování všech výsledků
+    frontier = Frontier(state_path, max_age_days) if state_path else None
     try:
+        user_stopped = False
+        if frontier:
+            pending = frontier.pending()
+            if pending:
+                print(f"\n⏩ Pokračuji v {len(pending)} rozpracovaných inzerátech")
+                user_stopped = process_links(session, pending, all_results, frontier, parse)
         # Pro každou kategorii aut zavolá funkci pro zpracování
         for category_url in categories:
-            print(f"\n📂 Zpracovávám kategorii: {category_url}")
-            user_stopped = process_category(session, category_url, all_results)
             if user_stopped:  # Pokud uživatel přeruší, ukončíme
                 break
+            print(f"\n📂 Zpracovávám kategorii: {category_url}")
+            user_stopped = process_category(session, category_url, all_results, frontier, parse)
     except KeyboardInterrupt:
         print("\n🛑 Ukončeno uživatelem")  # Ukončení při přerušení uživatelem
     finally:
-        save_results(all_results)  # Uložení výsledků
+        if frontier:
+            frontier.export_csv()  # Uložení všech aut ze stavu procházení
+            frontier.close()
+        else:
+            save_results(all_results)  # Uložení výsledků
         session.close()  # Uzavření session
+        if cache:
+            print(f"🗄️ Cache: {cache.stats()}")
+            cache.close()
 
 if __name__ == "__main__":
-    main()  # Spuštění hlavní funkce
+    parser = argparse.ArgumentParser(description='Crawler aut z aaaauto.cz.')
+    parser.add_argument('--state', help='SQLite soubor se stavem procházení (přírůstkový režim s pokračováním)')
+    parser.add_argument('--max-age-days', type=float, default=7, help='Po kolika dnech se uložené auto stáhne znovu')
+    parser.add_argument('--parser', default='bs4', choices=['bs4', 'lxml', 'stream'], help='Extrakční backend')
+    parser.add_argument('--cache', help='SQLite soubor s cache HTTP odpovědí (podmíněné požadavky)')
+    parser.add_argument('--offline', action='store_true', help='Číst stránky jen z cache, bez sítě')
+    args = parser.parse_args()
+    main(args.state, args.max_age_days, args.parser, args.cache, args.offline)  # Spuštění hlavní funkce
@@ -0,0 +1,191 @@
+"""Zaměnitelné backendy pro extrakci dat o autě ze stránky detailu.
+- 'bs4'    – původní parse_car_page z crawler.py (BeautifulSoup s html.parser, prochází celý strom)
+- 'lxml'   – parser lxml v C; prochází jen elementy <li> a span.countbarValue
+- 'stream' – proudový tokenizer nad html.parser.HTMLParser, který nevytváří strom a skončí,
+             jakmile má všech šest polí
+
+Všechny backendy ukládají hodnoty stejnou funkcí assign_field. Proudový backend skončí u prvního
+úplného souboru hodnot, takže případné pozdější duplicitní položky seznamu už nepřepíše.
+"""
+
+from html.parser import HTMLParser
+
+from crawler import assign_field, clean_text, empty_car_data, parse_car_page
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError:  # lxml je volitelná závislost
+    lxml = None
+
+
+def _countbar_value(value):
+    """
+    Vrátí hodnotu ze span.countbarValue, pokud vypadá jako spotřeba.
+    """
+    value = clean_text(value)
+    return value if value and 'l/100km' in value else None
+
+
+def parse_car_page_lxml(html):
+    """
+    Stejná extrakce jako parse_car_page, ale nad stromem z lxml a jen pro <li> a span.countbarValue.
+    Stejně jako parse_car_page vrátí None i pro stránku, kterou nelze zpracovat (např. prázdnou).
+    """
+    if lxml is None:
+        raise RuntimeError('Backend lxml vyžaduje balíček lxml (pip install lxml).')
+    if isinstance(html, str):
+        # lxml odmítne řetězec s deklarací kódování (<?xml ... encoding=...?>), bajty zpracuje vždy
+        html = html.encode('utf-8')
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+    else:
+        parser = None
+    try:
+        root = lxml.html.fromstring(html, parser=parser)
+    except (lxml.etree.ParserError, ValueError):
+        return None
+    data = empty_car_data()
+
+    for li in root.iter('li'):
+        text = clean_text(li.text_content())
+        if not text:
+            continue
+        strong = li.find('.//strong')
+        value = clean_text(strong.text_content()) if strong is not None else None
+        assign_field(data, text, value)
+
+    if not data['Kombinovaná']:
+        spans = root.xpath('//span[contains(concat(" ", normalize-space(@class), " "), " countbarValue ")]')
+        if spans:
+            nested = spans[0].find('.//span')
+            if nested is not None:
+                data['Kombinovaná'] = _countbar_value(nested.text_content()) or data['Kombinovaná']
+
+    return data if any(data.values()) else None
+
+
+class _StopParsing(Exception):
+    """
+    Ukončí proudové zpracování, jakmile jsou nalezena všechna pole.
+    """
+
+
+class CarPageTokenizer(HTMLParser):
+    """
+    Proudový tokenizer stránky detailu auta. Pro každou otevřenou položku <li> skládá její text
+    a text prvního vnořeného <strong>; po uzavření nejvnějšší položky uloží hodnoty všech jejích
+    položek přes assign_field v pořadí dokumentu (stejně jako soup.find_all('li')).
+    Zároveň si zapamatuje text prvního <span> uvnitř span.countbarValue.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.data = empty_car_data()
+        self.countbar = None
+        self._items = []  # Otevřené <li>: [pořadí, text, text strong, stav strong (None/True/False)]
+        self._closed_items = []  # Uzavřené vnořené <li> čekající na uzavření nejvnějšího
+        self._item_count = 0
+        self._strong_depth = 0
+        self._span_depth = 0
+        self._countbar_depth = None  # Hloubka span.countbarValue, dokud je otevřený
+        self._nested_depth = None  # Hloubka prvního <span> uvnitř span.countbarValue
+        self._countbar_text = None
+        self._countbar_done = False  # Zpracovává se jen první span.countbarValue (jako soup.find)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'li':
+            self._items.append([self._item_count, [], [], None])
+            self._item_count += 1
+        elif tag == 'strong':
+            self._strong_depth += 1
+            for item in self._items:
+                if item[3] is None:
+                    item[3] = True  # První <strong> v této položce právě začal
+        elif tag == 'span':
+            self._span_depth += 1
+            if self._countbar_done:
+                return
+            if self._countbar_depth is None:
+                if 'countbarValue' in (dict(attrs).get('class') or '').split():
+                    self._countbar_depth = self._span_depth
+            elif self._countbar_text is None:
+                self._countbar_text = []
+                self._nested_depth = self._span_depth
+
+    def handle_endtag(self, tag):
+        if tag == 'li' and self._items:
+            self._closed_items.append(self._items.pop())
+            if self._items:
+                return
+            for _, text, strong, _ in sorted(self._closed_items):
+                text = clean_text(''.join(text))
+                if text:
+                    assign_field(self.data, text, clean_text(''.join(strong)) if strong else None)
+            self._closed_items = []
+            self._check_done()
+        elif tag == 'strong' and self._strong_depth:
+            self._strong_depth -= 1
+            if not self._strong_depth:
+                for item in self._items:
+                    if item[3]:
+                        item[3] = False  # Hodnota první <strong> je uzavřena
+        elif tag == 'span' and self._span_depth:
+            if not self._countbar_done:
+                if self._span_depth == self._nested_depth:
+                    self.countbar = _countbar_value(''.join(self._countbar_text))
+                    self._countbar_done = True
+                elif self._span_depth == self._countbar_depth:
+                    self._countbar_done = True
+            self._span_depth -= 1
+            if self.countbar:
+                self._check_done()
+
+    def handle_data(self, data):
+        for item in self._items:
+            item[1].append(data)
+            if item[3]:
+                item[2].append(data)
+        if self._countbar_text is not None and not self._countbar_done:
+            self._countbar_text.append(data)
+
+    def _check_done(self):
+        """
+        Ukončí zpracování, pokud je známo všech šest polí (spotřeba ze seznamu nebo z počítadla).
+        """
+        data = self.data
+        fields_found = all(data[field] for field in data if field != 'Kombinovaná')
+        if fields_found and (data['Kombinovaná'] or self.countbar):
+            raise _StopParsing()
+
+
+def parse_car_page_stream(html):
+    """
+    Proudová extrakce bez stavby stromu, končí hned po nalezení všech polí.
+    """
+    tokenizer = CarPageTokenizer()
+    try:
+        tokenizer.feed(html)
+        tokenizer.close()
+    except _StopParsing:
+        pass
+    data = tokenizer.data
+    if not data['Kombinovaná'] and tokenizer.countbar:
+        data['Kombinovaná'] = tokenizer.countbar
+    return data if any(data.values()) else None
+
+
+BACKENDS = {
+    'bs4': parse_car_page,
+    'lxml': parse_car_page_lxml,
+    'stream': parse_car_page_stream,
+}
+
+
+def get_extractor(name):
+    """
+    Vrátí extrakční funkci podle názvu backendu.
+    """
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Neznámý extrakční backend: {name} (povolené: {', '.join(BACKENDS)})")
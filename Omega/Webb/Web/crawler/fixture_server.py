@@ -0,0 +1,151 @@
+"""Lokální HTTP server, který napodobuje stránky aaaauto.cz pro testování a benchmarky crawleru.
+Stránka kategorie obsahuje odkazy '/car.html?id=N' a stránka detailu auta má stejnou strukturu
+parametrů (<li> s <strong> hodnotou a span.countbarValue) jako skutečný web. Obsah je generovaný
+deterministicky z id, volitelně lze servírovat i uložené stránky ze složky.
+
+Spuštění:
+    python fixture_server.py --port 8000 --cars-per-category 50 --delay-ms 20
+    python async_crawler.py --base-url http://127.0.0.1:8000
+"""
+
+import argparse
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BODY_TYPES = ['Combi', 'SUV', 'Sedan', 'Hatchback', 'Rodinné vozy', 'Coupe']
+FUELS = ['Benzín', 'Diesel', 'Benzín + LPG', 'Hybridní']
+ENGINES = ['1.0 TSI', '1.5 eTSI', '2.0 TDI', '1.6 CRDi', '3.0 TDI', 'D5 AWD', 'xDrive30d']
+FILLER_ITEMS = 300  # Počet nesouvisejících <li> (navigace, patička), jako na skutečné stránce
+
+
+def make_listing_page(car_ids):
+    """
+    Vrátí HTML stránky kategorie s odkazy na zadaná auta.
+    """
+    links = '\n'.join(
+        f'<div class="car"><a href="/car.html?id={car_id}">Auto {car_id}</a></div>' for car_id in car_ids
+    )
+    return f'<html><head><title>Kategorie</title></head><body>{links}</body></html>'
+
+
+def make_car_page(car_id):
+    """
+    Vrátí HTML stránky detailu auta. Parametry se odvozují deterministicky z id.
+    """
+    seed = zlib.crc32(str(car_id).encode())
+    power = 50 + seed % 200
+    year = 2005 + seed % 20
+    consumption = 4 + (seed % 60) / 10
+    filler = '\n'.join(f'<li><a href="/odkaz/{i}">Položka menu {i}</a></li>' for i in range(FILLER_ITEMS))
+    # Každé třetí auto má spotřebu jen v počítadle (span.countbarValue), ne v seznamu parametrů
+    combined = '' if seed % 3 == 0 else f'<li>Kombinovaná <strong>{consumption:g} l/100km</strong></li>'
+    return f"""<html><head><title>Auto {car_id}</title></head><body>
+<nav><ul>{filler}</ul></nav>
+<div class="carDetail">
+<span class="countbarValue"><span>{consumption:g} l/100km</span></span>
+<ul class="carParams">
+{combined}
+<li>Rok uvedení do provozu <strong>{year}</strong></li>
+<li>Karoserie <strong>{BODY_TYPES[seed % len(BODY_TYPES)]}</strong></li>
+<li>Palivo <strong>{FUELS[seed % len(FUELS)]}</strong></li>
+<li>Motor <strong>{ENGINES[seed % len(ENGINES)]}, {power}kW</strong></li>
+<li>Výkon <strong>{power}kW ({round(power * 1.36)} PS)</strong></li>
+</ul>
+</div>
+<footer><ul>{filler}</ul></footer>
+</body></html>"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Obsluha požadavků: /car.html?id=N vrací detail auta, ostatní cesty stránku kategorie.
+    """
+
+    def do_GET(self):
+        config = self.server.config
+        if config['delay']:
+            time.sleep(config['delay'])
+        url = urlparse(self.path)
+
+        if config['pages_dir']:
+            body = self._saved_page(url)
+        elif url.path.endswith('/car.html'):
+            body = make_car_page(parse_qs(url.query).get('id', ['0'])[0])
+        else:
+            # Každá kategorie má vlastní rozsah id odvozený z cesty
+            first = zlib.crc32(url.path.encode()) % 100000 * 1000
+            body = make_listing_page(range(first, first + config['cars_per_category']))
+
+        if body is None:
+            self.send_error(404)
+            return
+        data = body.encode('utf-8')
+        etag = f'"{zlib.crc32(data):08x}"'  # Pro ověření podmíněných požadavků (http_cache.py)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _saved_page(self, url):
+        """
+        Najde uloženou stránku ve složce: car_<id>.html pro detail, listing.html pro kategorii.
+        """
+        if url.path.endswith('/car.html'):
+            name = f"car_{parse_qs(url.query).get('id', ['0'])[0]}.html"
+        else:
+            name = 'listing.html'
+        path = os.path.join(self.server.config['pages_dir'], name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def log_message(self, format, *args):
+        pass  # Bez výpisu každého požadavku
+
+
+def start_server(port=0, cars_per_category=50, delay_ms=0, pages_dir=None):
+    """
+    Spustí server ve vlákně na pozadí a vrátí ho. Adresa je v server.server_address (port 0 = volný port).
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    server.daemon_threads = True
+    server.config = {
+        'cars_per_category': cars_per_category,
+        'delay': delay_ms / 1000,
+        'pages_dir': pages_dir
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokální náhrada aaaauto.cz pro testování crawleru.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--cars-per-category', type=int, default=50)
+    parser.add_argument('--delay-ms', type=float, default=0, help='Umělé zpoždění každé odpovědi')
+    parser.add_argument('--pages-dir', help='Složka s uloženými stránkami (listing.html, car_<id>.html)')
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.cars_per_category, args.delay_ms, args.pages_dir)
+    print(f"Server běží na http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""Perzistentní fronta URL (frontier) a úložiště stažených aut v SQLite pro přírůstkové procházení.
+Inzeráty se identifikují parametrem 'id=' z URL. Každé stažené auto se uloží hned (checkpoint),
+takže po přerušení crawler pokračuje tam, kde skončil, a při dalším běhu stáhne jen nové inzeráty
+a inzeráty starší než `max_age_days`.
+
+Použití z crawleru:
+    python crawler.py --state crawl_state.db --max-age-days 7
+"""
+
+import sqlite3
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+# Sloupce výstupu crawleru a jejich názvy v databázi
+FIELDS = {
+    'Kombinovaná': 'kombinovana',
+    'Rok uvedení do provozu': 'rok',
+    'Karoserie': 'karoserie',
+    'Palivo': 'palivo',
+    'Motor': 'motor',
+    'Výkon': 'vykon',
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS frontier (
+    listing_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    category TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    discovered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_status ON frontier (status);
+CREATE TABLE IF NOT EXISTS cars (
+    listing_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    {', '.join(f'{column} TEXT' for column in FIELDS.values())}
+);
+"""
+
+MAX_ATTEMPTS = 3  # Po tolika neúspěšných pokusech se inzerát přestane zkoušet
+
+
+def listing_id(url):
+    """
+    Vrátí id inzerátu z parametru 'id=' v URL (pokud chybí, použije se celá URL).
+    """
+    return parse_qs(urlsplit(url).query).get('id', [url])[0]
+
+
+class Frontier:
+    """
+    Stav procházení v SQLite: fronta inzerátů ke stažení a již stažená auta.
+    """
+
+    def __init__(self, path, max_age_days=7):
+        self.path = path
+        self.max_age = max_age_days * 24 * 3600
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add(self, urls, category=None):
+        """
+        Zaregistruje odkazy nalezené na stránce kategorie a vrátí ty, které je potřeba stáhnout:
+        nové, dosud nestažené a ty, jejichž uložená data jsou starší než `max_age_days`.
+        """
+        now = time.time()
+        to_fetch = []
+        with self.conn:
+            for url in urls:
+                car_id = listing_id(url)
+                self.conn.execute(
+                    'INSERT OR IGNORE INTO frontier (listing_id, url, category, discovered_at) VALUES (?, ?, ?, ?)',
+                    (car_id, url, category, now)
+                )
+                fetched = self.conn.execute(
+                    'SELECT fetched_at FROM cars WHERE listing_id = ?', (car_id,)
+                ).fetchone()
+                if fetched is not None and now - fetched[0] < self.max_age:
+                    continue
+                status, attempts = self.conn.execute(
+                    'SELECT status, attempts FROM frontier WHERE listing_id = ?', (car_id,)
+                ).fetchone()
+                if status == 'failed' and attempts >= MAX_ATTEMPTS:
+                    continue
+                if status == 'done':
+                    # Zastaralý záznam se vrací do fronty k obnovení s novým počtem pokusů
+                    self.conn.execute(
+                        "UPDATE frontier SET status = 'pending', attempts = 0 WHERE listing_id = ?", (car_id,)
+                    )
+                to_fetch.append(url)
+        return to_fetch
+
+    def pending(self, category=None):
+        """
+        Vrátí URL, které byly nalezeny, ale ještě nebyly úspěšně staženy (pro pokračování po přerušení).
+        """
+        query = "SELECT url FROM frontier WHERE status IN ('pending', 'failed') AND attempts < ?"
+        params = [MAX_ATTEMPTS]
+        if category is not None:
+            query += ' AND category = ?'
+            params.append(category)
+        return [row[0] for row in self.conn.execute(query, params)]
+
+    def mark_done(self, url, data):
+        """
+        Uloží stažená data auta a označí inzerát jako hotový. Zapisuje se okamžitě (checkpoint).
+        Úspěch vynuluje počet neúspěšných pokusů, aby se občasné chyby nesčítaly přes další obnovení.
+        """
+        car_id = listing_id(url)
+        columns = ', '.join(FIELDS.values())
+        placeholders = ', '.join('?' for _ in FIELDS)
+        with self.conn:
+            self.conn.execute(
+                f'INSERT OR REPLACE INTO cars (listing_id, url, fetched_at, {columns}) VALUES (?, ?, ?, {placeholders})',
+                [car_id, url, time.time()] + [data.get(field) for field in FIELDS]
+            )
+            self.conn.execute("UPDATE frontier SET status = 'done', attempts = 0 WHERE listing_id = ?", (car_id,))
+
+    def mark_failed(self, url):
+        """
+        Zaznamená neúspěšný pokus o stažení inzerátu.
+        """
+        with self.conn:
+            self.conn.execute(
+                "UPDATE frontier SET status = 'failed', attempts = attempts + 1 WHERE listing_id = ?",
+                (listing_id(url),)
+            )
+
+    def count(self):
+        """
+        Vrátí počet uložených aut.
+        """
+        return self.conn.execute('SELECT COUNT(*) FROM cars').fetchone()[0]
+
+    def export_csv(self, path='vsechna_auta.csv'):
+        """
+        Zapíše všechna uložená auta do CSV se stejnými sloupci jako save_results v crawler.py.
+        """
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(FIELDS.values())} FROM cars ORDER BY listing_id", self.conn
+        )
+        df.columns = list(FIELDS)
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+        print(f"\n✅ Uloženo {len(df)} záznamů do {path}")
+        return len(df)
+
+    def close(self):
+        self.conn.close()
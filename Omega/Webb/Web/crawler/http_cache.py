@@ -0,0 +1,194 @@
+"""Diskový cache HTTP odpovědí pro crawler.
+Odpovědi se ukládají do SQLite podle URL (bez části za '#', kterou server nevidí) i s hlavičkami
+ETag a Last-Modified. Při dalším stažení se posílá podmíněný GET (If-None-Match / If-Modified-Since)
+a nezměněná stránka přijde jako 304 bez těla. Těla stránek jsou uložena komprimovaná (zlib).
+V režimu offline se nic nestahuje a vše se čte jen z cache – hodí se pro ladění parseru.
+
+Použití z crawleru:
+    python crawler.py --cache http_cache.db             # stahování s podmíněnými požadavky
+    python crawler.py --cache http_cache.db --offline   # znovu projde uložené stránky bez sítě
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urldefrag
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    encoding TEXT,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+COMPRESSION_LEVEL = 6
+
+
+class CacheMiss(Exception):
+    """
+    Stránka není v cache a v režimu offline ji nelze stáhnout.
+    """
+
+
+class CachedResponse:
+    """
+    Odpověď vrácená CachedSession. Má stejné atributy, jaké crawler používá u requests.Response.
+    """
+
+    def __init__(self, url, status_code, content, encoding='utf-8', from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding, errors='replace')
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise RuntimeError(f'HTTP {self.status_code}: {self.url}')
+
+
+class ResponseCache:
+    """
+    Úložiště odpovědí v SQLite. Jedno spojení sdílené vlákny je chráněné zámkem.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0  # Odpovědi 304 a čtení v režimu offline
+        self.misses = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0  # Velikost těl, která díky 304 nebylo potřeba stahovat
+
+    def get(self, url):
+        """
+        Vrátí uloženou odpověď pro URL jako slovník, nebo None.
+        """
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT status, etag, last_modified, encoding, body FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, etag, last_modified, encoding, body = row
+        return {
+            'status': status,
+            'etag': etag,
+            'last_modified': last_modified,
+            'encoding': encoding,
+            'content': zlib.decompress(body)
+        }
+
+    def put(self, url, status, etag, last_modified, encoding, content):
+        """
+        Uloží odpověď s komprimovaným tělem.
+        """
+        body = zlib.compress(content, COMPRESSION_LEVEL)
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, status, etag, last_modified, encoding, body, time.time())
+            )
+
+    def touch(self, url):
+        """
+        Aktualizuje čas posledního ověření uložené odpovědi (po 304).
+        """
+        with self._lock, self.conn:
+            self.conn.execute('UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url))
+
+    def record(self, hit, downloaded=0, saved=0):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.bytes_downloaded += downloaded
+            self.bytes_saved += saved
+
+    def stats(self):
+        """
+        Vrátí počet uložených stránek, jejich velikost a počítadla zásahů.
+        """
+        with self._lock:
+            entries, stored = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses'
+            ).fetchone()
+            return {
+                'entries': entries,
+                'stored_bytes': stored,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_saved': self.bytes_saved
+            }
+
+    def close(self):
+        self.conn.close()
+
+
+class CachedSession:
+    """
+    Obal session z requests s podmíněnými požadavky přes ResponseCache.
+    V režimu offline (`offline=True`) se `session` nepoužívá a chybějící stránka vyvolá CacheMiss.
+    """
+
+    def __init__(self, session, cache, offline=False):
+        self.session = session
+        self.cache = cache
+        self.offline = offline
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        key = urldefrag(url)[0]
+        cached = self.cache.get(key)
+
+        if self.offline:
+            if cached is None:
+                raise CacheMiss(f'Stránka není v cache: {key}')
+            self.cache.record(hit=True)
+            return CachedResponse(url, cached['status'], cached['content'], cached['encoding'], from_cache=True)
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            if cached['etag']:
+                request_headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.session.get(url, headers=request_headers, timeout=timeout, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(key)
+            self.cache.record(hit=True, saved=len(cached['content']))
+            return CachedResponse(url, cached['status'], cached['content'], cached['encoding'], from_cache=True)
+
+        content = response.content
+        encoding = response.encoding or response.apparent_encoding
+        self.cache.record(hit=False, downloaded=len(content))
+        if response.status_code == 200:
+            self.cache.put(
+                key, response.status_code, response.headers.get('ETag'),
+                response.headers.get('Last-Modified'), encoding, content
+            )
+        return CachedResponse(url, response.status_code, content, encoding)
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
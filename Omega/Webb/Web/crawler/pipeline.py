@@ -0,0 +1,323 @@
+"""Vícefázový crawler, který odděluje stahování od parsování.
+Fáze jsou propojené omezenými frontami:
+    odkazy -> [stahování: N vláken] -> HTML -> [parsování: pool M procesů] -> [zápis: 1 vlákno] -> CSV
+Parsování běží v samostatných procesech, takže CPU čas BeautifulSoup neblokuje síťové vstupy/výstupy.
+Každá fáze měří, jak dlouho čekala na vstup (hladovění) a jak dlouho byla blokovaná plnou výstupní
+frontou (zpětný tlak), takže je vidět, kterou fázi je potřeba posílit.
+
+Spuštění:
+    python pipeline.py --fetchers 8 --parsers 4 --queue-size 64
+    python pipeline.py --base-url http://127.0.0.1:8000 --rate 500   # proti fixture_server.py
+"""
+
+import argparse
+import csv
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from async_crawler import rebase_url
+from crawler import MAX_PAGES, categories, category_page_url, create_session, get_car_links, headers
+from extractors import get_extractor
+from frontier import FIELDS, Frontier
+from http_cache import CachedSession, ResponseCache
+
+_DONE = object()  # Značka konce proudu v frontě
+
+
+class StageStats:
+    """
+    Počítadla jedné fáze: zpracované položky, čekání na vstup a blokování na plné výstupní frontě.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.processed = 0
+        self.errors = 0
+        self.input_wait = 0.0
+        self.output_blocked = 0.0
+        self.max_queue = 0
+        self._lock = threading.Lock()
+
+    def add(self, processed=0, errors=0, input_wait=0.0, output_blocked=0.0, queue_size=0):
+        with self._lock:
+            self.processed += processed
+            self.errors += errors
+            self.input_wait += input_wait
+            self.output_blocked += output_blocked
+            self.max_queue = max(self.max_queue, queue_size)
+
+    def report(self, elapsed):
+        """
+        Vrátí statistiky fáze jako slovník.
+        """
+        return {
+            'stage': self.name,
+            'processed': self.processed,
+            'errors': self.errors,
+            'items_per_second': round(self.processed / elapsed, 2) if elapsed else 0.0,
+            'input_wait_s': round(self.input_wait, 2),
+            'output_blocked_s': round(self.output_blocked, 2),
+            'max_input_queue': self.max_queue
+        }
+
+
+def timed_get(q, stats):
+    """
+    Vezme položku z fronty a započítá dobu čekání na vstup.
+    """
+    start = time.perf_counter()
+    item = q.get()
+    stats.add(input_wait=time.perf_counter() - start, queue_size=q.qsize() + 1)
+    return item
+
+
+def timed_put(q, item, stats):
+    """
+    Vloží položku do fronty a započítá dobu blokování plnou frontou (zpětný tlak).
+    """
+    start = time.perf_counter()
+    q.put(item)
+    stats.add(output_blocked=time.perf_counter() - start)
+
+
+class RateLimiter:
+    """
+    Jednoduchý thread-safe token bucket sdílený všemi stahovacími vlákny.
+    """
+
+    def __init__(self, rate, burst=5):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CrawlPipeline:
+    """
+    Pipeline crawleru s nezávisle nastavitelným počtem stahovacích vláken (`fetchers`),
+    procesů pro parsování (`parsers`) a velikostí front (`queue_size`).
+    """
+
+    def __init__(self, category_urls, output, fetchers=8, parsers=None, queue_size=64, rate=3.0, burst=5,
+                 parser='bs4', state_path=None, max_age_days=7, cache_path=None, offline=False):
+        self.category_urls = list(category_urls)
+        self.output = output
+        self.fetchers = fetchers
+        self.parsers = parsers or os.cpu_count() or 1
+        self.parse = get_extractor(parser)
+        self.state_path = state_path
+        self.max_age_days = max_age_days
+        self.cache = ResponseCache(cache_path) if cache_path else None
+        if offline and self.cache is None:
+            raise ValueError('Režim offline vyžaduje cache (--cache).')
+        self.offline = offline
+        self.limiter = RateLimiter(rate, burst)
+        self.links = queue.Queue(maxsize=queue_size)  # Odkazy na detail auta ke stažení
+        self.pages = queue.Queue(maxsize=queue_size)  # Stažené HTML k parsování
+        self.parsed = queue.Queue(maxsize=queue_size)  # Rozpracované výsledky parsování k zápisu
+        self.stats = {name: StageStats(name) for name in ('discover', 'fetch', 'parse', 'write')}
+        self._local = threading.local()
+        self.elapsed = 0.0
+
+    def _session(self):
+        """
+        Vrátí HTTP session aktuálního vlákna (requests.Session není bezpečné sdílet mezi vlákny).
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = None if self.offline else create_session()
+            if self.cache:
+                session = CachedSession(session, self.cache, self.offline)
+            self._local.session = session
+        return session
+
+    def discover(self):
+        """
+        Fáze hledání odkazů: prochází stránky kategorií a vkládá nové odkazy na auta do fronty ke stažení.
+        """
+        stats = self.stats['discover']
+        frontier = Frontier(self.state_path, self.max_age_days) if self.state_path else None
+        seen = set()
+        try:
+            if frontier:
+                pending = frontier.pending()
+                seen.update(pending)
+                for link in pending:
+                    timed_put(self.links, link, stats)
+            for category_url in self.category_urls:
+                for page in range(1, MAX_PAGES):
+                    if not self.offline:
+                        self.limiter.acquire()
+                    car_links = [link for link in get_car_links(self._session(), category_page_url(category_url, page))
+                                 if link not in seen]
+                    if not car_links:
+                        break
+                    seen.update(car_links)
+                    if frontier:
+                        car_links = frontier.add(car_links, category_url)
+                    stats.add(processed=1)
+                    for link in car_links:
+                        timed_put(self.links, link, stats)
+        finally:
+            if frontier:
+                frontier.close()
+            for _ in range(self.fetchers):
+                self.links.put(_DONE)
+
+    def fetch(self):
+        """
+        Fáze stahování: stáhne HTML detailu auta a předá ho k parsování. Neúspěšné stažení předá dál
+        jako (url, None), aby ho zapisovač zaznamenal ve stavu procházení jako neúspěšný pokus.
+        """
+        stats = self.stats['fetch']
+        try:
+            while True:
+                url = timed_get(self.links, stats)
+                if url is _DONE:
+                    break
+                if not self.offline:
+                    self.limiter.acquire()
+                try:
+                    response = self._session().get(url, headers=headers, timeout=(5, 10))
+                    html = response.text
+                    stats.add(processed=1)
+                except Exception as e:
+                    html = None
+                    stats.add(errors=1)
+                    print(f"Chyba: {url} | {str(e)}")
+                timed_put(self.pages, (url, html), stats)
+        finally:
+            self.pages.put(_DONE)  # I při pádu vlákna, jinak by dispatch čekal navždy
+
+    def dispatch(self, pool):
+        """
+        Fáze parsování: odesílá stažené HTML do poolu procesů. Fronta rozpracovaných výsledků je omezená,
+        takže se do poolu nikdy neodešle víc práce, než stihne zapisovač převzít.
+        """
+        stats = self.stats['parse']
+        finished_fetchers = 0
+        while finished_fetchers < self.fetchers:
+            item = timed_get(self.pages, stats)
+            if item is _DONE:
+                finished_fetchers += 1
+                continue
+            url, html = item
+            future = pool.submit(self.parse, html) if html is not None else None  # None = stažení selhalo
+            timed_put(self.parsed, (url, future), stats)
+        self.parsed.put(_DONE)
+
+    def write(self):
+        """
+        Fáze zápisu: převezme výsledky parsování a průběžně je připisuje do CSV. Se stavem procházení
+        se auta ukládají do SQLite a CSV se na konci vyexportuje ze všech uložených aut (jako v crawler.py).
+        """
+        stats = self.stats['write']
+        parse_stats = self.stats['parse']
+        frontier = Frontier(self.state_path, self.max_age_days) if self.state_path else None
+        with open(self.output, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=list(FIELDS))
+            writer.writeheader()
+            while True:
+                item = timed_get(self.parsed, stats)
+                if item is _DONE:
+                    break
+                url, future = item
+                if future is None:  # Stažení selhalo (chyba je započtená ve fázi fetch)
+                    if frontier:
+                        frontier.mark_failed(url)
+                    continue
+                try:
+                    car = future.result()
+                except Exception as e:
+                    car = None
+                    print(f"Chyba při parsování: {url} | {str(e)}")
+                parse_stats.add(processed=1 if car else 0, errors=0 if car else 1)
+                if car:
+                    stats.add(processed=1)
+                    if frontier:
+                        frontier.mark_done(url, car)
+                    else:
+                        writer.writerow(car)
+                elif frontier:
+                    frontier.mark_failed(url)
+        if frontier:
+            frontier.export_csv(self.output)
+            frontier.close()
+
+    def run(self):
+        """
+        Spustí všechny fáze a počká na jejich dokončení. Vrací statistiky fází.
+        """
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.parsers) as pool:
+            threads = [threading.Thread(target=self.discover, name='discover')]
+            threads += [threading.Thread(target=self.fetch, name=f'fetch-{i}') for i in range(self.fetchers)]
+            threads.append(threading.Thread(target=self.dispatch, args=(pool,), name='dispatch'))
+            threads.append(threading.Thread(target=self.write, name='write'))
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.elapsed = time.perf_counter() - start
+        if self.cache:
+            self.cache.close()
+        return self.report()
+
+    def report(self):
+        """
+        Vrátí statistiky všech fází.
+        """
+        return [stats.report(self.elapsed) for stats in self.stats.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawler aut jako pipeline stahování, parsování a zápisu.')
+    parser.add_argument('--base-url', help='Náhradní adresa webu, např. http://127.0.0.1:8000')
+    parser.add_argument('--fetchers', type=int, default=8, help='Počet stahovacích vláken')
+    parser.add_argument('--parsers', type=int, default=os.cpu_count(), help='Počet procesů pro parsování')
+    parser.add_argument('--queue-size', type=int, default=64, help='Velikost front mezi fázemi')
+    parser.add_argument('--rate', type=float, default=3.0, help='Počet požadavků za sekundu')
+    parser.add_argument('--burst', type=int, default=5, help='Nárazová kapacita omezovače rychlosti')
+    parser.add_argument('--parser', default='bs4', choices=['bs4', 'lxml', 'stream'], help='Extrakční backend')
+    parser.add_argument('--output', default='vsechna_auta.csv')
+    parser.add_argument('--state', help='SQLite soubor se stavem procházení (přírůstkový režim s pokračováním)')
+    parser.add_argument('--max-age-days', type=float, default=7, help='Po kolika dnech se uložené auto stáhne znovu')
+    parser.add_argument('--cache', help='SQLite soubor s cache HTTP odpovědí (podmíněné požadavky)')
+    parser.add_argument('--offline', action='store_true', help='Číst stránky jen z cache, bez sítě')
+    args = parser.parse_args()
+
+    category_urls = [rebase_url(url, args.base_url) for url in categories] if args.base_url else categories
+    pipeline = CrawlPipeline(
+        category_urls, args.output, args.fetchers, args.parsers, args.queue_size, args.rate, args.burst,
+        args.parser, args.state, args.max_age_days, args.cache, args.offline
+    )
+    cache = pipeline.cache
+    report = pipeline.run()
+    print(f"\n📈 Hotovo za {pipeline.elapsed:.2f} s")
+    for stage in report:
+        print(f"{stage['stage']:<9} {stage['processed']:>6} ks | {stage['items_per_second']:>8} ks/s | "
+              f"chyb: {stage['errors']:>3} | čekání na vstup: {stage['input_wait_s']:>7} s | "
+              f"blokováno výstupem: {stage['output_blocked_s']:>7} s | max. fronta: {stage['max_input_queue']}")
+    if cache:
+        print(f"🗄️ Cache: hits={cache.hits} misses={cache.misses} stažené bajty={cache.bytes_downloaded} "
+              f"ušetřené bajty={cache.bytes_saved}")
+
+
+if __name__ == '__main__':
+    main()
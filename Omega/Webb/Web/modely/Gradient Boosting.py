@@ -1,40 +1,21 @@
+import os
+import sys
 import pandas as pd
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.ensemble import GradientBoostingRegressor
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 import numpy as np
 import matplotlib.pyplot as plt
 
-# Načtení dat ze souboru
-file_path = '../cleaner/doopravdy_hotove_auta.csv'
-df = pd.read_csv(file_path)
+# Načtení sdíleného úložiště příznaků z app/features.py (stejná data jako pro model aplikace)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from features import NUMERICAL_COLS, load_features
 
-# Úprava cílové proměnné - odstranění jednotky " l/100km" a převod na float
-df['Kombinovaná'] = df['Kombinovaná'].str.replace(' l/100km', '').astype(float)
-
-# Úprava sloupce Výkon - odstranění jednotky "kW" a převod na float
-df['Výkon'] = df['Výkon'].str.replace('kW', '').astype(float)
-
-# Přidání nového atributu: stáří vozidla (aktuální rok mínus rok uvedení do provozu)
-current_year = 2025
-df['Stáří vozidla'] = current_year - df['Rok uvedení do provozu']
-
-# Příprava dat (vlastnosti a cílová proměnná)
-X = df.drop(['Kombinovaná', 'Rok uvedení do provozu'], axis=1)
-y = df['Kombinovaná']
-
-# Kódování kategoriálních proměnných pomocí One-Hot Encoding
-categorical_cols = ['Karoserie', 'Palivo', 'Motor']
-encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
-X_encoded = encoder.fit_transform(X[categorical_cols])
-
-# Spojení kódovaných kategoriálních vlastností s numerickými vlastnostmi
-numerical_cols = ['Výkon', 'Stáří vozidla']
-X_processed = pd.concat([
-    pd.DataFrame(X_encoded, columns=encoder.get_feature_names_out(categorical_cols)),
-    X[numerical_cols].reset_index(drop=True)
-], axis=1)
+features = load_features()
+X_processed = features.encoded_frame()  # One-hot zakódované kategorie, Výkon a Stáří vozidla
+y = pd.Series(features.y, name='Kombinovaná')  # Kombinovaná spotřeba (l/100km)
+numerical_cols = NUMERICAL_COLS
 
 # Standardizace numerických vlastností pro zlepšení výkonu modelu
 scaler = StandardScaler()
@@ -0,0 +1,295 @@
+"""Výběr modelu a ladění hyperparametrů pro RandomForest, GradientBoosting, LinearRegression a neuronovou síť Net.
+Všichni kandidáti se vyhodnocují na stejném rozdělení pro cross-validaci (KFold se stejným seedem) nad
+sdíleným úložištěm příznaků (app/features.py). Jednotlivé běhy (kandidát × fold) se počítají paralelně
+v poolu procesů a jejich výsledky se ukládají na disk, takže hotové běhy se při dalším spuštění
+nepočítají znovu. Cache je svázaná s kontrolním součtem dat, změna dat ji zneplatní.
+
+Kandidáti se řadí podle přesnosti (MAE), latence predikce jednoho řádku a velikosti modelu.
+Latence a velikost se měří až v hlavním procesu, postupně a bez souběžné zátěže poolu.
+
+Spuštění:
+    python model_selection.py --workers 4
+    python model_selection.py --families RandomForest LinearRegression --folds 3
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+MODELY_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(MODELY_DIR, '..', 'app'))
+from features import FEATURES_DIR, NUMERICAL_COLS, load_features
+
+CACHE_DIR = os.path.join(MODELY_DIR, 'selection_cache')
+REPORT_PATH = os.path.join(MODELY_DIR, 'model_selection.json')
+TRIAL_VERSION = 1  # Zvýšit při změně způsobu vyhodnocení – zneplatní cache
+SEED = 42
+LATENCY_REPEATS = 200  # Počet měření predikce jednoho řádku
+BATCH_ROWS = 1000  # Velikost dávky pro měření propustnosti
+
+# Prohledávaný prostor hyperparametrů pro každou rodinu modelů
+SEARCH_SPACE = {
+    'RandomForest': {'n_estimators': [100, 200], 'max_depth': [10, None], 'min_samples_leaf': [1, 2]},
+    'GradientBoosting': {'n_estimators': [200, 400], 'learning_rate': [0.05, 0.1], 'max_depth': [3, 5]},
+    'LinearRegression': {},
+    'Net': {'hidden': [(64, 32), (128, 64)], 'lr': [0.001, 0.01]},
+}
+
+
+def torch_available():
+    try:
+        import torch  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def scaled(estimator, n_features):
+    """
+    Obalí model standardizací číselných sloupců (poslední sloupce matice), one-hot sloupce nechá beze změny.
+    Škálování se učí jen na trénovacích datech foldu.
+    """
+    numeric = list(range(n_features - len(NUMERICAL_COLS), n_features))
+    scaler = ColumnTransformer([('num', StandardScaler(), numeric)], remainder='passthrough')
+    return make_pipeline(scaler, estimator)
+
+
+def build_model(family, params, n_features):
+    """
+    Vytvoří nenatrénovaný model dané rodiny s danými hyperparametry.
+    """
+    if family == 'RandomForest':
+        return RandomForestRegressor(random_state=SEED, n_jobs=1, **params)
+    if family == 'GradientBoosting':
+        return scaled(GradientBoostingRegressor(random_state=SEED, **params), n_features)
+    if family == 'LinearRegression':
+        return scaled(LinearRegression(**params), n_features)
+    if family == 'Net':
+        from net import NetRegressor
+        return scaled(NetRegressor(random_state=SEED, **params), n_features)
+    raise ValueError(f'Neznámá rodina modelů: {family}')
+
+
+def candidates(families):
+    """
+    Vrátí seznam kandidátů (rodina, hyperparametry) z SEARCH_SPACE.
+    """
+    result = []
+    for family in families:
+        space = SEARCH_SPACE[family]
+        for values in itertools.product(*space.values()):
+            result.append((family, dict(zip(space.keys(), values))))
+    return result
+
+
+def trial_key(family, params, fold, n_splits, data_hash):
+    """
+    Klíč běhu v cache: rodina, hyperparametry, fold, rozdělení a kontrolní součet dat.
+    """
+    payload = json.dumps([TRIAL_VERSION, family, params, fold, n_splits, SEED, data_hash], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def load_cached(key):
+    path = os.path.join(CACHE_DIR, f'{key}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_cached(key, record):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f'{key}.json')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(record, f, ensure_ascii=False)
+    os.replace(path + '.tmp', path)  # Atomický zápis – přerušený běh nezanechá poškozený záznam
+
+
+def fold_indices(n_rows, n_splits):
+    """
+    Sdílené rozdělení pro cross-validaci – stejné pro všechny kandidáty.
+    """
+    return list(KFold(n_splits=n_splits, shuffle=True, random_state=SEED).split(np.arange(n_rows)))
+
+
+def run_trial(family, params, fold, n_splits, features_path, keep_model):
+    """
+    Natrénuje jednoho kandidáta na jednom foldu a vrátí metriky. Běží v procesu poolu;
+    data si proces mapuje z úložiště příznaků sám, nepředávají se přes pickle.
+    S `keep_model` vrací i serializovaný model pro měření latence a velikosti v hlavním procesu.
+    """
+    features = load_features(features_path)
+    X = np.asarray(features.X)
+    y = np.asarray(features.y)
+    train, test = fold_indices(len(X), n_splits)[fold]
+
+    model = build_model(family, params, X.shape[1])
+    start = time.perf_counter()
+    model.fit(X[train], y[train])
+    fit_s = time.perf_counter() - start
+    y_pred = model.predict(X[test])
+
+    record = {
+        'family': family,
+        'params': params,
+        'fold': fold,
+        'mae': float(mean_absolute_error(y[test], y_pred)),
+        'rmse': float(np.sqrt(mean_squared_error(y[test], y_pred))),
+        'r2': float(r2_score(y[test], y_pred)),
+        'fit_s': fit_s
+    }
+    return record, pickle.dumps(model) if keep_model else None
+
+
+def measure_model(model_bytes, X):
+    """
+    Změří velikost serializovaného modelu, medián latence predikce jednoho řádku a propustnost dávky.
+    """
+    model = pickle.loads(model_bytes)
+    row = X[:1]
+    model.predict(row)  # Zahřátí
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append(time.perf_counter() - start)
+    batch = X[:BATCH_ROWS]
+    start = time.perf_counter()
+    model.predict(batch)
+    batch_s = time.perf_counter() - start
+    return {
+        'size_bytes': len(model_bytes),
+        'latency_p50_ms': float(np.median(timings) * 1000),
+        'rows_per_second': float(len(batch) / batch_s)
+    }
+
+
+def summarize(records):
+    """
+    Sloučí výsledky foldů každého kandidáta a přidá pořadí podle přesnosti, latence a velikosti.
+    Kandidát je paretovsky optimální, pokud žádný jiný není lepší ve všech třech kritériích zároveň.
+    """
+    grouped = {}
+    for record in records:
+        params = ', '.join(f'{name}={value}' for name, value in sorted(record['params'].items()))
+        name = f"{record['family']}({params})"
+        grouped.setdefault(name, []).append(record)
+
+    summary = []
+    for name, folds in grouped.items():
+        measured = next(record for record in folds if record['fold'] == 0)
+        summary.append({
+            'candidate': name,
+            'family': folds[0]['family'],
+            'params': folds[0]['params'],
+            'mae': float(np.mean([record['mae'] for record in folds])),
+            'mae_std': float(np.std([record['mae'] for record in folds])),
+            'r2': float(np.mean([record['r2'] for record in folds])),
+            'fit_s': float(np.mean([record['fit_s'] for record in folds])),
+            'latency_p50_ms': measured['latency_p50_ms'],
+            'rows_per_second': measured['rows_per_second'],
+            'size_bytes': measured['size_bytes']
+        })
+
+    for metric in ('mae', 'latency_p50_ms', 'size_bytes'):
+        for rank, item in enumerate(sorted(summary, key=lambda item: item[metric]), 1):
+            item[f'rank_{metric}'] = rank
+    for item in summary:
+        item['pareto'] = not any(
+            all(other[m] <= item[m] for m in ('mae', 'latency_p50_ms', 'size_bytes'))
+            and any(other[m] < item[m] for m in ('mae', 'latency_p50_ms', 'size_bytes'))
+            for other in summary
+        )
+    return sorted(summary, key=lambda item: item['mae'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Paralelní výběr modelu a ladění hyperparametrů.')
+    parser.add_argument('--families', nargs='+', default=list(SEARCH_SPACE), choices=list(SEARCH_SPACE))
+    parser.add_argument('--folds', type=int, default=5, help='Počet foldů cross-validace')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Počet procesů poolu')
+    parser.add_argument('--features', default=FEATURES_DIR, help='Složka úložiště příznaků')
+    parser.add_argument('--output', default=REPORT_PATH, help='Soubor s výsledným JSON reportem')
+    args = parser.parse_args()
+
+    families = args.families
+    if 'Net' in families and not torch_available():
+        print("⚠️ PyTorch není nainstalovaný, kandidáti Net se přeskočí")
+        families = [family for family in families if family != 'Net']
+
+    features = load_features(args.features)
+    X = np.asarray(features.X)
+    data_hash = features.schema['source_sha256']
+
+    records = []
+    pending = []
+    for family, params in candidates(families):
+        for fold in range(args.folds):
+            key = trial_key(family, params, fold, args.folds, data_hash)
+            cached = load_cached(key)
+            if cached is not None:
+                records.append(cached)
+            else:
+                pending.append((key, family, params, fold))
+    print(f"Běhů celkem: {len(records) + len(pending)}, z cache: {len(records)}, ke spočtení: {len(pending)}")
+
+    start = time.perf_counter()
+    to_measure = []  # Běhy s uloženým modelem: latence a velikost se měří až po ukončení poolu
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(run_trial, family, params, fold, args.folds, args.features, fold == 0): key
+            for key, family, params, fold in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            record, model_bytes = future.result()
+            if model_bytes is not None:
+                to_measure.append((futures[future], record, model_bytes))
+            else:
+                save_cached(futures[future], record)
+            records.append(record)
+            print(f"[{done}/{len(pending)}] {record['family']} {record['params']} fold {record['fold']}: "
+                  f"MAE {record['mae']:.3f}")
+    print(f"Hotovo za {time.perf_counter() - start:.1f} s")
+
+    # Pool je ukončený, měření latence tedy neruší žádné souběžné trénování
+    for key, record, model_bytes in to_measure:
+        record.update(measure_model(model_bytes, X))
+        save_cached(key, record)
+    if to_measure:
+        print(f"Změřena latence a velikost {len(to_measure)} modelů")
+
+    summary = summarize(records)
+    print(f"\n{'kandidát':<72} {'MAE':>7} {'R²':>6} {'latence ms':>10} {'velikost kB':>11}  pořadí (MAE/lat./vel.)")
+    for item in summary:
+        print(f"{item['candidate']:<72} {item['mae']:7.3f} {item['r2']:6.3f} {item['latency_p50_ms']:10.3f} "
+              f"{item['size_bytes'] / 1024:11.1f}  {item['rank_mae']}/{item['rank_latency_p50_ms']}/"
+              f"{item['rank_size_bytes']}{'  *' if item['pareto'] else ''}")
+    print("* paretovsky optimální kandidát (žádný jiný není lepší ve všech kritériích)")
+
+    best = {}
+    for item in summary:
+        best.setdefault(item['family'], item['params'])
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'folds': args.folds, 'data_sha256': data_hash, 'best_params': best, 'candidates': summary},
+                  f, ensure_ascii=False, indent=2, default=list)
+    print(f"Report uložen do {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Neuronová síť pro predikci spotřeby (PyTorch) a její obal s rozhraním fit/predict jako u modelů sklearn.
+Síť je v samostatném modulu, aby ji mohly importovat neuronka.py i model_selection.py
+(a aby šla předat do procesů poolu)."""
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+
+# Definice neuronové sítě
+class Net(nn.Module):
+    def __init__(self, input_size, hidden=(64, 32), dropout=0.2):
+        super(Net, self).__init__()
+        self.fc1 = nn.Linear(input_size, hidden[0])
+        self.dropout = nn.Dropout(dropout)
+        self.fc2 = nn.Linear(hidden[0], hidden[1])
+        self.fc3 = nn.Linear(hidden[1], 1)
+        self.relu = nn.ReLU()
+
+    def forward(self, x):
+        x = self.relu(self.fc1(x))
+        x = self.dropout(x)
+        x = self.relu(self.fc2(x))
+        x = self.fc3(x)
+        return x
+
+
+class ScaledNet(nn.Module):
+    """
+    Net se standardizací číselných sloupců (poslední sloupce vstupu) uvnitř forward. Exportovaná síť
+    tak přijímá stejnou matici z encoderu jako ostatní modely aplikace, bez samostatného scaleru.
+    """
+
+    def __init__(self, net, mean, scale):
+        super(ScaledNet, self).__init__()
+        self.net = net
+        self.register_buffer('mean', torch.as_tensor(np.asarray(mean), dtype=torch.float32))
+        self.register_buffer('scale', torch.as_tensor(np.asarray(scale), dtype=torch.float32))
+        self.n_numeric = int(self.mean.shape[0])
+
+    def forward(self, x):
+        split = x.shape[1] - self.n_numeric
+        numeric = (x[:, split:] - self.mean) / self.scale
+        return self.net(torch.cat([x[:, :split], numeric], dim=1))
+
+
+class NetRegressor:
+    """
+    Trénuje Net pro výběr modelu v model_selection.py: celá trénovací data v jednom kroku na epochu
+    (Adam, MSE, early stopping), validační data pro early stopping odděluje z trénovacích dat. Samotný
+    neuronka.py trénuje po mini-dávkách přes net_trainer.py. Po skončení trénování vrátí síti váhy
+    z epochy s nejnižší validační chybou.
+    """
+
+    def __init__(self, hidden=(64, 32), dropout=0.2, lr=0.001, epochs=200, patience=10,
+                 validation_fraction=0.1, random_state=42):
+        self.hidden = tuple(hidden)
+        self.dropout = dropout
+        self.lr = lr
+        self.epochs = epochs
+        self.patience = patience
+        self.validation_fraction = validation_fraction
+        self.random_state = random_state
+
+    def get_params(self, deep=True):
+        return {
+            'hidden': self.hidden, 'dropout': self.dropout, 'lr': self.lr, 'epochs': self.epochs,
+            'patience': self.patience, 'validation_fraction': self.validation_fraction,
+            'random_state': self.random_state
+        }
+
+    def set_params(self, **params):
+        for name, value in params.items():
+            setattr(self, name, value)
+        return self
+
+    def fit(self, X, y):
+        torch.manual_seed(self.random_state)
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        order = np.random.default_rng(self.random_state).permutation(len(X))
+        n_val = max(1, int(len(X) * self.validation_fraction))
+        val, train = order[:n_val], order[n_val:]
+        X_train, y_train = torch.from_numpy(X[train]), torch.from_numpy(y[train]).view(-1, 1)
+        X_val, y_val = torch.from_numpy(X[val]), torch.from_numpy(y[val]).view(-1, 1)
+
+        self.model_ = Net(X.shape[1], self.hidden, self.dropout)
+        criterion = nn.MSELoss()
+        optimizer = optim.Adam(self.model_.parameters(), lr=self.lr)
+        best_loss = np.inf
+        best_state = None
+        trigger_times = 0
+        for epoch in range(self.epochs):
+            self.model_.train()
+            optimizer.zero_grad()
+            loss = criterion(self.model_(X_train), y_train)
+            loss.backward()
+            optimizer.step()
+
+            self.model_.eval()
+            with torch.no_grad():
+                val_loss = criterion(self.model_(X_val), y_val).item()
+            if val_loss < best_loss:
+                best_loss = val_loss
+                best_state = {name: value.detach().clone() for name, value in self.model_.state_dict().items()}
+                self.best_epoch_ = epoch + 1
+                trigger_times = 0
+            else:
+                trigger_times += 1
+                if trigger_times >= self.patience:
+                    break
+        if best_state is not None:
+            self.model_.load_state_dict(best_state)
+        self.n_epochs_ = epoch + 1
+        return self
+
+    def predict(self, X):
+        self.model_.eval()
+        with torch.no_grad():
+            return self.model_(torch.from_numpy(np.asarray(X, dtype=np.float32))).numpy().ravel()
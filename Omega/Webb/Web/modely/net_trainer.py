@@ -0,0 +1,243 @@
+"""Trénování neuronové sítě Net po mini-dávkách (DataLoader) a export pro obsluhu v app/app.py.
+Na rozdíl od neuronka.py (jeden krok přes celá trénovací data za epochu, validace na testovacích datech)
+se data procházejí po dávkách o velikosti `--batch-size`, validace běží po dávkách na vlastní části
+trénovacích dat a počet vláken PyTorch se nastavuje `--threads`.
+
+Data se berou ze sdíleného úložiště příznaků (app/features.py). Tensory datasetu mohou být ve sdílené
+paměti (`--shared-memory`, procesy DataLoaderu z `--num-workers` je nekopírují) nebo v page-locked paměti
+(`--pin-memory`, rychlejší asynchronní přenos dávek na GPU).
+
+Po každém zlepšení validační ztráty se uloží checkpoint (váhy, epocha, konfigurace sítě a parametry
+standardizace). Nejlepší model se na konci exportuje se standardizací uvnitř (ScaledNet z net.py), takže
+přijímá přímo matici z encoderu:
+    *.pt   – TorchScript (torch.jit.script)
+    *.onnx – ONNX s proměnnou velikostí dávky (obsluha přes onnxruntime)
+
+Spuštění:
+    python net_trainer.py --batch-size 256 --threads 4 --export ../app/net.pt
+    cd ../app && MODEL_TYPE=net python app.py
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from sklearn.model_selection import train_test_split
+from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from features import NUMERICAL_COLS, load_features
+from net import Net, ScaledNet
+
+SEED = 42
+
+
+def make_dataset(X, y, shared_memory=False, pin_memory=False):
+    """
+    Vytvoří TensorDataset z NumPy polí. Se `shared_memory` se tensory přesunou do sdílené paměti,
+    s `pin_memory` do page-locked paměti (má smysl jen při trénování na GPU).
+    """
+    X = torch.from_numpy(np.ascontiguousarray(X, dtype=np.float32))
+    y = torch.from_numpy(np.ascontiguousarray(y, dtype=np.float32)).view(-1, 1)
+    if shared_memory:
+        X.share_memory_()
+        y.share_memory_()
+    if pin_memory:
+        X = X.pin_memory()
+        y = y.pin_memory()
+    return TensorDataset(X, y)
+
+
+def make_loader(dataset, batch_size, shuffle, num_workers=0, pin_memory=False):
+    """
+    DataLoader nad datasetem. Míchání má pevný seed, aby byl běh opakovatelný.
+    """
+    generator = torch.Generator().manual_seed(SEED)
+    return DataLoader(
+        dataset, batch_size=batch_size, shuffle=shuffle, generator=generator,
+        num_workers=num_workers, pin_memory=pin_memory, persistent_workers=num_workers > 0
+    )
+
+
+def evaluate(model, loader, criterion, device):
+    """
+    Vrátí průměrnou ztrátu přes všechny dávky loaderu.
+    """
+    model.eval()
+    total = 0.0
+    rows = 0
+    with torch.no_grad():
+        for X_batch, y_batch in loader:
+            X_batch = X_batch.to(device, non_blocking=True)
+            y_batch = y_batch.to(device, non_blocking=True)
+            total += criterion(model(X_batch), y_batch).item() * len(X_batch)
+            rows += len(X_batch)
+    return total / rows
+
+
+def save_checkpoint(path, model, config, scaler, epoch, val_loss):
+    """
+    Uloží váhy sítě a vše potřebné k jejímu znovuvytvoření (atomicky – přerušený zápis nepoškodí předchozí checkpoint).
+    """
+    torch.save({
+        'state_dict': model.state_dict(),
+        'config': config,
+        'scaler': scaler,
+        'epoch': epoch,
+        'val_loss': val_loss
+    }, path + '.tmp')
+    os.replace(path + '.tmp', path)
+
+
+def load_checkpoint(path):
+    """
+    Načte checkpoint a vrátí síť s nejlepšími vahami a slovník checkpointu.
+    """
+    checkpoint = torch.load(path, map_location='cpu')
+    model = Net(**checkpoint['config'])
+    model.load_state_dict(checkpoint['state_dict'])
+    return model.eval(), checkpoint
+
+
+def train(model, train_loader, val_loader, epochs=200, lr=0.001, patience=10, checkpoint_path=None,
+          config=None, scaler=None, device='cpu'):
+    """
+    Trénuje síť po mini-dávkách (Adam, MSE) s early stopping podle validační ztráty.
+    Při každém zlepšení uloží checkpoint; na konci vrátí síť s nejlepšími vahami a historii ztrát
+    (pokud se validační ztráta nezlepšila ani jednou, např. je stále NaN, zůstanou váhy z poslední epochy).
+    """
+    model.to(device)
+    criterion = nn.MSELoss()
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+    history = {'train_loss': [], 'val_loss': []}
+    best_loss = np.inf
+    best_state = None
+    trigger_times = 0
+
+    for epoch in range(epochs):
+        model.train()
+        total = 0.0
+        rows = 0
+        for X_batch, y_batch in train_loader:
+            X_batch = X_batch.to(device, non_blocking=True)
+            y_batch = y_batch.to(device, non_blocking=True)
+            optimizer.zero_grad()
+            loss = criterion(model(X_batch), y_batch)
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(X_batch)
+            rows += len(X_batch)
+
+        val_loss = evaluate(model, val_loader, criterion, device)
+        history['train_loss'].append(total / rows)
+        history['val_loss'].append(val_loss)
+
+        # Early stopping a checkpoint nejlepšího modelu
+        if val_loss < best_loss:
+            best_loss = val_loss
+            best_state = {name: value.detach().cpu().clone() for name, value in model.state_dict().items()}
+            trigger_times = 0
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, model, config, scaler, epoch, val_loss)
+        else:
+            trigger_times += 1
+            if trigger_times >= patience:
+                print(f'Early stopping at epoch {epoch}')
+                break
+
+    if best_state is not None:
+        model.load_state_dict(best_state)
+    return model.cpu().eval(), history
+
+
+def export_model(model, mean, scale, path, n_features):
+    """
+    Exportuje síť se standardizací číselných sloupců: '*.onnx' jako ONNX, jinak jako TorchScript.
+    """
+    wrapped = ScaledNet(model, mean, scale).eval()
+    if path.endswith('.onnx'):
+        example = torch.zeros(1, n_features)
+        torch.onnx.export(
+            wrapped, example, path, input_names=['x'], output_names=['y'],
+            dynamic_axes={'x': {0: 'batch'}, 'y': {0: 'batch'}}
+        )
+    else:
+        torch.jit.script(wrapped).save(path)
+    return wrapped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Trénování neuronové sítě po mini-dávkách a export pro aplikaci.')
+    parser.add_argument('--batch-size', type=int, default=256, help='Velikost mini-dávky')
+    parser.add_argument('--threads', type=int, default=os.cpu_count(), help='Počet vláken PyTorch (torch.set_num_threads)')
+    parser.add_argument('--num-workers', type=int, default=0, help='Počet procesů DataLoaderu')
+    parser.add_argument('--shared-memory', action='store_true', help='Dataset ve sdílené paměti (pro --num-workers)')
+    parser.add_argument('--pin-memory', action='store_true', help='Dataset a dávky v page-locked paměti (pro GPU)')
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu')
+    parser.add_argument('--epochs', type=int, default=200)
+    parser.add_argument('--lr', type=float, default=0.001)
+    parser.add_argument('--patience', type=int, default=10)
+    parser.add_argument('--hidden', type=int, nargs=2, default=[64, 32])
+    parser.add_argument('--dropout', type=float, default=0.2)
+    parser.add_argument('--validation-fraction', type=float, default=0.1)
+    parser.add_argument('--checkpoint', default='net_checkpoint.pt', help='Checkpoint s nejlepší validační ztrátou')
+    parser.add_argument('--export', default=os.path.join('..', 'app', 'net.pt'),
+                        help='Exportovaný model pro aplikaci (*.pt TorchScript, *.onnx ONNX)')
+    args = parser.parse_args()
+
+    torch.manual_seed(SEED)
+    torch.set_num_threads(args.threads)
+    pin_memory = args.pin_memory and args.device.startswith('cuda')
+
+    features = load_features()
+    X = np.asarray(features.X, dtype=np.float32)
+    y = np.asarray(features.y, dtype=np.float32)
+
+    # Stejné testovací rozdělení jako neuronka.py, validační data se oddělí z trénovacích
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=SEED)
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_train, y_train, test_size=args.validation_fraction, random_state=SEED
+    )
+
+    # Standardizace numerických vlastností podle trénovacích dat
+    n_numeric = len(NUMERICAL_COLS)
+    mean = X_train[:, -n_numeric:].mean(axis=0)
+    scale = X_train[:, -n_numeric:].std(axis=0)
+    scale[scale == 0] = 1.0
+
+    def standardize(matrix):
+        matrix = matrix.copy()
+        matrix[:, -n_numeric:] = (matrix[:, -n_numeric:] - mean) / scale
+        return matrix
+
+    train_set = make_dataset(standardize(X_train), y_train, args.shared_memory, pin_memory)
+    val_set = make_dataset(standardize(X_val), y_val, args.shared_memory, pin_memory)
+    train_loader = make_loader(train_set, args.batch_size, True, args.num_workers, pin_memory)
+    val_loader = make_loader(val_set, args.batch_size, False, args.num_workers, pin_memory)
+
+    config = {'input_size': X.shape[1], 'hidden': tuple(args.hidden), 'dropout': args.dropout}
+    scaler = {'mean': mean.tolist(), 'scale': scale.tolist()}
+    start = time.perf_counter()
+    model, history = train(
+        Net(**config), train_loader, val_loader, epochs=args.epochs, lr=args.lr, patience=args.patience,
+        checkpoint_path=args.checkpoint, config=config, scaler=scaler, device=args.device
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Trénování: {len(history['val_loss'])} epoch za {elapsed:.1f} s "
+          f"({len(history['val_loss']) * len(train_set) / elapsed:.0f} řádků/s), "
+          f"nejlepší validační ztráta {min(history['val_loss']):.4f}")
+
+    wrapped = export_model(model, mean, scale, args.export, X.shape[1])
+    with torch.no_grad():
+        y_pred = wrapped(torch.from_numpy(X_test)).numpy().ravel()
+    print(f'Test MAE: {np.mean(np.abs(y_test - y_pred)):.2f}')
+    print(f"Model exportován do {args.export}, checkpoint v {args.checkpoint}")
+
+
+if __name__ == '__main__':
+    main()
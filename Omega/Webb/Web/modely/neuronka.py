@@ -1,33 +1,30 @@
-import pandas as pd
+import os
+import sys
 import numpy as np
 import torch
-import torch.nn as nn
-import torch.optim as optim
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
 
-# Načtení a příprava dat
-df = pd.read_csv('../cleaner/doopravdy_hotove_auta.csv')
+# Načtení sdíleného úložiště příznaků z app/features.py (stejná data jako pro model aplikace)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+from features import NUMERICAL_COLS, load_features
+from net import Net  # Definice neuronové sítě
+from net_trainer import make_dataset, make_loader, train  # Trénování po mini-dávkách
 
-# Úprava cílové proměnné
-df['Kombinovaná'] = df['Kombinovaná'].str.replace(' l/100km', '').astype(float)
-df['Výkon'] = df['Výkon'].str.replace('kW', '').astype(float)
+BATCH_SIZE = 256
+torch.manual_seed(42)
+torch.set_num_threads(os.cpu_count())
 
-# Feature engineering
-df['Stáří'] = 2025 - df['Rok uvedení do provozu']
-X = df.drop(['Kombinovaná', 'Rok uvedení do provozu'], axis=1)
-y = df['Kombinovaná'].values
+features = load_features()
+y = np.asarray(features.y)
 
-# Kódování kategoriálních proměnných
-categorical_cols = ['Karoserie', 'Palivo', 'Motor']
-encoder = OneHotEncoder(sparse_output=False)
-X_cat = encoder.fit_transform(X[categorical_cols])
+# One-hot zakódované kategorie jsou v úložišti hotové
+X_cat = np.asarray(features.X[:, :-len(NUMERICAL_COLS)])
 
-# Standardizace numerických vlastností
-numerical_cols = ['Výkon', 'Stáří']
+# Standardizace numerických vlastností (Výkon, Stáří vozidla)
 scaler = StandardScaler()
-X_num = scaler.fit_transform(X[numerical_cols])
+X_num = scaler.fit_transform(features.X[:, -len(NUMERICAL_COLS):])
 
 # Spojení vlastností
 X_processed = np.hstack([X_cat, X_num])
@@ -37,73 +34,16 @@ X_train, X_test, y_train, y_test = train_test_split(
     X_processed, y, test_size=0.2, random_state=42
 )
 
-# Konverze na PyTorch tensory
-X_train_tensor = torch.FloatTensor(X_train)
-y_train_tensor = torch.FloatTensor(y_train).view(-1, 1)
+# Validační data pro early stopping se oddělí z trénovacích, testovací data zůstanou jen na vyhodnocení
+X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.1, random_state=42)
+train_loader = make_loader(make_dataset(X_fit, y_fit), BATCH_SIZE, shuffle=True)
+val_loader = make_loader(make_dataset(X_val, y_val), BATCH_SIZE, shuffle=False)
 X_test_tensor = torch.FloatTensor(X_test)
-y_test_tensor = torch.FloatTensor(y_test).view(-1, 1)
 
-
-# Definice neuronové sítě
-class Net(nn.Module):
-    def __init__(self, input_size):
-        super(Net, self).__init__()
-        self.fc1 = nn.Linear(input_size, 64)
-        self.dropout = nn.Dropout(0.2)
-        self.fc2 = nn.Linear(64, 32)
-        self.fc3 = nn.Linear(32, 1)
-        self.relu = nn.ReLU()
-
-    def forward(self, x):
-        x = self.relu(self.fc1(x))
-        x = self.dropout(x)
-        x = self.relu(self.fc2(x))
-        x = self.fc3(x)
-        return x
-
-
-# Inicializace modelu
-model = Net(X_train.shape[1])
-criterion = nn.MSELoss()
-optimizer = optim.Adam(model.parameters(), lr=0.001)
-
-# Trénování
-train_losses = []
-val_losses = []
-best_loss = np.inf
-patience = 10
-trigger_times = 0
-
-for epoch in range(200):
-    model.train()
-    optimizer.zero_grad()
-
-    # Forward pass
-    outputs = model(X_train_tensor)
-    loss = criterion(outputs, y_train_tensor)
-
-    # Backward pass
-    loss.backward()
-    optimizer.step()
-
-    # Validace
-    model.eval()
-    with torch.no_grad():
-        val_outputs = model(X_test_tensor)
-        val_loss = criterion(val_outputs, y_test_tensor)
-
-    train_losses.append(loss.item())
-    val_losses.append(val_loss.item())
-
-    # Early stopping
-    if val_loss < best_loss:
-        best_loss = val_loss
-        trigger_times = 0
-    else:
-        trigger_times += 1
-        if trigger_times >= patience:
-            print(f'Early stopping at epoch {epoch}')
-            break
+# Trénování po mini-dávkách s early stopping (patience 10)
+model, history = train(Net(X_train.shape[1]), train_loader, val_loader, epochs=200, lr=0.001, patience=10)
+train_losses = history['train_loss']
+val_losses = history['val_loss']
 
 # Predikce
 model.eval()